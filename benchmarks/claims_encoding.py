@@ -0,0 +1,47 @@
+"""
+    Cost of the access token encoding and of the claims validation:
+    the generic authlib path against the precompiled header and claims and the fixed validator.
+
+    Usage: PYTHONPATH=src python benchmarks/claims_encoding.py
+"""
+from timeit import timeit
+from uuid import uuid4
+
+from authlib.jose import JWTClaims as GenericJWTClaims, OKPKey, RSAKey
+
+from traveling_sso.config import settings
+from traveling_sso.managers.token import JWTClaims, jwt, _encode_jwt
+from traveling_sso.shared.schemas.protocol import ClientAlgorithm
+
+NUMBER = 2000
+
+
+def main():
+    keys = {
+        ClientAlgorithm.EdDSA: OKPKey.generate_key("Ed25519", is_private=True),
+        ClientAlgorithm.RS512: RSAKey.generate_key(settings.CLIENT_SECRET_KEY_SIZE, is_private=True),
+    }
+
+    print(f"{'alg':>8} {'encode before, us':>18} {'encode after, us':>17}")
+    for alg, key in keys.items():
+        claims = JWTClaims.factory_claims(str(uuid4()), uuid4().hex, "user", str(uuid4()), alg, key.thumbprint())
+        header, payload = dict(claims.header), dict(claims)
+        assert jwt.decode(_encode_jwt(header, payload, key), key) == jwt.decode(jwt.encode(header, payload, key), key)
+
+        before = timeit(lambda: jwt.encode(header, payload, key), number=NUMBER)
+        after = timeit(lambda: _encode_jwt(header, payload, key), number=NUMBER)
+        print(f"{alg:>8} {before / NUMBER * 1e6:18.1f} {after / NUMBER * 1e6:17.1f}")
+
+    claims = JWTClaims.factory_claims(str(uuid4()), uuid4().hex, "user", str(uuid4()))
+    header, payload = dict(claims.header), dict(claims)
+    before = timeit(
+        lambda: GenericJWTClaims(payload, header, options={**JWTClaims._sso_options}).validate(),
+        number=NUMBER
+    )
+    after = timeit(lambda: JWTClaims(payload, header).validate(), number=NUMBER)
+    print(f"\n{'validate before, us':>20} {'validate after, us':>19}")
+    print(f"{before / NUMBER * 1e6:20.1f} {after / NUMBER * 1e6:19.1f}")
+
+
+if __name__ == "__main__":
+    main()
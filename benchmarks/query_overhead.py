@@ -0,0 +1,82 @@
+"""
+    Python-side overhead of the hot manager queries: the statement built on every call
+    against the prebuilt statement with the bound parameters.
+    The `build` column is the statement construction and the cache key generation only,
+    the `execute` column is the whole session.execute() against the database (root admin data).
+    Run with DB_PREPARED_STATEMENT_CACHE_SIZE=0 to see the cost of the statement parse on every call.
+
+    Usage: PYTHONPATH=src python benchmarks/query_overhead.py
+"""
+from asyncio import run
+from dataclasses import fields
+from time import perf_counter
+from timeit import timeit
+
+from sqlalchemy import select, and_, func
+
+from traveling_sso.config import settings
+from traveling_sso.database.core import get_read_session
+from traveling_sso.database.models import Client, TokenSession, User
+from traveling_sso.database.utils import utcnow
+from traveling_sso.managers.client_registry import ClientEntry, select_entry_by_client_id
+from traveling_sso.managers.token import _select_token_session_by_refresh_token, get_active_token_sessions_whereclause
+from traveling_sso.managers.user import _select_user_by_email
+
+NUMBER = 2000
+
+
+async def main():
+    client_id = settings.ROOT_ADMIN_USER_CLIENT["client_id"]
+    email = settings.ROOT_ADMIN_USER["email"]
+    refresh_token = "no-such-token"
+
+    cases = {
+        "client by client_id": (
+            lambda: select(*(getattr(Client, field.name) for field in fields(ClientEntry)))
+            .where(Client.client_id == client_id),
+            lambda: (select_entry_by_client_id, {"client_id": client_id})
+        ),
+        "user by email": (
+            lambda: select(User).where(func.lower(User.email) == email.lower()),
+            lambda: (_select_user_by_email, {"email": email.lower()})
+        ),
+        "token session by refresh token": (
+            lambda: select(TokenSession).where(and_(
+                TokenSession.refresh_token == refresh_token,
+                *get_active_token_sessions_whereclause()
+            )),
+            lambda: (_select_token_session_by_refresh_token,
+                     {"refresh_token": refresh_token, "now": int(utcnow().timestamp())})
+        ),
+    }
+
+    print(f"{'query':>32} {'build, us':>10} {'prebuilt, us':>13} {'execute, us':>12} {'prebuilt, us':>13}")
+    for name, (build, prebuilt) in cases.items():
+        build_seconds = timeit(lambda: build()._generate_cache_key(), number=NUMBER)
+        prebuilt_seconds = timeit(lambda: prebuilt()[0]._generate_cache_key(), number=NUMBER)
+        execute_seconds, execute_prebuilt_seconds = await _execute(build, prebuilt)
+        print(
+            f"{name:>32} {build_seconds / NUMBER * 1e6:10.1f} {prebuilt_seconds / NUMBER * 1e6:13.1f} "
+            f"{execute_seconds / NUMBER * 1e6:12.1f} {execute_prebuilt_seconds / NUMBER * 1e6:13.1f}"
+        )
+
+
+async def _execute(build, prebuilt) -> tuple[float, float]:
+    async with get_read_session() as session:
+        await session.execute(build())
+
+        start = perf_counter()
+        for _ in range(NUMBER):
+            (await session.execute(build())).scalar()
+        build_seconds = perf_counter() - start
+
+        start = perf_counter()
+        for _ in range(NUMBER):
+            (await session.execute(*prebuilt())).scalar()
+        prebuilt_seconds = perf_counter() - start
+
+    return build_seconds, prebuilt_seconds
+
+
+if __name__ == "__main__":
+    run(main())
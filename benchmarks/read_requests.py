@@ -0,0 +1,93 @@
+"""
+    Database round trips of the read-only requests: the transactional session against the autocommit read session.
+    Requires the database with the root admin user (INIT_ROOT_ADMIN_USER).
+    With DB_POOL_PRE_PING every checkout adds one more BEGIN / ROLLBACK pair of the ping itself.
+    The caches of the users, sessions, documents, JWKS and clients are turned off,
+    so every request reads the database.
+
+    Usage: PYTHONPATH=src python benchmarks/read_requests.py
+"""
+from asyncio import run
+from collections import Counter
+from os import environ
+from time import perf_counter
+
+from asyncpg.transaction import Transaction
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+
+# before the settings are loaded
+environ.update({
+    "CACHE_USERS_TTL": "0",
+    "CACHE_DOCUMENTS_TTL": "0",
+    "CACHE_SESSIONS_TTL": "0",
+    "INTROSPECTION_CACHE_TTL": "0",
+    "JWKS_CACHE_MAX_AGE": "0",
+    "CLIENT_REGISTRY_ENABLED": "False",
+})
+
+from traveling_sso.config import settings  # noqa: E402
+from traveling_sso.database.core import engine  # noqa: E402
+from traveling_sso.database.deps import get_db, get_read_db  # noqa: E402
+from traveling_sso.main import app  # noqa: E402
+
+NUMBER = 200
+
+ROUTES = (
+    f"{settings.API_V1_STR}/user/me/documents/all",
+    f"{settings.API_V1_STR}/user/me/sessions",
+    "/.well-known/jwks.json",
+)
+
+counter = Counter()
+
+
+def _count_transaction_control(name, method):
+    async def wrapper(self, *args, **kwargs):
+        counter[name] += 1
+        return await method(self, *args, **kwargs)
+
+    return wrapper
+
+
+# BEGIN / COMMIT / ROLLBACK of the asyncpg driver do not go through the cursor events
+Transaction.start = _count_transaction_control("BEGIN", Transaction.start)
+Transaction.commit = _count_transaction_control("COMMIT", Transaction.commit)
+Transaction.rollback = _count_transaction_control("ROLLBACK", Transaction.rollback)
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _count_statement(*args, **kwargs):
+    counter["statements"] += 1
+
+
+async def main():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as sso_service:
+        resp = await sso_service.post(
+            f"{settings.API_V1_STR}/auth/signin?client_id={settings.ROOT_ADMIN_USER_CLIENT['client_id']}",
+            json={"login": settings.ROOT_ADMIN_USER["email"], "password": settings.ROOT_ADMIN_USER["password"]}
+        )
+        headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+        print(f"{'route':>40} {'session':>14} {'statements':>11} {'BEGIN':>6} {'COMMIT':>7} {'latency, ms':>12}")
+        for route in ROUTES:
+            for name, override in (("transactional", get_db), ("read", None)):
+                if override is not None:
+                    app.dependency_overrides[get_read_db] = override
+                await sso_service.get(route, headers=headers)
+
+                counter.clear()
+                start = perf_counter()
+                for _ in range(NUMBER):
+                    assert (await sso_service.get(route, headers=headers)).status_code == 200
+                seconds = perf_counter() - start
+                app.dependency_overrides.clear()
+
+                print(
+                    f"{route:>40} {name:>14} {counter['statements'] / NUMBER:11.1f} {counter['BEGIN'] / NUMBER:6.1f} "
+                    f"{(counter['COMMIT'] + counter['ROLLBACK']) / NUMBER:7.1f} {seconds / NUMBER * 1e3:12.2f}"
+                )
+
+
+if __name__ == "__main__":
+    run(main())
@@ -0,0 +1,36 @@
+"""
+    Key generation, signing and verification cost and the sizes for every supported client algorithm.
+
+    Usage: PYTHONPATH=src python benchmarks/signing_algorithms.py
+"""
+from timeit import timeit
+from uuid import uuid4
+
+from traveling_sso.managers.client import generate_pair_secrets_keys
+from traveling_sso.managers.token import JWTClaims, _sign_access_token, _verify_access_token
+from traveling_sso.shared.schemas.protocol import ClientAlgorithm
+
+NUMBER = 200
+KEYGEN_NUMBER = 5
+
+
+def main():
+    print(f"{'alg':>8} {'keygen, ms':>12} {'sign, us':>10} {'verify, us':>11} {'token, B':>9} {'public key, B':>14}")
+    for alg in ClientAlgorithm:
+        keygen = timeit(lambda: generate_pair_secrets_keys(alg), number=KEYGEN_NUMBER) / KEYGEN_NUMBER
+        public_secret, private_secret = generate_pair_secrets_keys(alg)
+        client_id = uuid4().hex
+        claims = JWTClaims.factory_claims(str(uuid4()), client_id, "user", str(uuid4()), alg)
+        header, payload = dict(claims.header), dict(claims)
+
+        # the version enables the parsed keys cache, as in the service
+        jwt_token = _sign_access_token(header, payload, client_id, 1, private_secret)
+        sign = timeit(lambda: _sign_access_token(header, payload, client_id, 1, private_secret), number=NUMBER)
+        verify = timeit(lambda: _verify_access_token(jwt_token, client_id, 1, public_secret, alg), number=NUMBER)
+
+        print(f"{alg:>8} {keygen * 1e3:12.2f} {sign / NUMBER * 1e6:10.1f} {verify / NUMBER * 1e6:11.1f} "
+              f"{len(jwt_token):9} {len(public_secret):14}")
+
+
+if __name__ == "__main__":
+    main()
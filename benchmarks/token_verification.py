@@ -0,0 +1,37 @@
+"""
+    Cost of the access token verification depending on the key it is verified with.
+
+    Usage: PYTHONPATH=src python benchmarks/token_verification.py
+"""
+from asyncio import run
+from timeit import timeit
+from uuid import uuid4
+
+from authlib.jose import RSAKey
+
+from traveling_sso.managers.client import generate_pair_secrets_keys
+from traveling_sso.managers.token import JWTClaims, generate_access_token, split_access_token, jwt
+
+NUMBER = 500
+
+
+def main():
+    public_secret, private_secret = generate_pair_secrets_keys()
+    _, jwt_token = split_access_token(
+        run(generate_access_token(
+            user_id=str(uuid4()), user_role="user", client_id=uuid4().hex, secret=private_secret, session_id=str(uuid4())
+        ))
+    )
+
+    cases = {
+        "private key PEM": private_secret,
+        "public key PEM": public_secret,
+        "parsed public key": RSAKey.import_key(public_secret)
+    }
+    for name, key in cases.items():
+        seconds = timeit(lambda: jwt.decode(jwt_token, key, claims_cls=JWTClaims).validate(), number=NUMBER)
+        print(f"{name:>20}: {seconds / NUMBER * 1e6:10.1f} us/op")
+
+
+if __name__ == "__main__":
+    main()
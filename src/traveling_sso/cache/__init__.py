@@ -0,0 +1,21 @@
+from .backends import CacheBackend, CacheBackendStats, MemoryCacheBackend, MISSING
+from .cached import Cache, CachedStats, cached
+from .lru import LRUCache, CacheStats
+from .shared_memory import SharedMemoryCacheBackend
+from .single_flight import SingleFlight, SingleFlightStats, coalesced
+
+__all__ = (
+    CacheBackend,
+    CacheBackendStats,
+    MemoryCacheBackend,
+    MISSING,
+    Cache,
+    CachedStats,
+    cached,
+    LRUCache,
+    CacheStats,
+    SharedMemoryCacheBackend,
+    SingleFlight,
+    SingleFlightStats,
+    coalesced
+)
@@ -0,0 +1,71 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Hashable
+
+from .lru import LRUCache
+
+# the value of a missing key, `None` is a valid cached value
+MISSING = object()
+
+
+@dataclass
+class CacheBackendStats:
+    size: int = 0
+    max_size: int = 0
+    evictions: int = 0
+
+
+class CacheBackend(ABC):
+    """
+        Storage of the cache entries with TTL and the size-based eviction.
+        The values are the results of the managers, schemas and the builtins.
+    """
+
+    @abstractmethod
+    async def get(self, key: Hashable) -> Any:
+        """
+            :return: the value or `MISSING`
+        """
+
+    @abstractmethod
+    async def set(self, key: Hashable, value: Any, *, ttl: float):
+        pass
+
+    @abstractmethod
+    async def delete(self, key: Hashable):
+        pass
+
+    @abstractmethod
+    async def clear(self):
+        pass
+
+    @property
+    @abstractmethod
+    def stats(self) -> CacheBackendStats:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+        In-process backend on the LRU cache, each worker has its own entries.
+    """
+
+    def __init__(self, *, max_size: int):
+        self._cache = LRUCache(max_size=max_size)
+
+    async def get(self, key: Hashable) -> Any:
+        return self._cache.get(key, MISSING)
+
+    async def set(self, key: Hashable, value: Any, *, ttl: float):
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, key: Hashable):
+        self._cache.pop(key)
+
+    async def clear(self):
+        self._cache.clear()
+
+    @property
+    def stats(self) -> CacheBackendStats:
+        stats = self._cache.stats
+        return CacheBackendStats(size=stats.size, max_size=stats.max_size, evictions=stats.evictions)
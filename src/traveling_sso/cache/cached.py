@@ -0,0 +1,151 @@
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Awaitable, Callable, Hashable
+from uuid import uuid4
+
+from .backends import CacheBackend, MISSING
+from .single_flight import SingleFlight
+
+
+@dataclass(frozen=True)
+class _Negative:
+    """Cached failure of the load: index of the exception in `negative` of the cached function."""
+
+    index: int
+
+
+@dataclass
+class CachedStats:
+    hits: int = 0
+    misses: int = 0
+    negative_hits: int = 0
+    loads: int = 0
+    coalesced: int = 0
+    fan_in: float = 0.0  # misses per load
+
+
+class Cache:
+    """
+        Namespace of the entries of one kind in the backend, the entries of all the caches share its size.
+
+        The concurrent misses of the same key in the process wait for the single load (`single_flight`).
+        The entries can be grouped: the key of a grouped entry includes the generation of its group,
+        `invalidate_group` starts the new generation, so all the entries of the group are missed.
+    """
+
+    def __init__(self, name: str, *, backend: CacheBackend, ttl: float, negative_ttl: float):
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        self.single_flight = SingleFlight(name)
+        self._hits = 0
+        self._misses = 0
+        self._negative_hits = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[Any]], *, group: Hashable = None) -> Any:
+        """
+            :param load: Coroutine function loading the value on a miss,
+                the returned `_Negative` marker is cached for `negative_ttl`
+        """
+        key = await self._get_key(key, group)
+        value = await self.backend.get(key)
+        if value is not MISSING:
+            if isinstance(value, _Negative):
+                self._negative_hits += 1
+            else:
+                self._hits += 1
+            return value
+        self._misses += 1
+
+        return await self.single_flight.do(key, lambda: self._load(key, load))
+
+    async def invalidate(self, key: Hashable, *, group: Hashable = None):
+        await self.backend.delete(await self._get_key(key, group))
+
+    async def invalidate_group(self, group: Hashable):
+        await self.backend.delete(self._get_generation_key(group))
+
+    @property
+    def stats(self) -> CachedStats:
+        single_flight_stats = self.single_flight.stats
+        return CachedStats(
+            hits=self._hits,
+            misses=self._misses,
+            negative_hits=self._negative_hits,
+            loads=single_flight_stats.loads,
+            coalesced=single_flight_stats.coalesced,
+            fan_in=single_flight_stats.fan_in
+        )
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        value = await load()
+        await self.backend.set(key, value, ttl=self.negative_ttl if isinstance(value, _Negative) else self.ttl)
+
+        return value
+
+    async def _get_key(self, key: Hashable, group: Hashable) -> Hashable:
+        if group is None:
+            return self.name, key
+        generation = await self.backend.get(self._get_generation_key(group))
+        if generation is MISSING:
+            # a new generation after the eviction as well, so the entries of the evicted one can't come back
+            generation = uuid4().hex
+            await self.backend.set(self._get_generation_key(group), generation, ttl=self.ttl)
+
+        return self.name, group, generation, key
+
+    def _get_generation_key(self, group: Hashable) -> Hashable:
+        return self.name, "generation", group
+
+
+def cached(
+        cache: Cache,
+        *,
+        key: Callable[..., Hashable | None],
+        group: Callable[..., Hashable] | None = None,
+        negative: tuple[Exception, ...] = ()
+):
+    """
+        Cache the result of the async manager function, it's called with the keyword arguments only.
+        :param key: Builds the key from the arguments of the call, `None` — the call isn't cached
+        :param group: Builds the group of the entry from the arguments of the call
+        :param negative: Exception instances (the `SsoException` templates) raised by the function
+            that are cached for `negative_ttl` and raised again on a hit
+    """
+
+    def decorator(func):
+        async def load(kwargs):
+            try:
+                return await func(**kwargs)
+            except Exception as error:
+                for index, exception in enumerate(negative):
+                    if error is exception:
+                        return _Negative(index)
+                raise
+
+        @wraps(func)
+        async def wrapper(**kwargs):
+            cache_key = key(**kwargs) if cache.enabled else None
+            if cache_key is None:
+                return await func(**kwargs)
+
+            value = await cache.get_or_load(
+                cache_key,
+                lambda: load(kwargs),
+                group=group(**kwargs) if group is not None else None
+            )
+            if isinstance(value, _Negative):
+                raise negative[value.index]
+
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
@@ -0,0 +1,140 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Hashable, Iterable
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+    max_size: int = 0
+
+
+class LRUCache:
+    """
+        Bounded in-process LRU cache with TTL for the entries.
+
+        Thread safe, the cache can be shared between the event loop and executor threads.
+        The entries can be tagged by their keys to evict all the entries of a tag without a scan.
+    """
+
+    def __init__(
+            self,
+            *,
+            max_size: int,
+            ttl: float | None = None,
+            tags: Callable[[Hashable], Iterable[Hashable]] | None = None
+    ):
+        """
+            :param tags: Returns the tags of the entry by its key, see `evict_tag`
+        """
+        assert max_size > 0, "The cache size must be positive."
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self._tags = tags
+        self._data: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+        self._keys_by_tag: dict[Hashable, set[Hashable]] = {}
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at is None or expires_at > monotonic():
+                    self._data.move_to_end(key)
+                    self._hits += 1
+                    return value
+                self._delete(key)
+            self._misses += 1
+
+            return default
+
+    def set(self, key: Hashable, value: Any, *, ttl: float | None = None):
+        """
+            :param ttl: Time to live of the entry in seconds, by default the TTL of the cache is used.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if key not in self._data and self._tags is not None:
+                for tag in self._tags(key):
+                    self._keys_by_tag.setdefault(tag, set()).add(key)
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._delete(next(iter(self._data)))
+                self._evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                self._delete(key)
+
+        return default if item is None else item[1]
+
+    def evict(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+            Drop all entries whose key matches the predicate.
+            :return: count of the dropped entries
+        """
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                self._delete(key)
+
+        return len(keys)
+
+    def evict_tag(self, tag: Hashable) -> int:
+        """
+            Drop all entries of the tag.
+            :return: count of the dropped entries
+        """
+        with self._lock:
+            keys = list(self._keys_by_tag.get(tag, ()))
+            for key in keys:
+                self._delete(key)
+
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._keys_by_tag.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            size=len(self._data),
+            max_size=self.max_size
+        )
+
+    def _delete(self, key: Hashable):
+        del self._data[key]
+        if self._tags is not None:
+            for tag in self._tags(key):
+                keys = self._keys_by_tag.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._keys_by_tag[tag]
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            item = self._data.get(key)
+        return item is not None and (item[0] is None or item[0] > monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,168 @@
+from contextlib import contextmanager
+from fcntl import flock, LOCK_EX, LOCK_UN
+from hashlib import blake2b
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from os import path
+from pickle import dumps, loads, HIGHEST_PROTOCOL, PickleError
+from struct import Struct
+from tempfile import gettempdir
+from time import time, sleep
+from typing import Any, Hashable
+
+from .backends import CacheBackend, CacheBackendStats, MISSING
+
+_MAGIC = b"SSOCACHE"
+_HEADER = Struct("<8sII")  # magic, slot count, slot size
+# version (odd while the slot is written), key hash (0 — empty), expires at, written at, data length
+_SLOT_HEADER = Struct("<QQddI")
+_WAYS = 4
+
+
+class SharedMemoryCacheBackend(CacheBackend):
+    """
+        Backend in a named shared memory segment, shared by all the workers of the host.
+
+        The segment is a 4-way set-associative table of fixed-size slots, a new entry replaces
+        the expired or the oldest one of its set. A value is stored pickled together with its key,
+        the values larger than the slot are not cached.
+        The writers are serialized by the lock file, the readers don't lock: the version of the slot
+        is odd while it is written and changes after, a read that overlapped a write is a miss.
+    """
+
+    def __init__(self, *, name: str, max_size: int, slot_size: int):
+        assert max_size >= _WAYS, f"The cache must have at least {_WAYS} slots."
+        assert slot_size > _SLOT_HEADER.size, "The slot is smaller than its header."
+
+        self.name = name
+        self._lock_file = open(path.join(gettempdir(), f"{name}.lock"), "a")
+        self._shm = self._open(name, _HEADER.size + max_size // _WAYS * _WAYS * slot_size)
+        self._buf = self._shm.buf
+        magic, segment_slot_count, segment_slot_size = _HEADER.unpack_from(self._buf, 0)
+        if magic != _MAGIC:
+            segment_slot_count, segment_slot_size = max_size // _WAYS * _WAYS, slot_size
+            with self._lock():
+                _HEADER.pack_into(self._buf, 0, _MAGIC, segment_slot_count, segment_slot_size)
+        # the geometry of the existing segment wins, all the workers must agree on it
+        self.slot_count = segment_slot_count
+        self.slot_size = segment_slot_size
+        self._evictions = 0
+        self._oversized = 0
+
+    async def get(self, key: Hashable) -> Any:
+        key_hash = self._hash(key)
+        for offset in self._get_set_offsets(key_hash):
+            version, slot_hash, expires_at, _, length = _SLOT_HEADER.unpack_from(self._buf, offset)
+            if slot_hash != key_hash or version & 1:
+                continue
+            if expires_at <= time():
+                return MISSING
+            data_offset = offset + _SLOT_HEADER.size
+            data = bytes(self._buf[data_offset:data_offset + length])
+            if _SLOT_HEADER.unpack_from(self._buf, offset)[0] != version:
+                return MISSING
+            try:
+                stored_key, value = loads(data)
+            except (PickleError, EOFError, ValueError):
+                return MISSING
+            return value if stored_key == key else MISSING
+
+        return MISSING
+
+    async def set(self, key: Hashable, value: Any, *, ttl: float):
+        data = dumps((key, value), protocol=HIGHEST_PROTOCOL)
+        if len(data) > self.slot_size - _SLOT_HEADER.size:
+            self._oversized += 1
+            return
+        key_hash = self._hash(key)
+        now = time()
+        with self._lock():
+            offset = self._get_slot_offset(key_hash, now)
+            self._write(offset, key_hash, now + ttl, now, data)
+
+    async def delete(self, key: Hashable):
+        key_hash = self._hash(key)
+        with self._lock():
+            for offset in self._get_set_offsets(key_hash):
+                if _SLOT_HEADER.unpack_from(self._buf, offset)[1] == key_hash:
+                    self._write(offset, 0, 0, 0, b"")
+
+    async def clear(self):
+        with self._lock():
+            for index in range(self.slot_count):
+                self._write(_HEADER.size + index * self.slot_size, 0, 0, 0, b"")
+
+    @property
+    def stats(self) -> CacheBackendStats:
+        now = time()
+        size = 0
+        for index in range(self.slot_count):
+            _, slot_hash, expires_at, _, _ = _SLOT_HEADER.unpack_from(self._buf, _HEADER.size + index * self.slot_size)
+            if slot_hash and expires_at > now:
+                size += 1
+        return CacheBackendStats(size=size, max_size=self.slot_count, evictions=self._evictions)
+
+    def close(self, *, unlink: bool = False):
+        self._buf.release()
+        self._shm.close()
+        if unlink:
+            # unlink() unregisters the segment from the resource tracker, it was unregistered on open
+            resource_tracker.register(self._shm._name, "shared_memory")
+            self._shm.unlink()
+        self._lock_file.close()
+
+    def _get_set_offsets(self, key_hash: int) -> range:
+        first = _HEADER.size + key_hash % (self.slot_count // _WAYS) * _WAYS * self.slot_size
+        return range(first, first + _WAYS * self.slot_size, self.slot_size)
+
+    def _get_slot_offset(self, key_hash: int, now: float) -> int:
+        # the slot of the key, otherwise an empty or expired one, otherwise the oldest one of the set
+        candidate, candidate_written_at = None, None
+        for offset in self._get_set_offsets(key_hash):
+            _, slot_hash, expires_at, written_at, _ = _SLOT_HEADER.unpack_from(self._buf, offset)
+            if slot_hash == key_hash:
+                return offset
+            if not slot_hash or expires_at <= now:
+                written_at = -1
+            if candidate is None or written_at < candidate_written_at:
+                candidate, candidate_written_at = offset, written_at
+        if candidate_written_at >= 0:
+            self._evictions += 1
+
+        return candidate
+
+    def _write(self, offset: int, key_hash: int, expires_at: float, written_at: float, data: bytes):
+        version = _SLOT_HEADER.unpack_from(self._buf, offset)[0]
+        _SLOT_HEADER.pack_into(self._buf, offset, version | 1, 0, 0, 0, 0)
+        data_offset = offset + _SLOT_HEADER.size
+        self._buf[data_offset:data_offset + len(data)] = data
+        _SLOT_HEADER.pack_into(self._buf, offset, (version | 1) + 1, key_hash, expires_at, written_at, len(data))
+
+    @contextmanager
+    def _lock(self):
+        flock(self._lock_file, LOCK_EX)
+        try:
+            yield
+        finally:
+            flock(self._lock_file, LOCK_UN)
+
+    @staticmethod
+    def _hash(key: Hashable) -> int:
+        # the same in all the workers, unlike hash() of a str; 0 marks the empty slot
+        return int.from_bytes(blake2b(repr(key).encode("utf-8"), digest_size=8).digest(), "little") or 1
+
+    @staticmethod
+    def _open(name: str, size: int) -> SharedMemory:
+        try:
+            shm = SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            shm = SharedMemory(name=name)
+            # the header is written by the creator right after the creation
+            for _ in range(100):
+                if bytes(shm.buf[:len(_MAGIC)]) == _MAGIC:
+                    break
+                sleep(0.01)
+        # the segment outlives the worker, the resource tracker would unlink it on the exit of any of them
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+        return shm
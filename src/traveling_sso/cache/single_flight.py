@@ -0,0 +1,103 @@
+from asyncio import CancelledError, Future, get_running_loop, shield
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Awaitable, Callable, Hashable
+
+
+@dataclass
+class SingleFlightStats:
+    calls: int = 0
+    loads: int = 0
+    coalesced: int = 0
+    inflight: int = 0
+    fan_in: float = 0.0  # calls per load
+    max_fan_in: int = 0  # most callers served by one load
+
+
+class _Flight:
+    __slots__ = ("future", "callers")
+
+    def __init__(self, future: Future):
+        self.future = future
+        self.callers = 1
+
+
+class SingleFlight:
+    """
+        Concurrent calls with the same key in the process share one in-flight load,
+        the callers arriving while it runs get its result or its exception.
+        Nothing is kept after the load completes, the next call loads again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+        self._inflight: dict[Hashable, _Flight] = {}
+        self._calls = 0
+        self._loads = 0
+        self._coalesced = 0
+        self._max_fan_in = 0
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        self._calls += 1
+        while (flight := self._inflight.get(key)) is not None:
+            self._coalesced += 1
+            flight.callers += 1
+            try:
+                return await shield(flight.future)
+            except CancelledError:
+                # the load was cancelled with the request of its caller, the waiter loads on its own
+                if not flight.future.cancelled():
+                    raise
+
+        flight = self._inflight[key] = _Flight(get_running_loop().create_future())
+        self._loads += 1
+        try:
+            value = await load()
+            flight.future.set_result(value)
+        except CancelledError:
+            flight.future.cancel()
+            raise
+        except Exception as error:
+            flight.future.set_exception(error)
+            # the waiters got the error, nobody awaits the future otherwise
+            flight.future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+            self._max_fan_in = max(self._max_fan_in, flight.callers)
+
+        return value
+
+    @property
+    def stats(self) -> SingleFlightStats:
+        return SingleFlightStats(
+            calls=self._calls,
+            loads=self._loads,
+            coalesced=self._coalesced,
+            inflight=len(self._inflight),
+            fan_in=self._calls / self._loads if self._loads else 0.0,
+            max_fan_in=self._max_fan_in
+        )
+
+
+def coalesced(single_flight: SingleFlight, *, key: Callable[..., Hashable | None]):
+    """
+        Share the in-flight call of the async manager function between the concurrent callers,
+        it's called with the keyword arguments only. The result must not be bound to the session of the caller.
+        :param key: Builds the key from the arguments of the call, `None` — the call isn't coalesced
+    """
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(**kwargs):
+            flight_key = key(**kwargs)
+            if flight_key is None:
+                return await func(**kwargs)
+
+            return await single_flight.do(flight_key, lambda: func(**kwargs))
+
+        wrapper.single_flight = single_flight
+        return wrapper
+
+    return decorator
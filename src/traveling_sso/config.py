@@ -107,17 +107,57 @@ class Settings(BaseSettings):
     AUTH_PASSWORD_SALT: str = "password-salt"
     SSO_ISSUERS: list[str] = ["http://localhost:33380", "http://127.0.0.1:33380"]
     ACCESS_TOKEN_EXPIRES_IN: int = 10800  # 60 * 60 * 3
+    STATELESS_ACCESS_TOKEN: bool = False  # the user profile is read from the access token claims
+    STATELESS_ACCESS_TOKEN_MAX_AGE: int = Field(900, ge=0)  # older tokens are resolved from the database
+    REVOKED_SESSIONS_PURGE_INTERVAL: int = Field(300, gt=0)  # the revoked sessions are kept ACCESS_TOKEN_EXPIRES_IN
     REFRESH_TOKEN_EXPIRES_IN: int = 31104000  # 60 * 60 * 24 * 30 * 12
+    REFRESH_TOKEN_REUSE_DETECTION: bool = True  # the reuse of a rotated refresh token revokes the session
+    REFRESH_TOKEN_REUSE_INTERVAL: int = Field(10, ge=0)  # the concurrent refreshes within it are only rejected
     REFRESH_TOKEN_COOKIE_NAME: str = "sso_refresh_token"
     REFRESH_TOKEN_HEADER_NAME: str = "x-sso-refresh-token"
     REFRESH_TOKEN_COOKIE_PATH: str = "/api/v1/auth/"
     IS_REFRESH_TOKEN_VIA_COOKIE: bool = True
-    ACTIVE_REFRESH_TOKEN_MAX_COUNT: int = 5
+    ACTIVE_REFRESH_TOKEN_MAX_COUNT: int = Field(5, ge=1)
+    ACTIVE_REFRESH_TOKEN_OVERFLOW_POLICY: Literal["revoke_all", "evict_oldest"] = "revoke_all"
     CLIENT_ID_HEADER_NAME: str = "x-sso-client-id"
-    CLIENT_SECRET_KEY_SIZE: int = Field(2048, ge=512)
+    CLIENT_SECRET_KEY_SIZE: int = Field(2048, ge=512)  # RSA only
+    CLIENT_DEFAULT_ALGORITHM: Literal["RS512", "ES256", "EdDSA"] = "RS512"
     CLIENT_SECRET_EXPIRES_DAYS_IN: int = 1095  # 3 years
+    CLIENT_KEY_POOL_SIZE: int = Field(0, ge=0)  # 0 — the pool is disabled
+    CLIENT_KEY_POOL_REFILL_WATERMARK: float = Field(0.5, ge=0, le=1)
+    CLIENT_KEY_POOL_CHECK_INTERVAL: int = 60
+    CLIENT_KEY_POOL_SECRET: Optional[str] = None
+    CLIENT_LIST_PAGE_MAX_SIZE: int = Field(100, ge=1)
+    CLIENT_KEYS_CACHE_MAX_SIZE: int = Field(1024, ge=1)
+    CLIENT_KEYS_CACHE_TTL: int = 3600  # 60 * 60
+    CLIENT_REGISTRY_ENABLED: bool = True
+    CLIENT_REGISTRY_RESYNC_INTERVAL: int = Field(300, gt=0)  # full reload, the safety net for missed notifications
+    CLIENT_REGISTRY_NEGATIVE_CACHE_MAX_SIZE: int = Field(10000, ge=1)
+    CLIENT_REGISTRY_NEGATIVE_CACHE_TTL: int = Field(30, gt=0)  # unknown client_id
+    JWKS_CACHE_MAX_AGE: int = Field(300, ge=0)  # 5 minutes, also the Cache-Control max-age
+    INTROSPECT_BATCH_MAX_SIZE: int = Field(100, ge=1)
+    INTROSPECTION_CACHE_MAX_SIZE: int = Field(10000, ge=1)
+    INTROSPECTION_CACHE_TTL: int = Field(60, ge=0)  # 0 — the cache is disabled
+    INVALIDATION_BUS_ENABLED: bool = True
+    INVALIDATION_BUS_RETRY_INTERVAL: float = Field(5, gt=0)  # reconnect of the LISTEN connection
+    INVALIDATION_BUS_REPLAY_MARGIN: int = Field(30, ge=0)  # replayed before the last received event, late commits
+    INVALIDATION_BUS_RETENTION: int = Field(3600, gt=0)  # the events are replayed after a reconnect within it
+    INVALIDATION_BUS_CLEANUP_INTERVAL: int = Field(300, gt=0)
+    CACHE_BACKEND: Literal["memory", "shared"] = "memory"  # shared — one cache for all the workers of the host
+    CACHE_MAX_SIZE: int = Field(10000, ge=4)  # entries of all the caches
+    CACHE_SHARED_MEMORY_NAME: str = "traveling_sso_cache"
+    CACHE_SHARED_SLOT_SIZE: int = Field(2048, ge=64)  # bytes, the larger values aren't cached
+    CACHE_NEGATIVE_TTL: int = Field(30, ge=0)  # not found
+    CACHE_USERS_TTL: int = Field(60, ge=0)  # 0 — the cache is disabled
+    CACHE_DOCUMENTS_TTL: int = Field(60, ge=0)
+    CACHE_SESSIONS_TTL: int = Field(10, ge=0)  # the new sessions of the other hosts aren't delivered, keep it short
     CSRF_SECRET: Optional[str] = None
 
+    CRYPTO_EXECUTOR: Literal["thread", "process", "inline"] = "thread"
+    CRYPTO_EXECUTOR_MAX_WORKERS: int = Field(4, ge=1)
+    CRYPTO_EXECUTOR_MAX_QUEUE_SIZE: int = Field(1024, ge=0)
+    CRYPTO_EXECUTOR_QUEUE_TIMEOUT: float = 5.0
+
     DB_SCHEMA: str = "postgresql"
     DB_HOST: str = "sso-postgres"
     DB_PORT: str = "5432"
@@ -129,12 +169,23 @@ class Settings(BaseSettings):
     DB_POOL_PRE_PING: bool = True
     DB_POOL_SIZE: int = 75
     DB_MAX_OVERFLOW: int = 20
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = Field(100, ge=0)  # per connection, 0 — disabled (e.g. behind pgbouncer)
+    DB_REPLICA_HOSTS: list[str] = []  # "host" or "host:port", the read-only sessions are balanced between them
+    DB_REPLICA_RETRY_INTERVAL: float = Field(5, gt=0)  # seconds a failed replica is skipped
 
     BACKEND_CORS_ORIGINS: list[str] = ["*"]
 
-    def get_db_url(self) -> str:
+    def get_db_url(self, host: Optional[str] = None, port: Optional[str] = None) -> str:
         return (f"{self.DB_SCHEMA}+{self.DB_DRIVER}://{self.DB_USER}:{quote_plus(self.DB_PASSWORD)}@"
-                f"{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}?ssl={self.DB_SSL}")
+                f"{host or self.DB_HOST}:{port or self.DB_PORT}/{self.DB_NAME}?ssl={self.DB_SSL}")
+
+    def get_db_replica_urls(self) -> list[str]:
+        res = []
+        for replica in self.DB_REPLICA_HOSTS:
+            host, _, port = replica.partition(":")
+            res.append(self.get_db_url(host, port))
+
+        return res
 
     def _get_default_api_servers(self):
         return [
@@ -0,0 +1,46 @@
+"""client public secret
+
+Revision ID: 5d0c2e8a91f4
+Revises: 0b5b33d55ff0
+Create Date: 2026-10-18 09:30:12.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from authlib.jose import RSAKey
+from cryptography.hazmat.primitives import serialization
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0c2e8a91f4'
+down_revision: Union[str, None] = '0b5b33d55ff0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('client', sa.Column('client_public_secret', sa.String(), nullable=True))
+
+    client = sa.table(
+        'client',
+        sa.column('id', sa.Uuid()),
+        sa.column('client_private_secret', sa.String()),
+        sa.column('client_public_secret', sa.String())
+    )
+    connection = op.get_bind()
+    for id, client_private_secret in connection.execute(sa.select(client.c.id, client.c.client_private_secret)):
+        client_public_secret = RSAKey.import_key(client_private_secret).get_public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode("utf-8")
+        connection.execute(
+            sa.update(client).where(client.c.id == id).values(client_public_secret=client_public_secret)
+        )
+
+    op.alter_column('client', 'client_public_secret', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('client', 'client_public_secret')
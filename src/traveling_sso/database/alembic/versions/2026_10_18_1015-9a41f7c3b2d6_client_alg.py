@@ -0,0 +1,26 @@
+"""client alg
+
+Revision ID: 9a41f7c3b2d6
+Revises: 5d0c2e8a91f4
+Create Date: 2026-10-18 10:15:47.201933
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a41f7c3b2d6'
+down_revision: Union[str, None] = '5d0c2e8a91f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('client', sa.Column('alg', sa.String(length=16), server_default='RS512', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('client', 'alg')
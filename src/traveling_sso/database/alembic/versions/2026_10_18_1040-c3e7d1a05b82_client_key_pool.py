@@ -0,0 +1,36 @@
+"""client key pool
+
+Revision ID: c3e7d1a05b82
+Revises: 9a41f7c3b2d6
+Create Date: 2026-10-18 10:40:12.518364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e7d1a05b82'
+down_revision: Union[str, None] = '9a41f7c3b2d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('client_key_pool',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('alg', sa.String(length=16), nullable=False),
+    sa.Column('client_public_secret', sa.String(), nullable=False),
+    sa.Column('encrypted_client_private_secret', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_client_key_pool_alg'), 'client_key_pool', ['alg'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_client_key_pool_alg'), table_name='client_key_pool')
+    op.drop_table('client_key_pool')
@@ -0,0 +1,36 @@
+"""token session expires_at
+
+Revision ID: e84f2b6c0d19
+Revises: c3e7d1a05b82
+Create Date: 2026-10-18 11:20:36.904127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e84f2b6c0d19'
+down_revision: Union[str, None] = 'c3e7d1a05b82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('token_session', sa.Column('expires_at', sa.BigInteger(), nullable=True))
+    op.execute('UPDATE token_session SET expires_at = issued_at + expires_in')
+    op.alter_column('token_session', 'expires_at', nullable=False)
+    op.create_index(
+        'ix_token_session_active',
+        'token_session',
+        ['user_id', 'client_id', 'expires_at'],
+        unique=False,
+        postgresql_where=sa.text('refresh_token_revoked_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_token_session_active', table_name='token_session', postgresql_where=sa.text('refresh_token_revoked_at IS NULL'))
+    op.drop_column('token_session', 'expires_at')
@@ -0,0 +1,30 @@
+"""token session previous refresh token
+
+Revision ID: 1f6a9d3e27c4
+Revises: e84f2b6c0d19
+Create Date: 2026-10-18 11:45:03.287715
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1f6a9d3e27c4'
+down_revision: Union[str, None] = 'e84f2b6c0d19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('token_session', sa.Column('previous_refresh_token', sa.String(length=48), nullable=True))
+    op.create_index(
+        op.f('ix_token_session_previous_refresh_token'), 'token_session', ['previous_refresh_token'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_token_session_previous_refresh_token'), table_name='token_session')
+    op.drop_column('token_session', 'previous_refresh_token')
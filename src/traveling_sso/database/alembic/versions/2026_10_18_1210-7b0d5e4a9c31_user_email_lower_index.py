@@ -0,0 +1,26 @@
+"""user email lower index
+
+Revision ID: 7b0d5e4a9c31
+Revises: 1f6a9d3e27c4
+Create Date: 2026-10-18 12:10:44.610298
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b0d5e4a9c31'
+down_revision: Union[str, None] = '1f6a9d3e27c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_user_email_lower', 'user', [sa.text('lower(email)')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_email_lower', table_name='user')
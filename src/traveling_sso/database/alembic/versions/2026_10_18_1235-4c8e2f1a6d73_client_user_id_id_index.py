@@ -0,0 +1,25 @@
+"""client user_id id index
+
+Revision ID: 4c8e2f1a6d73
+Revises: 7b0d5e4a9c31
+Create Date: 2026-10-18 12:35:12.204817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c8e2f1a6d73'
+down_revision: Union[str, None] = '7b0d5e4a9c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_client_user_id_id', 'client', ['user_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_client_user_id_id', table_name='client')
@@ -0,0 +1,44 @@
+"""client notify change trigger
+
+Revision ID: 9e3b7c5d1a42
+Revises: 4c8e2f1a6d73
+Create Date: 2026-10-18 13:50:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3b7c5d1a42'
+down_revision: Union[str, None] = '4c8e2f1a6d73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # the payload is the changed client_id, both the old and the new one if the client_id is updated
+    op.execute("""
+        CREATE FUNCTION client_notify_change() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM pg_notify('client_changes', OLD.client_id);
+            END IF;
+            IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.client_id IS DISTINCT FROM OLD.client_id) THEN
+                PERFORM pg_notify('client_changes', NEW.client_id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER client_notify_change
+        AFTER INSERT OR UPDATE OR DELETE ON client
+        FOR EACH ROW EXECUTE FUNCTION client_notify_change()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER client_notify_change ON client")
+    op.execute("DROP FUNCTION client_notify_change()")
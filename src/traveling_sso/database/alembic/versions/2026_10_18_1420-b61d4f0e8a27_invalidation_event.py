@@ -0,0 +1,78 @@
+"""invalidation event
+
+Revision ID: b61d4f0e8a27
+Revises: 9e3b7c5d1a42
+Create Date: 2026-10-18 14:20:07.836512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b61d4f0e8a27'
+down_revision: Union[str, None] = '9e3b7c5d1a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('invalidation_event',
+    sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+    sa.Column('type', sa.String(length=16), nullable=False),
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_invalidation_event_created_at'), 'invalidation_event', ['created_at'], unique=False)
+    op.execute("""
+        CREATE FUNCTION invalidation_event_notify() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('invalidation_events', json_build_object(
+                'id', NEW.id, 'type', NEW.type, 'key', NEW.key, 'created_at', NEW.created_at
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER invalidation_event_notify
+        AFTER INSERT ON invalidation_event
+        FOR EACH ROW EXECUTE FUNCTION invalidation_event_notify()
+    """)
+    # the client changes go through the events as well, so they are replayed after a reconnect
+    op.execute("""
+        CREATE OR REPLACE FUNCTION client_notify_change() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                INSERT INTO invalidation_event (type, key) VALUES ('client', OLD.client_id);
+            END IF;
+            IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.client_id IS DISTINCT FROM OLD.client_id) THEN
+                INSERT INTO invalidation_event (type, key) VALUES ('client', NEW.client_id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION client_notify_change() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM pg_notify('client_changes', OLD.client_id);
+            END IF;
+            IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.client_id IS DISTINCT FROM OLD.client_id) THEN
+                PERFORM pg_notify('client_changes', NEW.client_id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP TRIGGER invalidation_event_notify ON invalidation_event")
+    op.execute("DROP FUNCTION invalidation_event_notify()")
+    op.drop_index(op.f('ix_invalidation_event_created_at'), table_name='invalidation_event')
+    op.drop_table('invalidation_event')
@@ -0,0 +1,32 @@
+"""token session revoked at index
+
+Revision ID: d2a9c6e1f380
+Revises: b61d4f0e8a27
+Create Date: 2026-10-18 14:55:29.412086
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a9c6e1f380'
+down_revision: Union[str, None] = 'b61d4f0e8a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_token_session_revoked_at',
+        'token_session',
+        ['refresh_token_revoked_at'],
+        unique=False,
+        postgresql_where=sa.text('refresh_token_revoked_at IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_token_session_revoked_at', table_name='token_session', postgresql_where=sa.text('refresh_token_revoked_at IS NOT NULL'))
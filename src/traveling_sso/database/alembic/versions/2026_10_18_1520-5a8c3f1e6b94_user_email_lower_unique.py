@@ -0,0 +1,39 @@
+"""user email lower unique
+
+Revision ID: 5a8c3f1e6b94
+Revises: d2a9c6e1f380
+Create Date: 2026-10-18 15:20:07.283415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a8c3f1e6b94'
+down_revision: Union[str, None] = 'd2a9c6e1f380'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # the emails differing only in case were allowed by the exact match, they must be merged by hand
+    duplicates = op.get_bind().execute(sa.text(
+        'SELECT lower(email), string_agg(id::text, \', \') FROM "user" '
+        'GROUP BY lower(email) HAVING count(*) > 1'
+    )).all()
+    if duplicates:
+        raise RuntimeError(
+            "The users have the same email in different case: "
+            + "; ".join(f"{email} ({user_ids})" for email, user_ids in duplicates)
+        )
+
+    op.drop_index('ix_user_email_lower', table_name='user')
+    op.create_index('ix_user_email_lower', 'user', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_email_lower', table_name='user')
+    op.create_index('ix_user_email_lower', 'user', [sa.text('lower(email)')], unique=False)
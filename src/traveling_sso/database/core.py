@@ -1,20 +1,102 @@
+from inspect import isawaitable
 from re import split
+from typing import Any, Callable
 
 from sqlalchemy import Column, DateTime, event
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
-from sqlalchemy.orm import declared_attr, sessionmaker, declarative_base
+from sqlalchemy.orm import Session, declared_attr, sessionmaker, declarative_base
+from sqlalchemy.util import await_only
 
 from ..config import settings
+from ..shared.metrics import register_metrics
+from .replicas import ReplicaRouter, stick_to_primary
 from .utils import utcnow
 
 
+# the asyncpg dialect keeps the prepared statements of a connection in its own LRU cache,
+# so a repeated query is sent as bind + execute without the parse step
+_connect_args = {"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE}
+
 engine: AsyncEngine = create_async_engine(url=settings.get_db_url(),
                                           pool_pre_ping=settings.DB_POOL_PRE_PING,
                                           pool_size=settings.DB_POOL_SIZE,
-                                          max_overflow=settings.DB_MAX_OVERFLOW)
+                                          max_overflow=settings.DB_MAX_OVERFLOW,
+                                          connect_args=_connect_args)
 
 get_session: sessionmaker = sessionmaker(engine, class_=AsyncSession)
 
+# shares the pool with the main engine, the connections are switched to autocommit on checkout,
+# so read-only requests do not pay for the BEGIN / COMMIT round trips
+read_engine: AsyncEngine = engine.execution_options(isolation_level="AUTOCOMMIT")
+
+replica_engines: list[AsyncEngine] = [
+    create_async_engine(url=url,
+                        isolation_level="AUTOCOMMIT",
+                        pool_pre_ping=settings.DB_POOL_PRE_PING,
+                        pool_size=settings.DB_POOL_SIZE,
+                        max_overflow=settings.DB_MAX_OVERFLOW,
+                        connect_args=_connect_args)
+    for url in settings.get_db_replica_urls()
+]
+
+read_router = ReplicaRouter(primary=read_engine,
+                            replicas=replica_engines,
+                            retry_interval=settings.DB_REPLICA_RETRY_INTERVAL)
+register_metrics("db_read_router", lambda: read_router.stats)
+
+
+class _ReadSession(Session):
+    """
+        Bound by the router on the first statement and not on the creation:
+        the dependencies of a request are created before its handler writes.
+    """
+
+    def get_bind(self, *args, **kwargs):
+        if self.bind is None:
+            self.bind = read_router.get_engine().sync_engine
+        return super().get_bind(*args, **kwargs)
+
+
+_read_session_factory: sessionmaker = sessionmaker(class_=AsyncSession, sync_session_class=_ReadSession,
+                                                   autoflush=False)
+
+
+def get_read_session() -> AsyncSession:
+    """Session for the read-only queries, bound to a replica or to the primary after a write in the request."""
+    return _read_session_factory()
+
+
+@event.listens_for(engine.sync_engine, "begin")
+def _stick_to_primary_on_begin(conn):
+    # the read sessions of the primary run in autocommit, any transaction on it is the write session
+    if conn.get_execution_options().get("isolation_level") != "AUTOCOMMIT":
+        stick_to_primary()
+
+
+def call_after_commit(session: AsyncSession, callback: Callable[[], Any]):
+    """
+        Call `callback` once the transaction of the session is committed, it's dropped on the rollback.
+        For the caches: evicted before the commit, an entry can be loaded again from the old rows.
+        A coroutine function is awaited before the commit of the async session returns.
+    """
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _call_after_commit(session):
+    for callback in session.info.pop("after_commit", ()):
+        result = callback()
+        if isawaitable(result):
+            # the event is run in the greenlet of the awaited commit
+            await_only(result)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_after_commit(session, transaction):
+    # called after `after_commit`, the callbacks left are the ones of the rolled back transaction
+    if transaction.parent is None:
+        session.info.pop("after_commit", None)
+
 
 class TimeStampMixin:
     """Timestamping mixin"""
@@ -3,7 +3,7 @@ from traveling_sso.shared.schemas.protocol import (
     CreatePassportRfResponseSchema,
     CreateForeignPassportRfResponseSchema
 )
-from .core import get_session, engine, Base
+from .core import get_session, get_read_session, engine, Base
 from ..config import settings
 from ..managers import create_or_update_passport_rf, create_or_update_foreign_passport_rf
 from ..managers.client import create_or_update_client
@@ -16,6 +16,11 @@ async def get_db():
             yield transaction.session
 
 
+async def get_read_db():
+    async with get_read_session() as session:
+        yield session
+
+
 async def db_metadata_create_all():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -1,12 +1,15 @@
-from .custom_auth import Client, TokenSession
+from .custom_auth import Client, ClientKeyPool, TokenSession
 from .documents import PassportRf, ForeignPassportRf
+from .invalidation import InvalidationEvent
 from .user import User
 
 
 __all__ = (
     Client,
+    ClientKeyPool,
     TokenSession,
     PassportRf,
     ForeignPassportRf,
+    InvalidationEvent,
     User
 )
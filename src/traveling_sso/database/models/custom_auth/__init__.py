@@ -1,16 +1,20 @@
-from authlib.jose import RSAKey
 from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa, ec, ed25519
 from sqlalchemy import (
     Column,
     Uuid,
-    ForeignKey
+    String,
+    ForeignKey,
+    Index,
+    text
 )
 from sqlalchemy.orm import relationship
 from uuid_extensions import uuid7
 
-from traveling_sso.shared.schemas.protocol import ClientSchema, TokenResponseSchema
+from traveling_sso.shared.schemas.protocol import ClientSchema, TokenResponseSchema, ClientAlgorithm, UserSchema
 from traveling_sso.shared.schemas.protocol.custom_auth import TokenSessionSchema
 from ... import TimeStampMixin, Base
+from ...utils import utcnow
 from .mixins import ClientMixin, TokenMixin
 
 
@@ -18,26 +22,29 @@ class Client(Base, TimeStampMixin, ClientMixin):
     """
 
     """
+    __table_args__ = (
+        # keyset pagination of the user clients
+        Index("ix_client_user_id_id", "user_id", "id"),
+    )
 
     id = Column(Uuid, default=uuid7, primary_key=True)
 
     user_id = Column(ForeignKey("user.id", onupdate="CASCADE"), nullable=False)
     user = relationship("User", foreign_keys=[user_id])
 
-    def to_schema(self) -> ClientSchema:
-        rsa_public_key = RSAKey.import_key(self.client_private_secret).get_public_key()
-        client_public_secret = rsa_public_key.public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo
-        ).decode("utf-8")
-
+    def to_schema(self, user_schema: UserSchema | None = None) -> ClientSchema:
+        """
+            :param user_schema: Schema of the already loaded owner,
+                the listings pass it to build it once for all the clients of the user.
+        """
         return ClientSchema(
             id=self.id,
             client_id=self.client_id,
-            client_public_secret=client_public_secret,
+            client_public_secret=self.client_public_secret,
+            alg=self.alg,
             client_id_issued_at=self.client_id_issued_at,
             client_secret_expires_at=self.client_secret_expires_at,
-            user=self.user.to_schema(),
+            user=user_schema or self.user.to_schema(),
             created_at=self.created_at,
             updated_at=self.updated_at
         )
@@ -49,24 +56,86 @@ class Client(Base, TimeStampMixin, ClientMixin):
             client_private_secret: str,
             client_id_issued_at: int,
             client_secret_expires_at: int,
+            client_public_secret: str | None = None,
+            alg: str | None = None,
             id: str | None = None,
             **kwargs
     ):
         self.client_id = client_id
         self.client_private_secret = client_private_secret
+        if client_public_secret is None or alg is None:
+            client_public_secret, alg = self.load_private_secret(client_private_secret)
+        self.client_public_secret = client_public_secret
+        self.alg = str(alg)
         self.client_id_issued_at = client_id_issued_at
         self.client_secret_expires_at = client_secret_expires_at
         if id:
             self.id = id
         super().__init__(**kwargs)
 
+    @staticmethod
+    def load_private_secret(client_private_secret: str) -> tuple[str, str]:
+        """
+            Derive the public key and the signing algorithm from the private key.
+            :param client_private_secret: Private key PEM
+            :return: tuple[<public key PEM>, <alg>]
+        """
+        private_key = serialization.load_pem_private_key(client_private_secret.encode("utf-8"), password=None)
+        if isinstance(private_key, rsa.RSAPrivateKey):
+            alg = ClientAlgorithm.RS512
+        elif isinstance(private_key, ec.EllipticCurvePrivateKey) and isinstance(private_key.curve, ec.SECP256R1):
+            alg = ClientAlgorithm.ES256
+        elif isinstance(private_key, ed25519.Ed25519PrivateKey):
+            alg = ClientAlgorithm.EdDSA
+        else:
+            raise ValueError("The client private key type isn't supported.")
+
+        client_public_secret = private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode("utf-8")
+
+        return client_public_secret, str(alg)
+
+
+class ClientKeyPool(Base, TimeStampMixin):
+    """
+        Pre-generated key pairs for the new clients, the private key is encrypted.
+    """
+
+    id = Column(Uuid, default=uuid7, primary_key=True)
+    alg = Column(String(16), nullable=False, index=True)
+    client_public_secret = Column(String, nullable=False)
+    encrypted_client_private_secret = Column(String, nullable=False)
+
 
 class TokenSession(Base, TimeStampMixin, TokenMixin):
+    __table_args__ = (
+        Index(
+            "ix_token_session_active",
+            "user_id",
+            "client_id",
+            "expires_at",
+            postgresql_where=text("refresh_token_revoked_at IS NULL")
+        ),
+        Index(
+            "ix_token_session_revoked_at",
+            "refresh_token_revoked_at",
+            postgresql_where=text("refresh_token_revoked_at IS NOT NULL")
+        ),
+    )
+
     id = Column(Uuid, default=uuid7, primary_key=True)
 
     user_id = Column(ForeignKey("user.id", onupdate="CASCADE"), nullable=False)
     user = relationship("User", foreign_keys=[user_id])
 
+    def __init__(self, *, expires_in: int, issued_at: int | None = None, **kwargs):
+        self.issued_at = int(utcnow().timestamp()) if issued_at is None else issued_at
+        self.expires_in = expires_in
+        self.expires_at = self.issued_at + expires_in
+        super().__init__(**kwargs)
+
     def is_refresh_token_active(self) -> bool:
         return not (self.is_revoked() or self.is_expired())
 
@@ -75,13 +144,13 @@ class TokenSession(Base, TimeStampMixin, TokenMixin):
             access_token=access_token,
             refresh_token=self.refresh_token,
             token_type=self.token_type,
-            expires=self.issued_at + self.expires_in
+            expires=self.expires_at
         )
 
     def to_token_session_schema(self, is_current: bool = False) -> TokenSessionSchema:
         return TokenSessionSchema(
             session_id=self.id,
             issued_at=self.issued_at,
-            expires_at=self.issued_at + self.expires_in,
+            expires_at=self.expires_at,
             is_current=is_current
         )
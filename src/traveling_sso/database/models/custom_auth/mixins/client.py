@@ -22,5 +22,7 @@ class ClientMixin(_ClientMixin):
 
     client_id = Column(String(48), index=True, unique=True, nullable=False)
     client_private_secret = Column(String, nullable=False)
+    client_public_secret = Column(String, nullable=False)
+    alg = Column(String(16), nullable=False, default="RS512", server_default="RS512")
     client_id_issued_at = Column(BigInteger, nullable=False)
     client_secret_expires_at = Column(BigInteger, nullable=False)
@@ -36,11 +36,13 @@ class TokenMixin(_TokenMixin):
     client_id = Column(String(48), nullable=False)
     token_type = Column(String(40), nullable=False)
     refresh_token = Column(String(48), index=True, nullable=False)
+    previous_refresh_token = Column(String(48), index=True, nullable=True)  # to detect the reuse after rotation
     issued_at = Column(
         BigInteger, nullable=False, default=lambda: int(utcnow().timestamp())
     )
     refresh_token_revoked_at = Column(BigInteger, nullable=True)
     expires_in = Column(BigInteger, nullable=False)
+    expires_at = Column(BigInteger, nullable=False)  # issued_at + expires_in, stored for the indexes
 
     def get_expires_in(self) -> int:
         return self.expires_in
@@ -49,8 +51,7 @@ class TokenMixin(_TokenMixin):
         if not self.expires_in:
             return False
 
-        expires_at = self.issued_at + self.expires_in
-        return expires_at < time()
+        return self.expires_at < time()
 
     def is_revoked(self) -> bool:
         return bool(self.refresh_token_revoked_at)
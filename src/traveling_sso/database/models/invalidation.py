@@ -0,0 +1,15 @@
+from sqlalchemy import Column, BigInteger, Identity, String, DateTime, func
+
+from .. import Base
+
+
+class InvalidationEvent(Base):
+    """
+        Change of the data cached by the nodes, the insert is notified to the listening nodes by the trigger.
+        The events are kept for a while to be replayed by the nodes after a reconnect.
+    """
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    type = Column(String(16), nullable=False)
+    key = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
@@ -1,6 +1,6 @@
 from hashlib import sha512
 
-from sqlalchemy import Column, Uuid, String, ForeignKey
+from sqlalchemy import Column, Uuid, String, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from uuid_extensions import uuid7
 
@@ -36,10 +36,18 @@ class User(Base, TimeStampMixin):
             role=self.role,
             created_at=self.created_at,
             updated_at=self.updated_at,
-            is_passport_rf=bool(self.foreign_passport_rf_id),
+            is_passport_rf=bool(self.passport_rf_id),
             is_foreign_passport=bool(self.foreign_passport_rf_id)
         )
 
+    def to_documents_schema(self) -> dict:
+        return {
+            "passport_rf": self.passport_rf.to_schema() if self.passport_rf is not None else None,
+            "foreign_passport_rf": (
+                self.foreign_passport_rf.to_schema() if self.foreign_passport_rf is not None else None
+            )
+        }
+
     def __init__(
             self,
             *,
@@ -73,3 +81,7 @@ class User(Base, TimeStampMixin):
         return sha512(
             password.encode("utf-8") + settings.AUTH_PASSWORD_SALT.encode("utf-8")
         ).hexdigest()
+
+
+# case-insensitive lookup by email, an email is taken in any case
+Index("ix_user_email_lower", func.lower(User.email), unique=True)
@@ -0,0 +1,102 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from itertools import count
+from logging import getLogger
+from time import monotonic
+
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..config import settings
+
+logger = getLogger(settings.LOGGER_NAME)
+
+_read_from_primary: ContextVar[bool] = ContextVar("read_from_primary", default=False)
+
+
+def stick_to_primary():
+    """
+        Route the read-only sessions of the current request (the current context) that have not run a statement yet
+        to the primary, so they see the writes of the request regardless of the replication lag.
+    """
+    _read_from_primary.set(True)
+
+
+@dataclass
+class ReplicaRouterStats:
+    replicas: int = 0
+    healthy: int = 0
+    replica_reads: int = 0
+    primary_reads: int = 0
+    failures: int = 0
+
+
+class ReplicaRouter:
+    """
+        Routes the read-only sessions between the replicas in the round-robin order.
+
+        The replica that failed to connect or lost the connection is skipped for `retry_interval` seconds,
+        without healthy replicas or after a write in the current request the reads go to the primary.
+    """
+
+    def __init__(self, *, primary: AsyncEngine, replicas: list[AsyncEngine], retry_interval: float):
+        self.primary = primary
+        self.replicas = replicas
+        self.retry_interval = retry_interval
+
+        self._unhealthy_until = [0.0] * len(replicas)
+        self._counter = count()
+        self._replica_reads = 0
+        self._primary_reads = 0
+        self._failures = 0
+
+        for index, replica in enumerate(replicas):
+            event.listen(replica.sync_engine, "do_connect", self._get_connect_handler(index))
+            event.listen(replica.sync_engine, "handle_error", self._get_error_handler(index))
+
+    @property
+    def stats(self) -> ReplicaRouterStats:
+        now = monotonic()
+        return ReplicaRouterStats(
+            replicas=len(self.replicas),
+            healthy=sum(1 for until in self._unhealthy_until if until <= now),
+            replica_reads=self._replica_reads,
+            primary_reads=self._primary_reads,
+            failures=self._failures
+        )
+
+    def get_engine(self) -> AsyncEngine:
+        if self.replicas and not _read_from_primary.get():
+            now = monotonic()
+            for _ in range(len(self.replicas)):
+                index = next(self._counter) % len(self.replicas)
+                if self._unhealthy_until[index] <= now:
+                    self._replica_reads += 1
+                    return self.replicas[index]
+
+        self._primary_reads += 1
+        return self.primary
+
+    def mark_unhealthy(self, index: int):
+        self._failures += 1
+        self._unhealthy_until[index] = monotonic() + self.retry_interval
+        logger.warning(f"Database replica {index} is unavailable, skipped for {self.retry_interval} seconds.")
+
+    def _get_connect_handler(self, index: int):
+        # the driver errors of the connect (refused, timeout) are not passed to handle_error
+        def do_connect(dialect, conn_rec, cargs, cparams):
+            try:
+                return dialect.connect(*cargs, **cparams)
+            except Exception:
+                self.mark_unhealthy(index)
+                raise
+
+        return do_connect
+
+    def _get_error_handler(self, index: int):
+        def handle_error(context: ExceptionContext):
+            if context.is_disconnect:
+                self.mark_unhealthy(index)
+
+        return handle_error
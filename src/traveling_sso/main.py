@@ -19,15 +19,29 @@ from starlette.requests import Request
 from traveling_sso.shared.schemas.exceptions import SsoException, SsoErrorCode
 from traveling_sso.config import settings
 from traveling_sso.database.deps import db_init_root_user
+from traveling_sso.managers.client_registry import client_registry
+from traveling_sso.managers.crypto import crypto_executor
+from traveling_sso.managers.invalidation import invalidation_bus
+from traveling_sso.managers.key_pool import client_keys_pool
+from traveling_sso.managers.revoked_sessions import revoked_sessions
 from traveling_sso.shared.schemas.protocol.error import get_error_response
-from traveling_sso.transport.rest import app_router
+from traveling_sso.transport.rest import app_router, well_known_router
 
 
 @asynccontextmanager
 async def lifespan(*args, **kwargs):
     if settings.INIT_ROOT_ADMIN_USER:
         await db_init_root_user()
+    client_keys_pool.start()
+    await invalidation_bus.start()
+    await client_registry.start()
+    await revoked_sessions.start()
     yield
+    await revoked_sessions.stop()
+    await client_registry.stop()
+    await invalidation_bus.stop()
+    await client_keys_pool.stop()
+    crypto_executor.shutdown()
 
 
 app = FastAPI(
@@ -60,6 +74,7 @@ async def redoc_html():
 
 
 app.include_router(app_router, prefix=settings.API_V1_STR)
+app.include_router(well_known_router, prefix="/.well-known", tags=["Well-Known"])
 
 logger = getLogger(settings.LOGGER_NAME)
 
@@ -17,12 +17,15 @@ from .documents import (
 from .user import (
     get_user_by_id,
     get_user_by_identifier,
+    find_user_by_identifier,
+    get_user_profile,
     create_or_update_user,
     update_user
 )
 from .token import (
     create_token_session,
     update_refresh_token,
+    rotate_refresh_token,
     get_token_sessions_by_user_id,
     get_token_session_by_refresh_token,
     get_token_session_by_session_id,
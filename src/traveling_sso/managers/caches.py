@@ -0,0 +1,92 @@
+from asyncio import Task, create_task
+from logging import getLogger
+
+from ..cache import Cache, CacheBackend, MemoryCacheBackend, SharedMemoryCacheBackend
+from ..config import settings
+from ..shared.metrics import register_metrics
+from .invalidation import Invalidation, InvalidationEventType, invalidation_bus
+
+logger = getLogger(settings.LOGGER_NAME)
+
+
+def _create_cache_backend() -> CacheBackend:
+    match settings.CACHE_BACKEND:
+        case "shared":
+            return SharedMemoryCacheBackend(
+                name=settings.CACHE_SHARED_MEMORY_NAME,
+                max_size=settings.CACHE_MAX_SIZE,
+                slot_size=settings.CACHE_SHARED_SLOT_SIZE
+            )
+        case _:
+            return MemoryCacheBackend(max_size=settings.CACHE_MAX_SIZE)
+
+
+cache_backend = _create_cache_backend()
+
+# key — user_id
+users_cache = Cache(
+    "users",
+    backend=cache_backend,
+    ttl=settings.CACHE_USERS_TTL,
+    negative_ttl=settings.CACHE_NEGATIVE_TTL
+)
+# key — user_id
+documents_cache = Cache(
+    "documents",
+    backend=cache_backend,
+    ttl=settings.CACHE_DOCUMENTS_TTL,
+    negative_ttl=settings.CACHE_NEGATIVE_TTL
+)
+# group — user_id, key — (current_session_id, client_id)
+token_sessions_cache = Cache(
+    "token_sessions",
+    backend=cache_backend,
+    ttl=settings.CACHE_SESSIONS_TTL,
+    negative_ttl=settings.CACHE_NEGATIVE_TTL
+)
+
+register_metrics("cache_backend", lambda: cache_backend.stats)
+for _cache in (users_cache, documents_cache, token_sessions_cache):
+    register_metrics(f"{_cache.name}_cache", lambda cache=_cache: cache.stats)
+
+
+async def invalidate_user_caches(user_id):
+    """
+        Drop the cached reads of the user: the user, the documents and the session listings.
+    """
+    user_id = str(user_id)
+    await users_cache.invalidate(user_id)
+    await documents_cache.invalidate(user_id)
+    await token_sessions_cache.invalidate_group(user_id)
+
+
+async def invalidate_token_sessions_cache(user_id):
+    await token_sessions_cache.invalidate_group(str(user_id))
+
+
+_background_tasks: set[Task] = set()
+
+
+def _run_in_background(coroutine):
+    task = create_task(coroutine)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+
+
+def _on_background_task_done(task: Task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(task.exception(), exc_info=task.exception())
+
+
+def _on_user_changed(invalidation: Invalidation):
+    _run_in_background(invalidate_user_caches(invalidation.key))
+
+
+def _on_user_sessions_revoked(invalidation: Invalidation):
+    _run_in_background(invalidate_token_sessions_cache(invalidation.key))
+
+
+invalidation_bus.subscribe(InvalidationEventType.user, _on_user_changed)
+invalidation_bus.subscribe(InvalidationEventType.user_sessions, _on_user_sessions_revoked)
+invalidation_bus.subscribe_reset(lambda: _run_in_background(cache_backend.clear()))
@@ -1,47 +1,111 @@
+from dataclasses import replace
 from datetime import timedelta
 
-from authlib.jose import RSAKey
 from authlib.common.security import generate_token
-from cryptography.hazmat.primitives import serialization
-from sqlalchemy import select
+from sqlalchemy import select, bindparam
+from sqlalchemy.orm import defer, joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from traveling_sso.shared.schemas.protocol import ClientSchema
+from traveling_sso.shared.schemas.protocol import ClientSchema, ClientAlgorithm
 from traveling_sso.shared.schemas.exceptions import client_not_found_exception
+from ..cache import SingleFlight
+from ..database.core import call_after_commit
 from ..database.models import Client, User
 from ..database.utils import utcnow
 from ..config import settings
+from ..shared.metrics import register_metrics
+from .client_registry import ClientEntry, client_registry, select_entry_by_client_id
+from .jwks import invalidate_jwks
+from .key_pool import get_pair_secrets_keys, generate_pair_secrets_keys  # noqa: F401, re-exported
+from .token import invalidate_client_key
 
 
-async def get_client_by_client_id(*, session: AsyncSession, client_id) -> Client:
-    query = select(Client).where(Client.client_id == str(client_id))
-    client = (await session.execute(query)).scalar()
+_select_client_by_uuid_id = select(Client).where(Client.id == bindparam("id"))
+
+
+client_lookups = SingleFlight("client_lookups")
+register_metrics("client_lookups", lambda: client_lookups.stats)
+
+
+async def get_client_by_client_id(
+        *,
+        session: AsyncSession,
+        client_id,
+        with_private_secret: bool = True
+) -> ClientEntry:
+    """
+        The client from the registry snapshot if it's loaded, otherwise from the database,
+        the concurrent lookups of the same client share one query.
+        :param with_private_secret: Pass `False` on the verification paths,
+            the private key is then not accessible on the client.
+    """
+    client_id = str(client_id)
+    client = client_registry.get(client_id, with_private_secret=with_private_secret)
+    if client is not None:
+        return client
+    if client_registry.is_unknown(client_id):
+        raise client_not_found_exception
+
+    client = await client_lookups.do(client_id, lambda: _get_client_entry(session, client_id))
     if client is None:
+        client_registry.mark_unknown(client_id)
         raise client_not_found_exception
 
-    return client
+    return client if with_private_secret else replace(client, client_private_secret=None)
+
+
+async def _get_client_entry(session: AsyncSession, client_id: str) -> ClientEntry | None:
+    # an entry and not the model, the waiters of the lookup don't share the session of its caller
+    row = (await session.execute(select_entry_by_client_id, {"client_id": client_id})).first()
+
+    return ClientEntry(**row._asdict()) if row is not None else None
 
 
 async def _get_client_by_uuid_id(session: AsyncSession, uuid_id: str):
-    query = select(Client).where(Client.id == uuid_id)
-    client = (await session.execute(query)).scalar()
+    client = (await session.execute(_select_client_by_uuid_id, {"id": uuid_id})).scalar()
 
     return client
 
 
-async def get_clients_for_user(*, session: AsyncSession, user_id) -> list[ClientSchema]:
-    query = select(Client).where(Client.user_id == str(user_id))
+async def get_clients_for_user(
+        *,
+        session: AsyncSession,
+        user_id,
+        limit: int | None = None,
+        after=None
+) -> list[ClientSchema]:
+    """
+        Clients of the user ordered by `id` (uuid7, so by creation), the owner is joined in the same query
+        and the private keys are not loaded.
+        :param limit: Page size, `None` — all the clients
+        :param after: Keyset pagination, `id` of the last client of the previous page
+    """
+    query = (select(Client)
+             .options(defer(Client.client_private_secret, raiseload=True),
+                      joinedload(Client.user, innerjoin=True))
+             .where(Client.user_id == str(user_id))
+             .order_by(Client.id))
+    if after is not None:
+        query = query.where(Client.id > str(after))
+    if limit is not None:
+        query = query.limit(limit)
     clients = (await session.execute(query)).scalars().all()
+    if not clients:
+        return []
 
-    return [client.to_schema() for client in clients]
+    user_schema = clients[0].user.to_schema()
+    return [client.to_schema(user_schema) for client in clients]
 
 
-async def create_client(*, session: AsyncSession, user: User) -> ClientSchema:
-    keys = generate_pair_secrets_keys()
+async def create_client(*, session: AsyncSession, user: User, alg: ClientAlgorithm | None = None) -> ClientSchema:
+    alg = alg or settings.CLIENT_DEFAULT_ALGORITHM
+    keys = await get_pair_secrets_keys(session=session, alg=alg)
 
     client = Client(
         client_id=generate_token(48),
         client_private_secret=keys[1],
+        client_public_secret=keys[0],
+        alg=alg,
         client_id_issued_at=int(utcnow().timestamp()),
         client_secret_expires_at=int(
             (utcnow() + timedelta(days=settings.CLIENT_SECRET_EXPIRES_DAYS_IN)).timestamp()
@@ -50,6 +114,8 @@ async def create_client(*, session: AsyncSession, user: User) -> ClientSchema:
     )
     session.add(client)
     await session.flush()
+    call_after_commit(session, invalidate_jwks)
+    client_registry.invalidate(client.client_id)
     return client.to_schema()
 
 
@@ -67,18 +133,30 @@ async def create_or_update_client(
     if id is not None:
         client = await _get_client_by_uuid_id(session, id)
         if client is not None:
+            invalidate_client_key(client.client_id)
+            client_registry.invalidate(client.client_id)
+            client_public_secret, alg = None, None
+            if client_private_secret:
+                client_public_secret, alg = Client.load_private_secret(client_private_secret)
             _update_client_fields(client, {
                 "client_id": client_id,
                 "client_private_secret": client_private_secret,
+                "client_public_secret": client_public_secret,
+                "alg": alg,
                 "client_id_issued_at": client_id_issued_at,
                 "client_secret_expires_at": client_secret_expires_at,
                 "user": user
             })
     if client is None:
-        keys = generate_pair_secrets_keys()
+        client_public_secret, alg = None, None
+        if not client_private_secret:
+            alg = settings.CLIENT_DEFAULT_ALGORITHM
+            client_public_secret, client_private_secret = await get_pair_secrets_keys(session=session, alg=alg)
         client = Client(
             client_id=client_id or generate_token(48),
-            client_private_secret=client_private_secret or keys[1],
+            client_private_secret=client_private_secret,
+            client_public_secret=client_public_secret,
+            alg=alg,
             client_id_issued_at=client_id_issued_at or int(utcnow().timestamp()),
             client_secret_expires_at=client_secret_expires_at or int(
                 (utcnow() + timedelta(days=settings.CLIENT_SECRET_EXPIRES_DAYS_IN)).timestamp()
@@ -89,28 +167,11 @@ async def create_or_update_client(
 
     session.add(client)
     await session.flush()
+    call_after_commit(session, invalidate_jwks)
+    client_registry.invalidate(client.client_id)
     return client.to_schema()
 
 
-def generate_pair_secrets_keys() -> tuple[str, str]:
-    rsa_key = (RSAKey.generate_key(settings.CLIENT_SECRET_KEY_SIZE, is_private=True))
-    public_key = rsa_key.get_public_key()
-    private_key = rsa_key.get_private_key()
-
-    private_key_pem = private_key.private_bytes(
-        encoding=serialization.Encoding.PEM,
-        format=serialization.PrivateFormat.PKCS8,
-        encryption_algorithm=serialization.NoEncryption()
-    )
-
-    public_key_pem = public_key.public_bytes(
-        encoding=serialization.Encoding.PEM,
-        format=serialization.PublicFormat.SubjectPublicKeyInfo
-    )
-
-    return public_key_pem.decode("utf-8"), private_key_pem.decode("utf-8")
-
-
 def _update_client_fields(client, fields: dict):
     for field, value in fields.items():
         if value is not None:
@@ -0,0 +1,252 @@
+from asyncio import Lock, Task, create_task, sleep
+from dataclasses import dataclass, fields, replace
+from datetime import datetime
+from logging import getLogger
+from uuid import UUID
+
+from sqlalchemy import select, bindparam
+
+from ..cache import LRUCache
+from ..config import settings
+from ..database.core import read_engine
+from ..database.models import Client
+from ..shared.metrics import register_metrics
+from .invalidation import Invalidation, InvalidationEventType, invalidation_bus
+from .jwks import invalidate_jwks
+from .token import client_keys_cache, get_client_public_key, invalidate_client_key
+
+logger = getLogger(settings.LOGGER_NAME)
+
+
+@dataclass(frozen=True)
+class ClientEntry:
+    """
+        Detached copy of a client row, has the attributes of `Client` used to sign and verify the tokens.
+    """
+
+    id: UUID
+    client_id: str
+    client_private_secret: str | None
+    client_public_secret: str
+    alg: str
+    client_id_issued_at: int
+    client_secret_expires_at: int
+    user_id: UUID
+    updated_at: datetime
+
+
+_select_entries = select(*(getattr(Client, field.name) for field in fields(ClientEntry)))
+select_entry_by_client_id = _select_entries.where(Client.client_id == bindparam("client_id"))
+
+
+@dataclass
+class ClientRegistryStats:
+    size: int = 0
+    hits: int = 0
+    misses: int = 0
+    unknown_hits: int = 0
+    notifications: int = 0
+    resyncs: int = 0
+
+
+class ClientRegistry:
+    """
+        Process-local snapshot of all clients, so the lookups by client_id don't go to the database.
+
+        The snapshot is loaded on start and kept in sync by the client events of the invalidation bus
+        (published by the `client` table trigger), the full reload every `resync_interval` seconds
+        is the safety net for the missed events.
+        The client_ids not found in the database are remembered for `negative_ttl` seconds.
+        Until the registry is started all the lookups miss and go to the database.
+    """
+
+    def __init__(
+            self,
+            *,
+            enabled: bool,
+            resync_interval: float,
+            negative_max_size: int,
+            negative_ttl: float
+    ):
+        self.enabled = enabled
+        self.resync_interval = resync_interval
+
+        self._clients: dict[str, ClientEntry] = {}
+        self._public_clients: dict[str, ClientEntry] = {}
+        self._unknown = LRUCache(max_size=negative_max_size, ttl=negative_ttl)
+        self._loaded = False
+        # the reload and the refreshes of the notifications are applied one by one in the order they came
+        self._lock = Lock()
+        self._task: Task | None = None
+        self._background_tasks: set[Task] = set()
+
+        self._hits = 0
+        self._misses = 0
+        self._notifications = 0
+        self._resyncs = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def get(self, client_id: str, *, with_private_secret: bool = True) -> ClientEntry | None:
+        """
+            :param with_private_secret: Pass `False` on the verification paths,
+                the entry then has no private key.
+            :return: the client or None if the registry isn't loaded or doesn't know the client
+        """
+        if not self._loaded:
+            return None
+        client = (self._clients if with_private_secret else self._public_clients).get(client_id)
+        if client is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        return client
+
+    def is_unknown(self, client_id: str) -> bool:
+        """
+            Whether the client_id was recently not found in the database.
+        """
+        return self._loaded and self._unknown.get(client_id, False)
+
+    def mark_unknown(self, client_id: str):
+        if self._loaded:
+            self._unknown.set(client_id, True)
+
+    def invalidate(self, client_id: str):
+        """
+            Forget the client changed in the current process, the lookups go to the database
+            until the notification of the committed change refreshes it.
+        """
+        self._clients.pop(client_id, None)
+        self._public_clients.pop(client_id, None)
+        self._unknown.pop(client_id)
+
+    async def load(self):
+        """
+            Replace the snapshot with all the clients of the database.
+        """
+        async with self._lock:
+            async with read_engine.connect() as connection:
+                rows = (await connection.execute(_select_entries)).all()
+            clients = {row.client_id: ClientEntry(**row._asdict()) for row in rows}
+            for client_id, client in clients.items():
+                if self._clients.get(client_id) != client:
+                    self._on_client_changed(client_id, client)
+            for client_id in self._clients.keys() - clients.keys():
+                self._on_client_changed(client_id, None)
+
+            self._clients = clients
+            self._public_clients = {
+                client_id: replace(client, client_private_secret=None) for client_id, client in clients.items()
+            }
+            self._unknown.clear()
+            self._loaded = True
+            self._resyncs += 1
+
+    async def refresh(self, client_id: str):
+        """
+            Reload one client, drop it if it no longer exists.
+        """
+        async with self._lock:
+            async with read_engine.connect() as connection:
+                row = (await connection.execute(select_entry_by_client_id, {"client_id": client_id})).first()
+            client = ClientEntry(**row._asdict()) if row is not None else None
+            self._on_client_changed(client_id, client)
+            if client is None:
+                self._clients.pop(client_id, None)
+                self._public_clients.pop(client_id, None)
+            else:
+                self._clients[client_id] = client
+                self._public_clients[client_id] = replace(client, client_private_secret=None)
+                self._unknown.pop(client_id)
+
+    async def start(self):
+        """
+            Load the snapshot, awaited on the application startup after the start of the invalidation bus,
+            so no change between the subscription and the load is missed.
+        """
+        if self.enabled and self._task is None:
+            await self.load()
+            self._task = create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in self._background_tasks:
+            task.cancel()
+        self._loaded = False
+
+    def on_client_changed(self, invalidation: Invalidation):
+        """
+            Handler of the client invalidation events.
+        """
+        self._notifications += 1
+        if self._loaded:
+            self._create_background_task(self.refresh(invalidation.key))
+        else:
+            self._on_client_changed(invalidation.key, None)
+
+    def on_reset(self):
+        """
+            Handler of the invalidation bus reset, the changes were missed.
+        """
+        invalidate_jwks()
+        client_keys_cache.clear()
+        if self._loaded:
+            self._create_background_task(self.load())
+
+    @property
+    def stats(self) -> ClientRegistryStats:
+        return ClientRegistryStats(
+            size=len(self._clients),
+            hits=self._hits,
+            misses=self._misses,
+            unknown_hits=self._unknown.stats.hits,
+            notifications=self._notifications,
+            resyncs=self._resyncs
+        )
+
+    async def _run(self):
+        while True:
+            await sleep(self.resync_interval)
+            try:
+                await self.load()
+            except Exception as error:
+                logger.error(error, exc_info=error)
+
+    def _create_background_task(self, coroutine):
+        task = create_task(coroutine)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_task_done)
+
+    def _on_background_task_done(self, task: Task):
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            # the next full reload catches up the client
+            logger.error(task.exception(), exc_info=task.exception())
+
+    @staticmethod
+    def _on_client_changed(client_id: str, client: ClientEntry | None):
+        invalidate_client_key(client_id)
+        invalidate_jwks()
+        if client is not None:
+            # the verification key is parsed ahead, before the first request with the client
+            try:
+                get_client_public_key(client)
+            except (ValueError, KeyError) as error:
+                logger.error(f"The public key of the client `{client_id}` isn't valid: {error}")
+
+
+client_registry = ClientRegistry(
+    enabled=settings.CLIENT_REGISTRY_ENABLED,
+    resync_interval=settings.CLIENT_REGISTRY_RESYNC_INTERVAL,
+    negative_max_size=settings.CLIENT_REGISTRY_NEGATIVE_CACHE_MAX_SIZE,
+    negative_ttl=settings.CLIENT_REGISTRY_NEGATIVE_CACHE_TTL
+)
+register_metrics("client_registry", lambda: client_registry.stats)
+invalidation_bus.subscribe(InvalidationEventType.client, client_registry.on_client_changed)
+invalidation_bus.subscribe_reset(client_registry.on_reset)
@@ -0,0 +1,117 @@
+from asyncio import Semaphore, get_running_loop, wait_for, TimeoutError as AsyncioTimeoutError
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from typing import Any, Callable, Literal
+
+from traveling_sso.shared.schemas.exceptions import service_overloaded_exception
+from ..config import settings
+from ..shared.metrics import register_metrics
+
+
+@dataclass
+class CryptoExecutorStats:
+    running: int = 0
+    queued: int = 0
+    max_queued: int = 0
+    completed: int = 0
+    rejected: int = 0
+    max_workers: int = 0
+    max_queue_size: int = 0
+
+
+class CryptoExecutor:
+    """
+        Bounded executor for the CPU-bound crypto operations (signing, verification, key generation),
+        so they don't block the event loop.
+
+        At most `max_workers + max_queue_size` calls are admitted, the rest wait for a slot up to `queue_timeout`
+        seconds and then are rejected with `service_overloaded_exception`.
+    """
+
+    def __init__(
+            self,
+            *,
+            kind: Literal["thread", "process", "inline"],
+            max_workers: int,
+            max_queue_size: int,
+            queue_timeout: float
+    ):
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout
+
+        self._executor: Executor | None = None
+        self._slots: Semaphore | None = None
+        self._slots_loop = None
+        self._active = 0
+        self._max_queued = 0
+        self._completed = 0
+        self._rejected = 0
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """
+            Run `func(*args)` in the executor, for the process executor the function and the arguments must be picklable.
+        """
+        if self.kind == "inline":
+            return func(*args)
+
+        slots = self._get_slots()
+        try:
+            await wait_for(slots.acquire(), self.queue_timeout)
+        except AsyncioTimeoutError as error:
+            self._rejected += 1
+            raise service_overloaded_exception from error
+
+        self._active += 1
+        self._max_queued = max(self._max_queued, self._active - self.max_workers)
+        try:
+            return await get_running_loop().run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._active -= 1
+            self._completed += 1
+            slots.release()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def stats(self) -> CryptoExecutorStats:
+        return CryptoExecutorStats(
+            running=min(self._active, self.max_workers),
+            queued=max(self._active - self.max_workers, 0),
+            max_queued=self._max_queued,
+            completed=self._completed,
+            rejected=self._rejected,
+            max_workers=self.max_workers,
+            max_queue_size=self.max_queue_size
+        )
+
+    def _get_slots(self) -> Semaphore:
+        loop = get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = Semaphore(self.max_workers + self.max_queue_size)
+            self._slots_loop = loop
+
+        return self._slots
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=get_context("spawn"))
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sso-crypto")
+
+        return self._executor
+
+
+crypto_executor = CryptoExecutor(
+    kind=settings.CRYPTO_EXECUTOR,
+    max_workers=settings.CRYPTO_EXECUTOR_MAX_WORKERS,
+    max_queue_size=settings.CRYPTO_EXECUTOR_MAX_QUEUE_SIZE,
+    queue_timeout=settings.CRYPTO_EXECUTOR_QUEUE_TIMEOUT
+)
+register_metrics("crypto_executor", lambda: crypto_executor.stats)
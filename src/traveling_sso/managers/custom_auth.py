@@ -1,13 +1,10 @@
 from uuid import UUID
 
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from traveling_sso.shared.schemas.exceptions.templates import auth_refresh_token_no_valid_exception
 from traveling_sso.shared.schemas.exceptions import (
     user_conflict_exception,
-    user_not_specified_exception,
-    SsoException
+    user_not_specified_exception
 )
 from traveling_sso.shared.schemas.protocol import (
     InternalCreateUserRequestSchema,
@@ -16,14 +13,12 @@ from traveling_sso.shared.schemas.protocol import (
     TokenType
 )
 from . import (
-    get_user_by_id,
+    find_user_by_identifier,
     create_or_update_user,
     get_client_by_client_id,
     create_token_session,
-    get_token_session_by_refresh_token,
-    update_refresh_token
+    rotate_refresh_token
 )
-from ..database.models import User
 
 
 class CustomAuthManager:
@@ -51,35 +46,16 @@ class CustomAuthManager:
             session: AsyncSession,
             refresh_token: UUID | str
     ) -> TokenResponseSchema:
-        token = await get_token_session_by_refresh_token(
+        return await rotate_refresh_token(
             session=session,
             refresh_token=str(refresh_token)
         )
-        try:
-            client = await get_client_by_client_id(
-                session=session,
-                client_id=token.client_id
-            )
-            user = await get_user_by_id(
-                session=session,
-                user_id=token.user_id
-            )
-        except SsoException as error:
-            raise auth_refresh_token_no_valid_exception from error
-
-        return await update_refresh_token(
-            session=session,
-            token=token,
-            client=client,
-            user=user
-        )
 
     async def signup(self) -> TokenResponseSchema | None:
         assert self.email is not None and self.password is not None, \
             "To signup, you need to specify your email address and password."
 
-        query = select(User).where(User.email == self.email)
-        user = (await self.session.execute(query)).scalar()
+        user = await find_user_by_identifier(session=self.session, identifier=self.email)
         if user is not None:
             raise user_conflict_exception
 
@@ -109,8 +85,7 @@ class CustomAuthManager:
     async def signin(self) -> TokenResponseSchema:
         assert self.client_id is not None, "Requires client id to signin a user."
 
-        query = select(User).where(User.email == self.email)
-        user: User = (await self.session.execute(query)).scalar()
+        user = await find_user_by_identifier(session=self.session, identifier=self.email or self.username)
         if user is None or not user.check_password(self.password):
             raise user_not_specified_exception
 
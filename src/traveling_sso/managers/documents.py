@@ -1,6 +1,7 @@
+from functools import partial
 from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import select, bindparam
 from sqlalchemy.exc import DatabaseError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -17,21 +18,32 @@ from traveling_sso.shared.schemas.exceptions import (
     foreign_passport_rf_not_specified_exception,
     passport_rf_already_exists_exception
 )
-from .user import add_passport_rf, add_foreign_passport_rf
+from .caches import documents_cache, invalidate_user_caches
+from .invalidation import InvalidationEventType, publish_invalidation
+from .user import add_passport_rf, add_foreign_passport_rf, select_user_with_documents
+from ..cache import cached
+from ..database.core import call_after_commit
 from ..database.models import PassportRf, User, ForeignPassportRf
 from ..shared.schemas.exceptions.templates import foreign_passport_rf_already_exists_exception
 
 
+_select_passport_rf_by_user_id = (select(PassportRf)
+                                  .join(User, User.passport_rf_id == PassportRf.id)
+                                  .where(User.id == bindparam("user_id")))
+_select_passport_rf_by_id = select(PassportRf).where(PassportRf.id == bindparam("passport_id"))
+_select_foreign_passport_rf_by_user_id = (select(ForeignPassportRf)
+                                          .join(User, User.foreign_passport_rf_id == ForeignPassportRf.id)
+                                          .where(User.id == bindparam("user_id")))
+_select_foreign_passport_rf_by_id = select(ForeignPassportRf).where(ForeignPassportRf.id == bindparam("passport_id"))
+
+
+@cached(documents_cache, key=lambda *, session, user_id: str(user_id))
 async def get_all_documents_by_user_id(*, session: AsyncSession, user_id) -> dict:
-    passport = await _get_passport_rf_by_user_id(session, user_id)
-    passport_foreign = await _get_foreign_passport_rf_by_user_id(session, user_id)
+    user = (await session.execute(select_user_with_documents(user_id))).scalar()
+    if user is None:
+        return {"passport_rf": None, "foreign_passport_rf": None}
 
-    res = {"passport_rf": None, "foreign_passport_rf": None}
-    if passport is not None:
-        res["passport_rf"] = passport.to_schema()
-    if passport_foreign is not None:
-        res["foreign_passport_rf"] = passport_foreign.to_schema()
-    return res
+    return user.to_documents_schema()
 
 
 async def get_passport_rf_by_user_id(*, session: AsyncSession, user_id) -> PassportRfSchema | None:
@@ -42,17 +54,13 @@ async def get_passport_rf_by_user_id(*, session: AsyncSession, user_id) -> Passp
 
 
 async def _get_passport_rf_by_user_id(session: AsyncSession, user_id):
-    query = (select(PassportRf)
-             .join(User, User.passport_rf_id == PassportRf.id)
-             .where(User.id == str(user_id)))
-    passport = (await session.execute(query)).scalar()
+    passport = (await session.execute(_select_passport_rf_by_user_id, {"user_id": str(user_id)})).scalar()
 
     return passport
 
 
 async def _get_passport_rf_by_id(session: AsyncSession, passport_id):
-    query = select(PassportRf).where(PassportRf.id == passport_id)
-    passport = (await session.execute(query)).scalar()
+    passport = (await session.execute(_select_passport_rf_by_id, {"passport_id": passport_id})).scalar()
 
     return passport
 
@@ -65,17 +73,13 @@ async def get_foreign_passport_rf_by_user_id(*, session: AsyncSession, user_id)
 
 
 async def _get_foreign_passport_rf_by_user_id(session: AsyncSession, user_id):
-    query = (select(ForeignPassportRf)
-             .join(User, User.foreign_passport_rf_id == ForeignPassportRf.id)
-             .where(User.id == str(user_id)))
-    passport = (await session.execute(query)).scalar()
+    passport = (await session.execute(_select_foreign_passport_rf_by_user_id, {"user_id": str(user_id)})).scalar()
 
     return passport
 
 
 async def _get_foreign_passport_rf_by_id(session: AsyncSession, passport_id):
-    query = select(ForeignPassportRf).where(ForeignPassportRf.id == passport_id)
-    passport = (await session.execute(query)).scalar()
+    passport = (await session.execute(_select_foreign_passport_rf_by_id, {"passport_id": passport_id})).scalar()
 
     return passport
 
@@ -211,6 +215,9 @@ async def update_passport_rf(
         await session.flush()
     except DatabaseError as error:
         raise passport_rf_not_specified_exception from error
+    await publish_invalidation(session=session, type=InvalidationEventType.user, key=user_id)
+    call_after_commit(session, partial(invalidate_user_caches, user_id))
+
     return passport.to_schema()
 
 
@@ -231,4 +238,7 @@ async def update_foreign_passport_rf(
         await session.flush()
     except DatabaseError as error:
         raise foreign_passport_rf_not_specified_exception from error
+    await publish_invalidation(session=session, type=InvalidationEventType.user, key=user_id)
+    call_after_commit(session, partial(invalidate_user_caches, user_id))
+
     return passport.to_schema()
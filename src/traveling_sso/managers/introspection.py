@@ -0,0 +1,102 @@
+from asyncio import gather
+
+from sqlalchemy import select
+from sqlalchemy.orm import defer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from traveling_sso.shared.schemas.exceptions import SsoException, service_overloaded_exception
+from traveling_sso.shared.schemas.protocol import IntrospectResultSchema, UserSessionSchema
+from ..database.models import Client, User
+from .client_registry import client_registry
+from .session_cache import get_cached_user_session, cache_user_session, is_session_revoked
+from .token import JWTClaims, SigningClient, split_access_token, validate_access_token
+
+
+async def introspect_access_tokens(*, session: AsyncSession, access_tokens: list[str]) -> list[IntrospectResultSchema]:
+    """
+        Validate a batch of access tokens: the clients missing in the registry and the users are loaded
+        with one query each, the signatures are verified concurrently. The tokens already validated are taken from the cache.
+        The tokens of the revoked sessions are inactive.
+        :return: results in the order of `access_tokens`
+    """
+    results: list[IntrospectResultSchema | None] = [None] * len(access_tokens)
+    for i, access_token in enumerate(access_tokens):
+        cached = get_cached_user_session(access_token)
+        if cached is not None:
+            if await is_session_revoked(cached[0].session_id):
+                results[i] = IntrospectResultSchema(active=False)
+            else:
+                results[i] = IntrospectResultSchema(active=True, user=cached[0], exp=cached[1])
+    split_tokens = [
+        _split_access_token(access_token) if result is None else None
+        for access_token, result in zip(access_tokens, results)
+    ]
+
+    client_ids = {split_token[0] for split_token in split_tokens if split_token is not None}
+    clients = {}
+    for client_id in client_ids:
+        client = client_registry.get(client_id, with_private_secret=False)
+        if client is not None:
+            clients[client_id] = client
+    client_ids = {client_id for client_id in client_ids - clients.keys() if not client_registry.is_unknown(client_id)}
+    if client_ids:
+        query = (select(Client)
+                 .where(Client.client_id.in_(client_ids))
+                 .options(defer(Client.client_private_secret, raiseload=True)))
+        clients.update((client.client_id, client) for client in (await session.execute(query)).scalars())
+        for client_id in client_ids - clients.keys():
+            client_registry.mark_unknown(client_id)
+
+    decoded_tokens = await gather(*(
+        _validate_access_token(clients.get(split_token[0]), split_token[1]) if split_token is not None else _inactive()
+        for split_token in split_tokens
+    ))
+    decoded_tokens = [
+        decode_token if decode_token is not None and not await is_session_revoked(decode_token["session_id"]) else None
+        for decode_token in decoded_tokens
+    ]
+
+    user_ids = {decode_token["sub"] for decode_token in decoded_tokens if decode_token is not None}
+    users = {}
+    if user_ids:
+        query = select(User).where(User.id.in_(user_ids))
+        users = {str(user.id): user.to_schema() for user in (await session.execute(query)).scalars()}
+
+    for i, decode_token in enumerate(decoded_tokens):
+        if results[i] is not None:
+            continue
+        user_schema = users.get(decode_token["sub"]) if decode_token is not None else None
+        if user_schema is None:
+            results[i] = IntrospectResultSchema(active=False)
+            continue
+        user_session = UserSessionSchema(
+            **user_schema.model_dump(),
+            session_id=decode_token["session_id"],
+            client_id=decode_token["aud"]
+        )
+        cache_user_session(access_tokens[i], user_session, decode_token["exp"])
+        results[i] = IntrospectResultSchema(active=True, user=user_session, exp=decode_token["exp"])
+
+    return results
+
+
+def _split_access_token(access_token: str) -> tuple[str, str] | None:
+    try:
+        return split_access_token(access_token)
+    except SsoException:
+        return None
+
+
+async def _validate_access_token(client: SigningClient | None, jwt_token: str) -> JWTClaims | None:
+    if client is None:
+        return None
+    try:
+        return await validate_access_token(client=client, jwt_token=jwt_token)
+    except SsoException as error:
+        if error is service_overloaded_exception:
+            raise
+        return None
+
+
+async def _inactive() -> None:
+    return None
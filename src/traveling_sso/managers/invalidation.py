@@ -0,0 +1,262 @@
+from asyncio import Event, Task, create_task, sleep, wait_for, TimeoutError as AsyncioTimeoutError
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import StrEnum
+from json import loads
+from logging import getLogger
+from typing import Callable
+
+from asyncpg import Connection, connect
+from sqlalchemy import select, insert, delete, bindparam
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database.core import get_session, read_engine
+from ..database.models import InvalidationEvent
+from ..database.utils import utcnow
+from ..shared.metrics import register_metrics
+
+logger = getLogger(settings.LOGGER_NAME)
+
+# the channel of the `invalidation_event_notify` trigger
+INVALIDATION_EVENTS_CHANNEL = "invalidation_events"
+
+
+class InvalidationEventType(StrEnum):
+    user = "user"  # key — user_id, the user data and the sessions of the user
+    session = "session"  # key — session_id, the revoked session
+    user_sessions = "user_sessions"  # key — user_id, the sessions of the user were revoked
+    client = "client"  # key — client_id, published by the trigger of the `client` table
+
+
+@dataclass(frozen=True)
+class Invalidation:
+    id: int
+    type: InvalidationEventType
+    key: str
+    created_at: datetime
+
+
+InvalidationHandler = Callable[[Invalidation], None]
+ResetHandler = Callable[[], None]
+
+_insert_event = insert(InvalidationEvent).values(type=bindparam("type"), key=bindparam("key"))
+_select_events_since = (select(InvalidationEvent.id,
+                               InvalidationEvent.type,
+                               InvalidationEvent.key,
+                               InvalidationEvent.created_at)
+                        .where(InvalidationEvent.created_at > bindparam("since"))
+                        .order_by(InvalidationEvent.id))
+_delete_events_before = delete(InvalidationEvent).where(InvalidationEvent.created_at < bindparam("before"))
+
+
+async def publish_invalidation(*, session: AsyncSession, type: InvalidationEventType, key):
+    """
+        Publish the change to all the nodes, in the transaction of the change:
+        the nodes get the event only after the commit and never after a rollback.
+        The node that made the change evicts its own caches right away.
+    """
+    await session.execute(_insert_event, {"type": str(type), "key": str(key)})
+
+
+async def publish_invalidations(*, session: AsyncSession, type: InvalidationEventType, keys: list):
+    """
+        Publish the changes of many entities of the type with one statement, see `publish_invalidation`.
+    """
+    if keys:
+        await session.execute(_insert_event, [{"type": str(type), "key": str(key)} for key in keys])
+
+
+@dataclass
+class InvalidationBusStats:
+    received: int = 0
+    replayed: int = 0
+    resets: int = 0
+    reconnects: int = 0
+    errors: int = 0
+
+
+class InvalidationBus:
+    """
+        Applies the invalidation events of all the nodes to the caches of the current process.
+
+        The events are received by LISTEN on the dedicated connection. After a reconnect the events
+        since the last received one (minus `replay_margin` seconds for the transactions committed late)
+        are replayed from the table, if they could be already deleted (older than `retention`),
+        the reset handlers drop the caches entirely. The handlers must be idempotent,
+        an event can be applied more than once.
+    """
+
+    def __init__(
+            self,
+            *,
+            enabled: bool,
+            retry_interval: float,
+            replay_margin: float,
+            retention: float,
+            cleanup_interval: float
+    ):
+        self.enabled = enabled
+        self.retry_interval = retry_interval
+        self.replay_margin = replay_margin
+        self.retention = retention
+        self.cleanup_interval = cleanup_interval
+
+        self._handlers: dict[InvalidationEventType, list[InvalidationHandler]] = defaultdict(list)
+        self._reset_handlers: list[ResetHandler] = []
+        self._task: Task | None = None
+        self._connection: Connection | None = None
+        self._connection_lost = Event()
+        # created_at of the last received event or the time of the subscription, the replay starts from it
+        self._received_until: datetime | None = None
+
+        self._received = 0
+        self._replayed = 0
+        self._resets = 0
+        self._reconnects = 0
+        self._errors = 0
+
+    def subscribe(self, type: InvalidationEventType, handler: InvalidationHandler):
+        self._handlers[type].append(handler)
+
+    def subscribe_reset(self, handler: ResetHandler):
+        """
+            Register the handler dropping the whole cache, called when the missed events can't be replayed.
+        """
+        self._reset_handlers.append(handler)
+
+    async def start(self):
+        if self.enabled and self._task is None:
+            await self._listen()
+            self._task = create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self._close()
+        self._received_until = None
+
+    @property
+    def stats(self) -> InvalidationBusStats:
+        return InvalidationBusStats(
+            received=self._received,
+            replayed=self._replayed,
+            resets=self._resets,
+            reconnects=self._reconnects,
+            errors=self._errors
+        )
+
+    async def replay(self):
+        """
+            Apply the events since the last received one, or reset the caches if they are too old.
+        """
+        since = self._received_until - timedelta(seconds=self.replay_margin)
+        if since < utcnow() - timedelta(seconds=self.retention):
+            self._reset()
+            return
+
+        async with read_engine.connect() as connection:
+            rows = (await connection.execute(_select_events_since, {"since": since})).all()
+        for row in rows:
+            self._replayed += 1
+            self._apply(Invalidation(id=row.id, type=InvalidationEventType(row.type), key=row.key,
+                                     created_at=row.created_at))
+
+    async def cleanup(self) -> int:
+        """
+            Delete the events older than `retention`, any node can do it.
+            :return: count of the deleted events
+        """
+        async with get_session() as session:
+            async with session.begin():
+                result = await session.execute(
+                    _delete_events_before,
+                    {"before": utcnow() - timedelta(seconds=self.retention)}
+                )
+
+        return result.rowcount
+
+    async def _run(self):
+        while True:
+            try:
+                if self._connection is None or self._connection.is_closed():
+                    self._reconnects += 1
+                    await self._listen()
+                    await self.replay()
+                try:
+                    await wait_for(self._connection_lost.wait(), self.cleanup_interval)
+                except AsyncioTimeoutError:
+                    # the connection could be silently lost without the termination
+                    await self._connection.execute("SELECT 1")
+                    await self.cleanup()
+            except Exception as error:
+                self._errors += 1
+                logger.error(error, exc_info=error)
+                await self._close()
+                await sleep(self.retry_interval)
+
+    async def _listen(self):
+        url = make_url(settings.get_db_url())
+        self._connection_lost.clear()
+        self._connection = await connect(**url.translate_connect_args(username="user"), **url.query)
+        self._connection.add_termination_listener(lambda connection: self._connection_lost.set())
+        await self._connection.add_listener(INVALIDATION_EVENTS_CHANNEL, self._on_notification)
+        if self._received_until is None:
+            # the first subscription, nothing to replay
+            self._received_until = await self._connection.fetchval("SELECT now()")
+
+    async def _close(self):
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            try:
+                await connection.close(timeout=self.retry_interval)
+            except Exception:
+                connection.terminate()
+
+    def _on_notification(self, connection, pid, channel, payload: str):
+        self._received += 1
+        try:
+            event = loads(payload)
+            invalidation = Invalidation(
+                id=event["id"],
+                type=InvalidationEventType(event["type"]),
+                key=event["key"],
+                created_at=datetime.fromisoformat(event["created_at"])
+            )
+        except (ValueError, KeyError, TypeError) as error:
+            self._errors += 1
+            logger.error(f"The invalidation event `{payload}` isn't valid: {error}")
+            return
+        self._apply(invalidation)
+
+    def _apply(self, invalidation: Invalidation):
+        self._received_until = max(self._received_until, invalidation.created_at)
+        for handler in self._handlers[invalidation.type]:
+            try:
+                handler(invalidation)
+            except Exception as error:
+                self._errors += 1
+                logger.error(error, exc_info=error)
+
+    def _reset(self):
+        self._resets += 1
+        self._received_until = utcnow()
+        for handler in self._reset_handlers:
+            try:
+                handler()
+            except Exception as error:
+                self._errors += 1
+                logger.error(error, exc_info=error)
+
+
+invalidation_bus = InvalidationBus(
+    enabled=settings.INVALIDATION_BUS_ENABLED,
+    retry_interval=settings.INVALIDATION_BUS_RETRY_INTERVAL,
+    replay_margin=settings.INVALIDATION_BUS_REPLAY_MARGIN,
+    retention=settings.INVALIDATION_BUS_RETENTION,
+    cleanup_interval=settings.INVALIDATION_BUS_CLEANUP_INTERVAL
+)
+register_metrics("invalidation_bus", lambda: invalidation_bus.stats)
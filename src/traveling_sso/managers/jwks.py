@@ -0,0 +1,105 @@
+from asyncio import Lock
+from dataclasses import dataclass
+from hashlib import sha256
+from json import dumps
+from logging import getLogger
+from time import monotonic
+
+from sqlalchemy import select
+from sqlalchemy.orm import defer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from traveling_sso.shared.schemas.protocol import ClientAlgorithm
+from ..config import settings
+from ..database.models import Client
+from .token import get_client_public_key, get_client_kid
+
+logger = getLogger(settings.LOGGER_NAME)
+
+
+@dataclass(frozen=True)
+class WellKnownDocument:
+    """
+        Precomputed JSON body of a `/.well-known/*` document with its strong ETag.
+    """
+
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_content(cls, content: dict) -> "WellKnownDocument":
+        body = dumps(content, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        return cls(body=body, etag=f'"{sha256(body).hexdigest()[:32]}"')
+
+
+_jwks: WellKnownDocument | None = None
+_jwks_built_at: float = 0
+# bumped by the invalidation, a build started before it doesn't store its result
+_jwks_generation: int = 0
+_jwks_lock = Lock()
+_openid_configuration: WellKnownDocument | None = None
+
+
+async def get_jwks(*, session: AsyncSession) -> WellKnownDocument:
+    """
+        JSON Web Key Set with the public keys of all clients.
+        Built once and kept in memory for `JWKS_CACHE_MAX_AGE` or until a client is changed.
+    """
+    global _jwks, _jwks_built_at
+
+    jwks = _jwks
+    if jwks is not None and monotonic() - _jwks_built_at < settings.JWKS_CACHE_MAX_AGE:
+        return jwks
+
+    async with _jwks_lock:
+        if _jwks is not None and monotonic() - _jwks_built_at < settings.JWKS_CACHE_MAX_AGE:
+            return _jwks
+
+        generation = _jwks_generation
+        query = select(Client).options(defer(Client.client_private_secret, raiseload=True))
+        keys = []
+        for client in (await session.execute(query)).scalars():
+            try:
+                key = get_client_public_key(client)
+            except (ValueError, KeyError) as error:
+                logger.error(f"The public key of the client `{client.client_id}` isn't valid: {error}")
+                continue
+            keys.append(key.as_dict(kid=get_client_kid(client), alg=client.alg, use="sig"))
+        keys.sort(key=lambda jwk: jwk["kid"])
+
+        jwks = WellKnownDocument.from_content({"keys": keys})
+        if generation == _jwks_generation:
+            _jwks = jwks
+            _jwks_built_at = monotonic()
+
+    return jwks
+
+
+def invalidate_jwks():
+    global _jwks, _jwks_generation
+
+    _jwks = None
+    _jwks_generation += 1
+
+
+def get_openid_configuration() -> WellKnownDocument:
+    """
+        OpenID Provider Metadata, depends only on the settings.
+    """
+    global _openid_configuration
+
+    if _openid_configuration is None:
+        issuer = settings.SSO_ISSUERS[0]
+        _openid_configuration = WellKnownDocument.from_content({
+            "issuer": issuer,
+            "jwks_uri": f"{issuer}/.well-known/jwks.json",
+            "token_endpoint": f"{issuer}{settings.API_V1_STR}/auth/signin",
+            "userinfo_endpoint": f"{issuer}{settings.API_V1_STR}/user/me/info",
+            "revocation_endpoint": f"{issuer}{settings.API_V1_STR}/auth/session/revoke",
+            "response_types_supported": ["token"],
+            "subject_types_supported": ["public"],
+            "id_token_signing_alg_values_supported": [str(alg) for alg in ClientAlgorithm],
+            "claims_supported": ["iss", "sub", "aud", "exp", "iat", "jti", "user_role", "session_id"]
+        })
+
+    return _openid_configuration
@@ -0,0 +1,228 @@
+from asyncio import Event, Task, create_task, wait_for, TimeoutError as AsyncioTimeoutError
+from base64 import urlsafe_b64encode
+from dataclasses import dataclass
+from hashlib import sha256
+from logging import getLogger
+
+from authlib.jose import RSAKey, ECKey, OKPKey
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import serialization
+from sqlalchemy import select, delete, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from traveling_sso.shared.schemas.protocol import ClientAlgorithm
+from ..config import settings
+from ..database.core import get_session
+from ..database.models import ClientKeyPool
+from ..shared.metrics import register_metrics
+from .crypto import crypto_executor
+
+logger = getLogger(settings.LOGGER_NAME)
+
+# key pairs generated before each insert, a failed generation loses at most one batch
+_REFILL_BATCH_SIZE = 8
+
+
+@dataclass
+class ClientKeyPoolStats:
+    target_size: int = 0
+    size: int = 0  # counted on the last refill
+    popped: int = 0
+    missed: int = 0
+    generated: int = 0
+
+
+class ClientKeysPool:
+    """
+        Pool of the pre-generated client key pairs persisted in the database,
+        so the creation of a client doesn't wait for the key generation.
+
+        The background worker refills the pool to `size` when it falls below `size * refill_watermark`.
+        The key pairs are generated outside of the transactions and inserted in small batches,
+        the count and the insert of a batch are serialized between the nodes by the advisory lock.
+        The private keys are encrypted at rest with the key derived from `secret`.
+    """
+
+    def __init__(
+            self,
+            *,
+            size: int,
+            refill_watermark: float,
+            check_interval: float,
+            secret: str | None,
+            alg: str
+    ):
+        self.size = size
+        self.refill_watermark = refill_watermark
+        self.check_interval = check_interval
+        self.alg = str(alg)
+        self._fernet = Fernet(urlsafe_b64encode(sha256(secret.encode("utf-8")).digest())) if secret else None
+
+        self._refill_event = Event()
+        self._task: Task | None = None
+        self._size = 0
+        self._popped = 0
+        self._missed = 0
+        self._generated = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0 and self._fernet is not None
+
+    async def pop(self, *, session: AsyncSession) -> tuple[str, str] | None:
+        """
+            Take a key pair out of the pool.
+            :return: tuple[<public key PEM>, <private key PEM>] or None if the pool is empty
+        """
+        candidate = (select(ClientKeyPool.id)
+                     .where(ClientKeyPool.alg == self.alg)
+                     .order_by(ClientKeyPool.created_at)
+                     .limit(1)
+                     .with_for_update(skip_locked=True)
+                     .scalar_subquery())
+        query = (delete(ClientKeyPool)
+                 .where(ClientKeyPool.id == candidate)
+                 .returning(ClientKeyPool.client_public_secret, ClientKeyPool.encrypted_client_private_secret))
+        row = (await session.execute(query)).first()
+        self._refill_event.set()
+        if row is None:
+            self._missed += 1
+            return None
+
+        self._popped += 1
+        return row[0], self._fernet.decrypt(row[1].encode("utf-8")).decode("utf-8")
+
+    async def count(self, *, session: AsyncSession) -> int:
+        query = select(func.count(ClientKeyPool.id)).where(ClientKeyPool.alg == self.alg)
+        return (await session.execute(query)).scalar()
+
+    async def refill(self) -> int:
+        """
+            Generate the missing key pairs if the pool is below the watermark.
+            :return: count of the key pairs added to the pool
+        """
+        generated = 0
+        async with get_session() as session:
+            self._size = await self.count(session=session)
+        if self._size >= self.size * self.refill_watermark:
+            return generated
+
+        missing = self.size - self._size
+        while missing > 0:
+            keys = [
+                await crypto_executor.run(generate_pair_secrets_keys, self.alg)
+                for _ in range(min(missing, _REFILL_BATCH_SIZE))
+            ]
+            inserted, missing = await self._insert(keys)
+            generated += inserted
+            self._generated += inserted
+
+        return generated
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._refill_event.set()
+            self._task = create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def stats(self) -> ClientKeyPoolStats:
+        return ClientKeyPoolStats(
+            target_size=self.size,
+            size=self._size,
+            popped=self._popped,
+            missed=self._missed,
+            generated=self._generated
+        )
+
+    async def _insert(self, keys: list[tuple[str, str]]) -> tuple[int, int]:
+        """
+            Add the key pairs up to `size`, the ones refilled by another node meanwhile are dropped.
+            :return: tuple[<count of the inserted key pairs>, <count of the still missing key pairs>]
+        """
+        async with get_session() as session:
+            async with session.begin():
+                await session.execute(text("SELECT pg_advisory_xact_lock(hashtext('client_key_pool'))"))
+                missing = self.size - await self.count(session=session)
+                keys = keys[:max(missing, 0)]
+                session.add_all(
+                    ClientKeyPool(
+                        alg=self.alg,
+                        client_public_secret=public_secret,
+                        encrypted_client_private_secret=self._fernet.encrypt(private_secret.encode("utf-8")).decode("utf-8")
+                    )
+                    for public_secret, private_secret in keys
+                )
+        self._size = self.size - missing + len(keys)
+
+        return len(keys), missing - len(keys)
+
+    async def _run(self):
+        while True:
+            try:
+                await wait_for(self._refill_event.wait(), self.check_interval)
+            except AsyncioTimeoutError:
+                pass
+            self._refill_event.clear()
+            try:
+                await self.refill()
+            except Exception as error:
+                logger.error(error, exc_info=error)
+
+
+client_keys_pool = ClientKeysPool(
+    size=settings.CLIENT_KEY_POOL_SIZE,
+    refill_watermark=settings.CLIENT_KEY_POOL_REFILL_WATERMARK,
+    check_interval=settings.CLIENT_KEY_POOL_CHECK_INTERVAL,
+    secret=settings.CLIENT_KEY_POOL_SECRET,
+    alg=settings.CLIENT_DEFAULT_ALGORITHM
+)
+register_metrics("client_keys_pool", lambda: client_keys_pool.stats)
+
+
+async def get_pair_secrets_keys(*, session: AsyncSession, alg: ClientAlgorithm | str) -> tuple[str, str]:
+    """
+        Key pair for a new client: from the pool if possible, otherwise generated in the crypto executor.
+        :return: tuple[<public key PEM>, <private key PEM>]
+    """
+    if client_keys_pool.enabled and str(alg) == client_keys_pool.alg:
+        keys = await client_keys_pool.pop(session=session)
+        if keys is not None:
+            return keys
+
+    return await crypto_executor.run(generate_pair_secrets_keys, str(alg))
+
+
+def generate_pair_secrets_keys(alg: ClientAlgorithm | str | None = None) -> tuple[str, str]:
+    """
+        Generate a key pair for the signing algorithm of the client.
+        :return: tuple[<public key PEM>, <private key PEM>]
+    """
+    match alg or settings.CLIENT_DEFAULT_ALGORITHM:
+        case ClientAlgorithm.RS512:
+            key = RSAKey.generate_key(settings.CLIENT_SECRET_KEY_SIZE, is_private=True)
+        case ClientAlgorithm.ES256:
+            key = ECKey.generate_key("P-256", is_private=True)
+        case ClientAlgorithm.EdDSA:
+            key = OKPKey.generate_key("Ed25519", is_private=True)
+        case _:
+            raise ValueError(f"The client algorithm `{alg}` isn't supported.")
+    public_key = key.get_public_key()
+    private_key = key.get_private_key()
+
+    private_key_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+
+    public_key_pem = public_key.public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+
+    return public_key_pem.decode("utf-8"), private_key_pem.decode("utf-8")
@@ -0,0 +1,132 @@
+from asyncio import Task, create_task, sleep
+from dataclasses import dataclass
+from logging import getLogger
+from time import time
+
+from sqlalchemy import select, bindparam
+
+from ..config import settings
+from ..database.core import read_engine
+from ..database.models import TokenSession
+from ..shared.metrics import register_metrics
+from .invalidation import Invalidation, InvalidationEventType, invalidation_bus
+from .session_cache import register_session_revocation_check
+
+logger = getLogger(settings.LOGGER_NAME)
+
+_select_revoked_sessions_since = (select(TokenSession.id, TokenSession.refresh_token_revoked_at)
+                                  .where(TokenSession.refresh_token_revoked_at > bindparam("since")))
+
+
+@dataclass
+class RevokedSessionsStats:
+    size: int = 0
+    rejected: int = 0
+
+
+class RevokedSessions:
+    """
+        Sessions revoked within the lifetime of an access token, the access tokens of a revoked session
+        are rejected without the database.
+
+        Seeded from `token_session.refresh_token_revoked_at` on start and kept up to date by the revocations
+        of the current process and the session events of the invalidation bus.
+        A session is kept for `ttl` seconds after the revocation, the access tokens issued before it expire by then.
+    """
+
+    def __init__(self, *, ttl: int, purge_interval: float):
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+
+        self._revoked_until: dict[str, float] = {}
+        self._task: Task | None = None
+        self._background_tasks: set[Task] = set()
+        self._rejected = 0
+
+    def add(self, session_id, revoked_at: float | None = None):
+        revoked_until = (time() if revoked_at is None else revoked_at) + self.ttl
+        session_id = str(session_id)
+        if revoked_until > self._revoked_until.get(session_id, 0):
+            self._revoked_until[session_id] = revoked_until
+
+    def is_revoked(self, session_id: str) -> bool:
+        revoked_until = self._revoked_until.get(session_id)
+        if revoked_until is None or revoked_until <= time():
+            return False
+
+        self._rejected += 1
+        return True
+
+    def purge(self) -> int:
+        """
+            Drop the sessions whose access tokens have expired.
+            :return: count of the dropped sessions
+        """
+        now = time()
+        expired = [session_id for session_id, revoked_until in self._revoked_until.items() if revoked_until <= now]
+        for session_id in expired:
+            del self._revoked_until[session_id]
+
+        return len(expired)
+
+    async def load(self):
+        """
+            Add the sessions revoked within `ttl` seconds, merged with the ones already known.
+        """
+        async with read_engine.connect() as connection:
+            rows = (await connection.execute(_select_revoked_sessions_since, {"since": int(time()) - self.ttl})).all()
+        for session_id, revoked_at in rows:
+            self.add(session_id, revoked_at)
+
+    async def start(self):
+        if self._task is None:
+            await self.load()
+            self._task = create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in self._background_tasks:
+            task.cancel()
+
+    def on_session_revoked(self, invalidation: Invalidation):
+        """
+            Handler of the session invalidation events, published only by the revocations.
+        """
+        self.add(invalidation.key)
+
+    def on_reset(self):
+        """
+            Handler of the invalidation bus reset, the revocations were missed.
+        """
+        task = create_task(self.load())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_load_done)
+
+    @property
+    def stats(self) -> RevokedSessionsStats:
+        return RevokedSessionsStats(
+            size=len(self._revoked_until),
+            rejected=self._rejected
+        )
+
+    def _on_load_done(self, task: Task):
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(task.exception(), exc_info=task.exception())
+
+    async def _run(self):
+        while True:
+            await sleep(self.purge_interval)
+            self.purge()
+
+
+revoked_sessions = RevokedSessions(
+    ttl=settings.ACCESS_TOKEN_EXPIRES_IN,
+    purge_interval=settings.REVOKED_SESSIONS_PURGE_INTERVAL
+)
+register_metrics("revoked_sessions", lambda: revoked_sessions.stats)
+register_session_revocation_check(revoked_sessions.is_revoked)
+invalidation_bus.subscribe(InvalidationEventType.session, revoked_sessions.on_session_revoked)
+invalidation_bus.subscribe_reset(revoked_sessions.on_reset)
@@ -0,0 +1,111 @@
+from base64 import urlsafe_b64decode
+from hashlib import sha256
+from inspect import isawaitable
+from json import loads
+from typing import Awaitable, Callable
+
+from traveling_sso.shared.schemas.protocol import UserSessionSchema
+from ..cache import LRUCache
+from ..config import settings
+from ..database.utils import utcnow
+from ..shared.metrics import register_metrics
+from .invalidation import InvalidationEventType, invalidation_bus
+
+# key — (user_id, session_id, token hash), tagged by the user and by the session
+user_sessions_cache = LRUCache(
+    max_size=settings.INTROSPECTION_CACHE_MAX_SIZE,
+    ttl=settings.INTROSPECTION_CACHE_TTL,
+    tags=lambda cache_key: (("user", cache_key[0]), ("session", cache_key[1]))
+)
+register_metrics("user_sessions_cache", lambda: user_sessions_cache.stats)
+
+SessionRevocationCheck = Callable[[str], bool | Awaitable[bool]]
+_session_revocation_checks: list[SessionRevocationCheck] = []
+
+
+def get_cached_user_session(access_token: str) -> tuple[UserSessionSchema, int] | None:
+    """
+        Result of the access token validation cached by `cache_user_session`.
+        :return: tuple[<user session>, <expires of access token>] or None
+    """
+    if not settings.INTROSPECTION_CACHE_TTL:
+        return None
+    cache_key = _get_cache_key(access_token)
+    if cache_key is None:
+        return None
+
+    return user_sessions_cache.get(cache_key)
+
+
+def cache_user_session(access_token: str, user_session: UserSessionSchema, exp: int, *, valid_until: int | None = None):
+    """
+        Cache the result of the validation of the access token, the entry lives no longer than the token.
+        :param valid_until: Timestamp the entry must not outlive, if earlier than `exp`
+    """
+    expires_at = exp if valid_until is None else min(exp, valid_until)
+    ttl = min(settings.INTROSPECTION_CACHE_TTL, expires_at - int(utcnow().timestamp()))
+    if ttl <= 0:
+        return
+    cache_key = (str(user_session.id), str(user_session.session_id), _get_token_hash(access_token))
+    user_sessions_cache.set(cache_key, (user_session, exp), ttl=ttl)
+
+
+def evict_user_sessions(*, user_id=None, session_id=None) -> int:
+    """
+        Drop the cached access tokens of the user or of the session.
+        Call it after the commit, otherwise a concurrent request can cache the old rows again.
+        :return: count of the dropped entries
+    """
+    evicted = 0
+    if user_id is not None:
+        evicted += user_sessions_cache.evict_tag(("user", str(user_id)))
+    if session_id is not None:
+        evicted += user_sessions_cache.evict_tag(("session", str(session_id)))
+
+    return evicted
+
+
+invalidation_bus.subscribe(
+    InvalidationEventType.user,
+    lambda invalidation: evict_user_sessions(user_id=invalidation.key)
+)
+invalidation_bus.subscribe(
+    InvalidationEventType.session,
+    lambda invalidation: evict_user_sessions(session_id=invalidation.key)
+)
+invalidation_bus.subscribe_reset(user_sessions_cache.clear)
+
+
+def register_session_revocation_check(check: SessionRevocationCheck):
+    """
+        Register the check of the session revocation for the access tokens resolved without the database,
+        the check gets `session_id` and returns True if the session is revoked.
+    """
+    _session_revocation_checks.append(check)
+
+
+async def is_session_revoked(session_id) -> bool:
+    session_id = str(session_id)
+    for check in _session_revocation_checks:
+        is_revoked = check(session_id)
+        if isawaitable(is_revoked):
+            is_revoked = await is_revoked
+        if is_revoked:
+            return True
+
+    return False
+
+
+def _get_cache_key(access_token: str) -> tuple[str, str, bytes] | None:
+    # the claims are read without verification only to build the key,
+    # the hash of the whole token guarantees that only the verified token hits the entry
+    try:
+        payload = access_token.rsplit(".", 2)[1]
+        claims = loads(urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return str(claims["sub"]), str(claims["session_id"]), _get_token_hash(access_token)
+    except (IndexError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _get_token_hash(access_token: str) -> bytes:
+    return sha256(access_token.encode("utf-8")).digest()
@@ -1,23 +1,73 @@
+from datetime import datetime, timedelta
+from functools import lru_cache, partial
+from typing import Protocol
 from uuid import uuid4, UUID
 
-from authlib.jose import RSAKey, JWTClaims as _JWTClaims, JsonWebToken
-from authlib.jose.errors import JoseError
-from sqlalchemy import select, update, and_, or_
+from authlib.common.encoding import json_dumps, json_b64encode, urlsafe_b64encode
+from authlib.jose import RSAKey, ECKey, OKPKey, JWTClaims as _JWTClaims, JsonWebToken, JsonWebSignature
+from authlib.jose.rfc7517 import AsymmetricKey
+from authlib.jose.errors import JoseError, MissingClaimError, InvalidClaimError, ExpiredTokenError, InvalidTokenError
+from sqlalchemy import select, insert, update, and_, bindparam, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from sqlalchemy.sql.functions import count
-
-from traveling_sso.shared.schemas.protocol import TokenResponseSchema, UserSchema, UserRoleType, TokenSessionSchema
+from uuid_extensions import uuid7
+
+from traveling_sso.shared.schemas.protocol import (
+    TokenResponseSchema,
+    UserSchema,
+    UserSessionSchema,
+    UserRoleType,
+    TokenSessionSchema,
+    ClientAlgorithm
+)
 from traveling_sso.shared.schemas.exceptions.templates import (
     auth_access_token_no_valid_exception,
     auth_session_not_found_exception, auth_refresh_token_no_valid_exception
 )
+from ..cache import LRUCache, cached
 from ..config import settings
+from ..database.core import get_session, call_after_commit
 from ..database.models import Client, TokenSession, User
 from ..database.utils import utcnow
-
-__algorithm__ = "RS512"
+from ..shared.metrics import register_metrics
+from .caches import token_sessions_cache, invalidate_token_sessions_cache
+from .crypto import crypto_executor
+from .invalidation import InvalidationEventType, publish_invalidation, publish_invalidations
+from .revoked_sessions import revoked_sessions
+from .session_cache import evict_user_sessions
+
+__algorithm__ = str(ClientAlgorithm.RS512)
 __separator__ = ":"
-jwt = JsonWebToken([__algorithm__])
+jwt = JsonWebToken([str(alg) for alg in ClientAlgorithm])
+
+# a token is accepted only if it is signed with the algorithm of its client
+_jwt_by_alg = {str(alg): JsonWebToken([str(alg)]) for alg in ClientAlgorithm}
+_key_cls_by_alg: dict[str, type[AsymmetricKey]] = {
+    ClientAlgorithm.RS512: RSAKey,
+    ClientAlgorithm.ES256: ECKey,
+    ClientAlgorithm.EdDSA: OKPKey
+}
+
+
+class SigningClient(Protocol):
+    """
+        Attributes of a client used to sign and verify the tokens,
+        the `Client` model or the `ClientEntry` of the client registry.
+    """
+
+    client_id: str
+    client_private_secret: str | None
+    client_public_secret: str
+    alg: str
+    updated_at: datetime
+
+
+client_keys_cache = LRUCache(
+    max_size=settings.CLIENT_KEYS_CACHE_MAX_SIZE,
+    ttl=settings.CLIENT_KEYS_CACHE_TTL
+)
+register_metrics("client_keys_cache", lambda: client_keys_cache.stats)
 
 
 class JWTClaims(_JWTClaims):
@@ -36,20 +86,68 @@ class JWTClaims(_JWTClaims):
         "session_id": {"essential": True}
     }
 
+    _sso_essential_claims = tuple(claim for claim, option in _sso_options.items() if option.get("essential"))
+
     def __init__(self, payload, header, options=None, params=None):
-        options = options or {}
         super().__init__(
             payload,
             header,
             options={
                 **self._sso_options,
                 **options
-            },
+            } if options else self._sso_options,
             params=params
         )
 
+    def validate(self, now=None, leeway=0):
+        """
+            Fixed code path for the SSO options, same checks as the generic authlib validation.
+        """
+        if self.options is not self._sso_options:
+            return super().validate(now, leeway)
+        if now is None:
+            now = int(utcnow().timestamp())
+
+        for claim in self._sso_essential_claims:
+            if claim not in self:
+                raise MissingClaimError(claim)
+            if not self[claim]:
+                raise InvalidClaimError(claim)
+        if self.get("iss") != settings.SSO_ISSUERS:
+            raise InvalidClaimError("iss")
+
+        exp = self.get("exp")
+        if exp is not None:
+            if not isinstance(exp, (int, float)):
+                raise InvalidClaimError("exp")
+            if exp < now - leeway:
+                raise ExpiredTokenError()
+        nbf = self.get("nbf")
+        if nbf is not None:
+            if not isinstance(nbf, (int, float)):
+                raise InvalidClaimError("nbf")
+            if nbf > now + leeway:
+                raise InvalidTokenError()
+        iat = self["iat"]
+        if not isinstance(iat, (int, float)):
+            raise InvalidClaimError("iat")
+        if iat > now + leeway:
+            raise InvalidTokenError(description="The token is not valid as it was issued in the future")
+
     @classmethod
-    def factory_claims(cls, user_id, client_id, user_role, session_id) -> "JWTClaims":
+    def factory_claims(
+            cls,
+            user_id,
+            client_id,
+            user_role,
+            session_id,
+            alg: str = __algorithm__,
+            kid: str | None = None,
+            profile: dict | None = None
+    ) -> "JWTClaims":
+        """
+            :param profile: Claims of the user profile for the stateless access token, see `get_user_profile_claims`
+        """
         now = int(utcnow().timestamp())
         return cls(
             payload={
@@ -61,12 +159,10 @@ class JWTClaims(_JWTClaims):
                 "iat": now,
                 "jti": str(uuid4()),
                 "user_role": user_role,
-                "session_id": str(session_id)
+                "session_id": str(session_id),
+                **(profile or {})
             },
-            header={
-                "alg": __algorithm__,
-                "typ": "JWT"
-            }
+            header=dict(_get_header_items(str(alg), kid))
         )
 
 
@@ -74,51 +170,132 @@ async def create_token_session(
         *,
         session: AsyncSession,
         user: User,
-        client: Client,
+        client: SigningClient,
         token_type: str,
         expires_in: int = settings.REFRESH_TOKEN_EXPIRES_IN
 ) -> TokenResponseSchema:
-    current_token_count = await get_count_active_token_session_for_user(session=session, user_id=user.id)
-
-    if current_token_count >= settings.ACTIVE_REFRESH_TOKEN_MAX_COUNT:
-        await revoke_all_active_token_sessions_for_user(
-            session=session,
-            user_id=user.id
+    """
+        Insert the session and enforce `ACTIVE_REFRESH_TOKEN_MAX_COUNT` with one statement.
+        On overflow either all active sessions of the user are revoked (`revoke_all`)
+        or only the oldest ones, keeping room for the new session (`evict_oldest`).
+    """
+    now = utcnow()
+    issued_at = int(now.timestamp())
+    inserted = (insert(TokenSession)
+                .values(
+                    id=uuid7(),
+                    user_id=user.id,
+                    client_id=client.client_id,
+                    token_type=token_type,
+                    refresh_token=str(uuid4()),
+                    issued_at=issued_at,
+                    expires_in=expires_in,
+                    expires_at=issued_at + expires_in,
+                    created_at=now,
+                    updated_at=now
+                )
+                .returning(*TokenSession.__table__.c)
+                .cte("inserted"))
+
+    active_token = aliased(TokenSession)
+    active_tokens = select(active_token.id).where(
+        active_token.user_id == str(user.id),
+        *get_active_token_sessions_whereclause(active_token)
+    )
+    if settings.ACTIVE_REFRESH_TOKEN_OVERFLOW_POLICY == "evict_oldest":
+        overflow_clause = TokenSession.id.in_(
+            active_tokens
+            .order_by(active_token.issued_at.desc(), active_token.id.desc())
+            .offset(settings.ACTIVE_REFRESH_TOKEN_MAX_COUNT - 1)
         )
-
-    token = TokenSession(
-        client_id=client.client_id,
-        token_type=token_type,
-        refresh_token=str(uuid4()),
-        expires_in=expires_in,
-        user=user
+    else:
+        overflow_clause = and_(
+            TokenSession.id.in_(active_tokens),
+            select(count()).select_from(active_tokens.subquery()).scalar_subquery()
+            >= settings.ACTIVE_REFRESH_TOKEN_MAX_COUNT
+        )
+    revoked = (update(TokenSession)
+               .where(overflow_clause)
+               .values(refresh_token_revoked_at=issued_at)
+               .returning(TokenSession.id)
+               .cte("revoked"))
+
+    inserted_token = aliased(TokenSession, inserted)
+    query = select(
+        inserted_token,
+        select(func.array_agg(revoked.c.id)).scalar_subquery()
     )
-    session.add(token)
-    await session.flush()
-    return token.to_response_schema(access_token=generate_access_token(
-        str(user.id), user.role, client.client_id, client.client_private_secret, str(token.id)
+    token, revoked_session_ids = (await session.execute(query)).one()
+    if revoked_session_ids:
+        await publish_invalidations(session=session, type=InvalidationEventType.session, keys=revoked_session_ids)
+        await publish_invalidation(session=session, type=InvalidationEventType.user_sessions, key=user.id)
+        for session_id in revoked_session_ids:
+            call_after_commit(session, partial(revoked_sessions.add, session_id, issued_at))
+        call_after_commit(session, partial(evict_user_sessions, user_id=user.id))
+    call_after_commit(session, partial(invalidate_token_sessions_cache, user.id))
+
+    return token.to_response_schema(access_token=await generate_access_token(
+        user_id=str(user.id),
+        user_role=user.role,
+        client_id=client.client_id,
+        secret=client.client_private_secret,
+        session_id=str(token.id),
+        version=client.updated_at,
+        alg=client.alg,
+        kid=get_client_kid(client),
+        profile=get_user_profile_claims(user)
     ))
 
 
+def get_active_token_sessions_whereclause(entity=TokenSession, now=None):
+    """
+        Active session: not revoked (the revocation always stamps the current time) and not expired,
+        matches the partial index `ix_token_session_active`.
+        :param now: Timestamp or the bound parameter of the prebuilt statements, by default the current time
+    """
+    return [
+        entity.refresh_token_revoked_at.is_(None),
+        entity.expires_at > (int(utcnow().timestamp()) if now is None else now)
+    ]
+
+
+# the hot statements are built once, executed with the parameters:
+# the cache key of a prebuilt construct is memoized, so SQLAlchemy neither rebuilds nor re-keys it per call
+_select_token_session_by_session_id = select(TokenSession).where(
+    TokenSession.id == bindparam("session_id"),
+    *get_active_token_sessions_whereclause(now=bindparam("now"))
+)
+_select_token_session_by_refresh_token = select(TokenSession).where(
+    TokenSession.refresh_token == bindparam("refresh_token"),
+    *get_active_token_sessions_whereclause(now=bindparam("now"))
+)
+_rotated_token_cte = (update(TokenSession)
+                      .where(TokenSession.refresh_token == bindparam("token"),
+                             *get_active_token_sessions_whereclause(now=bindparam("now")))
+                      .values(refresh_token=bindparam("new_token"),
+                              previous_refresh_token=bindparam("token"),
+                              updated_at=bindparam("rotated_at"))
+                      .returning(*TokenSession.__table__.c)
+                      .cte("rotated"))
+_rotated_token = aliased(TokenSession, _rotated_token_cte)
+_rotate_refresh_token = (select(_rotated_token, Client, User)
+                         .join(Client, Client.client_id == _rotated_token.client_id)
+                         .join(User, User.id == _rotated_token.user_id)
+                         .execution_options(populate_existing=True))
+
+
 def _get_active_token_sessions_for_user_whereclause(user_id):
-    current_time = int(utcnow().timestamp())
     return [
         TokenSession.user_id == str(user_id),
-        or_(TokenSession.refresh_token_revoked_at > current_time, TokenSession.refresh_token_revoked_at.is_(None)),
-        TokenSession.issued_at + TokenSession.expires_in > current_time
+        *get_active_token_sessions_whereclause()
     ]
 
 
 async def get_token_session_by_session_id(*, session: AsyncSession, session_id: str) -> TokenSession:
-    current_time = int(utcnow().timestamp())
-    query = select(TokenSession).where(
-        and_(
-            TokenSession.id == session_id,
-            or_(TokenSession.refresh_token_revoked_at > current_time, TokenSession.refresh_token_revoked_at.is_(None)),
-            TokenSession.issued_at + TokenSession.expires_in > current_time
-        )
-    )
-    token = (await session.execute(query)).scalar()
+    token = (await session.execute(
+        _select_token_session_by_session_id,
+        {"session_id": str(session_id), "now": int(utcnow().timestamp())}
+    )).scalar()
     if token is None:
         raise auth_session_not_found_exception
 
@@ -126,15 +303,10 @@ async def get_token_session_by_session_id(*, session: AsyncSession, session_id:
 
 
 async def get_token_session_by_refresh_token(*, session: AsyncSession, refresh_token: str) -> TokenSession:
-    current_time = int(utcnow().timestamp())
-    query = select(TokenSession).where(
-        and_(
-            TokenSession.refresh_token == refresh_token,
-            or_(TokenSession.refresh_token_revoked_at > current_time, TokenSession.refresh_token_revoked_at.is_(None)),
-            TokenSession.issued_at + TokenSession.expires_in > current_time
-        )
-    )
-    token = (await session.execute(query)).scalar()
+    token = (await session.execute(
+        _select_token_session_by_refresh_token,
+        {"refresh_token": refresh_token, "now": int(utcnow().timestamp())}
+    )).scalar()
 
     if token is None:
         raise auth_refresh_token_no_valid_exception
@@ -145,18 +317,82 @@ async def get_token_session_by_refresh_token(*, session: AsyncSession, refresh_t
 async def update_refresh_token(*,
                                session: AsyncSession,
                                token: TokenSession,
-                               client: Client,
+                               client: SigningClient,
                                user: User
                                ) -> TokenResponseSchema:
+    token.previous_refresh_token = token.refresh_token
     token.refresh_token = str(uuid4())
     session.add(token)
     await session.flush()
 
-    return token.to_response_schema(access_token=generate_access_token(
-        str(token.user_id), user.role, token.client_id, client.client_private_secret, str(token.id)
+    return token.to_response_schema(access_token=await generate_access_token(
+        user_id=str(token.user_id),
+        user_role=user.role,
+        client_id=token.client_id,
+        secret=client.client_private_secret,
+        session_id=str(token.id),
+        version=client.updated_at,
+        alg=client.alg,
+        kid=get_client_kid(client),
+        profile=get_user_profile_claims(user)
+    ))
+
+
+async def rotate_refresh_token(*, session: AsyncSession, refresh_token: str) -> TokenResponseSchema:
+    """
+        Rotate the refresh token in one round trip: `UPDATE ... RETURNING` joined to the client and the user.
+        Of the concurrent rotations of the same token exactly one succeeds.
+    """
+    now = utcnow()
+    row = (await session.execute(_rotate_refresh_token, {
+        "token": refresh_token,
+        "new_token": str(uuid4()),
+        "now": int(now.timestamp()),
+        "rotated_at": now
+    })).first()
+    if row is None:
+        if settings.REFRESH_TOKEN_REUSE_DETECTION:
+            await _revoke_reused_refresh_token(refresh_token)
+        raise auth_refresh_token_no_valid_exception
+
+    token, client, user = row
+    return token.to_response_schema(access_token=await generate_access_token(
+        user_id=str(user.id),
+        user_role=user.role,
+        client_id=client.client_id,
+        secret=client.client_private_secret,
+        session_id=str(token.id),
+        version=client.updated_at,
+        alg=client.alg,
+        kid=get_client_kid(client),
+        profile=get_user_profile_claims(user)
     ))
 
 
+async def _revoke_reused_refresh_token(refresh_token: str):
+    """
+        A rotated refresh token presented again means it has leaked, the session is revoked.
+        The reuse within `REFRESH_TOKEN_REUSE_INTERVAL` after rotation is a concurrent refresh of the client
+        and is only rejected. The revocation is committed on its own, the request fails anyway.
+    """
+    query = (update(TokenSession)
+             .where(TokenSession.previous_refresh_token == refresh_token,
+                    *get_active_token_sessions_whereclause(),
+                    TokenSession.updated_at < utcnow() - timedelta(seconds=settings.REFRESH_TOKEN_REUSE_INTERVAL))
+             .values(refresh_token_revoked_at=int(utcnow().timestamp()))
+             .returning(TokenSession.id, TokenSession.user_id))
+    async with get_session() as session:
+        async with session.begin():
+            row = (await session.execute(query)).first()
+            if row is not None:
+                await publish_invalidation(session=session, type=InvalidationEventType.session, key=row.id)
+                await publish_invalidation(session=session, type=InvalidationEventType.user_sessions, key=row.user_id)
+                call_after_commit(session, partial(revoked_sessions.add, row.id))
+                call_after_commit(session, partial(invalidate_token_sessions_cache, row.user_id))
+    if row is not None:
+        evict_user_sessions(session_id=row.id)
+
+
 async def get_count_active_token_session_for_user(*, session: AsyncSession, user_id) -> int:
     query = select(count(TokenSession.id)).where(
         and_(*_get_active_token_sessions_for_user_whereclause(user_id))
@@ -170,18 +406,30 @@ async def revoke_all_active_token_sessions_for_user(*, session: AsyncSession, us
     current_time = int(utcnow().timestamp())
     query = update(TokenSession).where(
         and_(*_get_active_token_sessions_for_user_whereclause(user_id))
-    ).values(refresh_token_revoked_at=current_time)
-    await session.execute(query)
+    ).values(refresh_token_revoked_at=current_time).returning(TokenSession.id)
+    revoked_session_ids = (await session.execute(query)).scalars().all()
+    await publish_invalidations(session=session, type=InvalidationEventType.session, keys=revoked_session_ids)
+    if revoked_session_ids:
+        await publish_invalidation(session=session, type=InvalidationEventType.user_sessions, key=user_id)
     await session.flush()
+    for session_id in revoked_session_ids:
+        call_after_commit(session, partial(revoked_sessions.add, session_id, current_time))
+    call_after_commit(session, partial(evict_user_sessions, user_id=user_id))
+    call_after_commit(session, partial(invalidate_token_sessions_cache, user_id))
 
 
+@cached(
+    token_sessions_cache,
+    key=lambda *, session, user_id, current_session_id=None, client_id=None: (str(current_session_id), str(client_id)),
+    group=lambda *, session, user_id, **_: str(user_id)
+)
 async def get_token_sessions_by_user_id(
         *,
         session: AsyncSession,
         user_id,
         current_session_id=None,
         client_id=None
-) -> TokenSessionSchema:
+) -> list[TokenSessionSchema]:
     whereclause = _get_active_token_sessions_for_user_whereclause(user_id)
     if client_id is not None:
         whereclause.append(
@@ -206,30 +454,146 @@ async def revoke_token_session(
     token.refresh_token_revoked_at = int(utcnow().timestamp())
     session.add(token)
     await session.flush()
+    await publish_invalidation(session=session, type=InvalidationEventType.session, key=session_id)
+    await publish_invalidation(session=session, type=InvalidationEventType.user_sessions, key=token.user_id)
+    call_after_commit(session, partial(revoked_sessions.add, session_id, token.refresh_token_revoked_at))
+    call_after_commit(session, partial(evict_user_sessions, session_id=session_id))
+    call_after_commit(session, partial(invalidate_token_sessions_cache, token.user_id))
 
     return True
 
 
-def generate_access_token(user_id, user_role, client_id, secret, session_id):
-    claims = JWTClaims.factory_claims(user_id, client_id, user_role, session_id)
-    token = jwt.encode(claims.header, claims, RSAKey.import_key(secret).get_private_key())
+def get_client_private_key(client: SigningClient) -> AsymmetricKey:
+    """
+        Parsed private key of the client for signing.
+        The key is versioned by `updated_at`, so a rotated secret is never served from the cache.
+    """
+    return _get_client_key(client.client_id, client.updated_at, client.client_private_secret, True, client.alg)
 
-    return f"{client_id}{__separator__}{token.decode('utf-8')}"
 
+def get_client_public_key(client: SigningClient) -> AsymmetricKey:
+    """
+        Parsed public key of the client for verification, the private key isn't required.
+    """
+    return _get_client_key(client.client_id, client.updated_at, client.client_public_secret, False, client.alg)
+
+
+def get_client_kid(client: SigningClient) -> str:
+    """
+        Key ID of the client: RFC 7638 thumbprint of its public key, published in the JWKS.
+    """
+    return get_client_public_key(client).thumbprint()
+
+
+def _get_client_key(client_id: str, version, secret: str, is_private: bool, alg: str) -> AsymmetricKey:
+    key_cls = _key_cls_by_alg[alg]
+    if version is None:
+        return key_cls.import_key(secret)
+
+    cache_key = (client_id, version, is_private, alg)
+    key = client_keys_cache.get(cache_key)
+    if key is None:
+        key = key_cls.import_key(secret)
+        client_keys_cache.set(cache_key, key)
+
+    return key
+
+
+def invalidate_client_key(client_id: str):
+    client_keys_cache.evict(lambda cache_key: cache_key[0] == client_id)
+
+
+async def generate_access_token(
+        *,
+        user_id,
+        user_role,
+        client_id,
+        secret: str,
+        session_id,
+        version=None,
+        alg: str = __algorithm__,
+        kid: str | None = None,
+        profile: dict | None = None
+) -> str:
+    """
+        :param secret: Private key PEM of the client
+        :param version: Version of the client secret (`Client.updated_at`), the parsed key is cached by it
+        :param alg: Signing algorithm of the client
+        :param kid: Key ID of the client, see `get_client_kid`
+        :param profile: Claims of the user profile, see `get_user_profile_claims`
+    """
+    claims = JWTClaims.factory_claims(user_id, client_id, user_role, session_id, alg, kid, profile)
+    token = await crypto_executor.run(
+        _sign_access_token, dict(claims.header), dict(claims), client_id, version, secret
+    )
+
+    return f"{client_id}{__separator__}{token}"
+
+
+def _sign_access_token(header: dict, payload: dict, client_id: str, version, secret: str) -> str:
+    alg = header["alg"]
+    key = _get_client_key(client_id, version, secret, True, alg)
+    return _encode_jwt(header, payload, key)
+
+
+# the claims of the issuer are the same for every token
+_static_claims = f'{{"iss":{json_dumps(settings.SSO_ISSUERS)},'.encode("utf-8")
+
+
+@lru_cache(maxsize=settings.CLIENT_KEYS_CACHE_MAX_SIZE)
+def _get_header_items(alg: str, kid: str | None) -> tuple[tuple[str, str], ...]:
+    # immutable, shared by all the tokens; the header dict is built from it for each token
+    header = {
+        "alg": alg,
+        "typ": "JWT"
+    }
+    if kid is not None:
+        header["kid"] = kid
+
+    return tuple(sorted(header.items()))
 
-def validate_access_token(
+
+@lru_cache(maxsize=settings.CLIENT_KEYS_CACHE_MAX_SIZE)
+def _get_header_segment(header_items: tuple) -> bytes:
+    return json_b64encode(dict(header_items))
+
+
+def _encode_jwt(header: dict, payload: dict, key: AsymmetricKey) -> str:
+    """
+        JWS Compact Serialization of the access token.
+        The header segment and the issuer claims are encoded once, only the dynamic claims are serialized.
+    """
+    algorithm = JsonWebSignature.ALGORITHMS_REGISTRY[header["alg"]]
+    header_segment = _get_header_segment(tuple(sorted(header.items())))
+    if payload.get("iss") == settings.SSO_ISSUERS:
+        dynamic_claims = dict(payload)
+        del dynamic_claims["iss"]
+        payload_bytes = _static_claims + json_dumps(dynamic_claims)[1:].encode("utf-8")
+    else:
+        payload_bytes = json_dumps(payload).encode("utf-8")
+
+    signing_input = header_segment + b"." + urlsafe_b64encode(payload_bytes)
+    signature = urlsafe_b64encode(algorithm.sign(signing_input, algorithm.prepare_key(key)))
+
+    return (signing_input + b"." + signature).decode("utf-8")
+
+
+async def validate_access_token(
         *,
-        client: Client,
+        client: SigningClient,
         jwt_token: str,
-):
+) -> JWTClaims:
     assert len(jwt_token.split(__separator__)) == 1, "Only the jwt token itself needs to be passed for validation."
 
+    decoded = await crypto_executor.run(
+        _verify_access_token, jwt_token, client.client_id, client.updated_at, client.client_public_secret, client.alg
+    )
+    if decoded is None:
+        raise auth_access_token_no_valid_exception
+
+    payload, header = decoded
+    decode_token = JWTClaims(payload, header)
     try:
-        decode_token = jwt.decode(
-            jwt_token,
-            client.client_private_secret,
-            claims_cls=JWTClaims
-        )
         decode_token.validate(int(utcnow().timestamp()))
     except JoseError as error:
         raise auth_access_token_no_valid_exception from error
@@ -240,6 +604,65 @@ def validate_access_token(
     return decode_token
 
 
+def _verify_access_token(
+        jwt_token: str,
+        client_id: str,
+        version,
+        public_secret: str,
+        alg: str
+) -> tuple[dict, dict] | None:
+    try:
+        key = _get_client_key(client_id, version, public_secret, False, alg)
+        decode_token = _jwt_by_alg[alg].decode(jwt_token, key)
+    except (JoseError, ValueError, KeyError):
+        return None
+
+    return dict(decode_token), dict(decode_token.header)
+
+
+def get_user_profile_claims(user: User) -> dict | None:
+    """
+        Claims of the user profile embedded into the access token in the `STATELESS_ACCESS_TOKEN` mode.
+    """
+    if not settings.STATELESS_ACCESS_TOKEN:
+        return None
+    user_schema = user.to_schema()
+
+    return {
+        "email": user_schema.email,
+        "username": user_schema.username,
+        "is_passport_rf": user_schema.is_passport_rf,
+        "is_foreign_passport": user_schema.is_foreign_passport,
+        "created_at": user_schema.created_at.timestamp(),
+        "updated_at": user_schema.updated_at.timestamp()
+    }
+
+
+def get_user_session_from_claims(claims: JWTClaims) -> UserSessionSchema | None:
+    """
+        User session built from the validated access token without the database.
+        :return: None if the token has no profile claims or is older than `STATELESS_ACCESS_TOKEN_MAX_AGE`,
+            then the user must be read from the database
+    """
+    if not settings.STATELESS_ACCESS_TOKEN or "email" not in claims:
+        return None
+    if int(utcnow().timestamp()) - claims["iat"] > settings.STATELESS_ACCESS_TOKEN_MAX_AGE:
+        return None
+
+    return UserSessionSchema(
+        id=claims["sub"],
+        email=claims["email"],
+        username=claims["username"],
+        role=claims["user_role"],
+        created_at=claims["created_at"],
+        updated_at=claims["updated_at"],
+        is_passport_rf=claims["is_passport_rf"],
+        is_foreign_passport=claims["is_foreign_passport"],
+        session_id=claims["session_id"],
+        client_id=claims["aud"]
+    )
+
+
 def split_access_token(access_token: str) -> tuple[str, str]:
     """
         Access token split in the format: <client_id>:<jwt_token>
@@ -1,6 +1,10 @@
-from sqlalchemy import select, or_
+from functools import partial
+from uuid import UUID
+
+from sqlalchemy import select, func, and_, bindparam
 from sqlalchemy.exc import DatabaseError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from traveling_sso.shared.schemas.exceptions import (
     user_not_found_exception,
@@ -9,12 +13,20 @@ from traveling_sso.shared.schemas.exceptions import (
 )
 from traveling_sso.shared.schemas.protocol import (
     UserSchema,
+    UserProfileSchema,
     InternalCreateUserRequestSchema,
     UpdateUserInfoRequestSchema
 )
 
-from ..database.models import User, PassportRf
+from ..cache import SingleFlight, cached, coalesced
+from ..database.core import call_after_commit
+from ..database.models import User, PassportRf, TokenSession
 from ..database.utils import is_uuid
+from ..shared.metrics import register_metrics
+from .caches import users_cache, invalidate_user_caches
+from .invalidation import InvalidationEventType, publish_invalidation
+from .session_cache import evict_user_sessions
+from .token import get_active_token_sessions_whereclause
 
 
 async def get_user_by_id(*, session: AsyncSession, user_id) -> User:
@@ -25,16 +37,84 @@ async def get_user_by_id(*, session: AsyncSession, user_id) -> User:
     return user
 
 
+_select_user_by_email = select(User).where(func.lower(User.email) == bindparam("email", type_=User.email.type))
+_select_user_by_username = select(User).where(User.username == bindparam("username"))
+
+
+user_lookups = SingleFlight("user_lookups")
+register_metrics("user_lookups", lambda: user_lookups.stats)
+
+
+def _get_user_cache_key(*, session, identifier):
+    # only the lookups by id, the email and the username of a user can be taken by another one
+    user_id = _parse_user_id(identifier)
+    return str(user_id) if user_id is not None else None
+
+
+def _get_user_lookup_key(*, session, identifier):
+    # the cached lookups are coalesced by the cache
+    if users_cache.enabled and _parse_user_id(identifier) is not None:
+        return None
+    identifier = str(identifier)
+    return identifier.lower() if "@" in identifier else identifier
+
+
+@cached(users_cache, key=_get_user_cache_key, negative=(user_not_found_exception,))
+@coalesced(user_lookups, key=_get_user_lookup_key)
 async def get_user_by_identifier(*, session: AsyncSession, identifier) -> UserSchema:
-    user = await _get_user_by_identifier(session=session, identifier=str(identifier))
+    user = await find_user_by_identifier(session=session, identifier=identifier)
     if user is None:
         raise user_not_found_exception
 
     return user.to_schema()
 
 
+def select_user_with_documents(user_id):
+    """The user with both documents in one query, the documents are LEFT JOINed through the relationships."""
+    return (select(User)
+            .options(joinedload(User.passport_rf), joinedload(User.foreign_passport_rf))
+            .where(User.id == str(user_id)))
+
+
+async def get_user_profile(
+        *,
+        session: AsyncSession,
+        user_id,
+        current_session_id=None,
+        client_id=None
+) -> UserProfileSchema:
+    """
+        The user, the documents and the active sessions in one round trip:
+        one row per active session (or a single row without sessions) with the documents joined to each.
+    """
+    sessions_whereclause = [
+        TokenSession.user_id == User.id,
+        *get_active_token_sessions_whereclause()
+    ]
+    if client_id is not None:
+        sessions_whereclause.append(
+            TokenSession.client_id == str(client_id)
+        )
+    query = (select_user_with_documents(user_id)
+             .add_columns(TokenSession)
+             .outerjoin(TokenSession, and_(*sessions_whereclause)))
+    rows = (await session.execute(query)).all()
+    if not rows:
+        raise user_not_found_exception
+
+    user = rows[0][0]
+    return UserProfileSchema(
+        user=user.to_schema(),
+        documents=user.to_documents_schema(),
+        sessions=[
+            token.to_token_session_schema(token.id == current_session_id)
+            for _, token in rows if token is not None
+        ]
+    )
+
+
 async def add_passport_rf(*, session: AsyncSession, passport: PassportRf, user_id: str) -> User:
-    user = await _get_user_by_identifier(session=session, identifier=str(user_id))
+    user = await find_user_by_identifier(session=session, identifier=str(user_id))
 
     user.passport_rf_id = passport.id
     try:
@@ -42,10 +122,13 @@ async def add_passport_rf(*, session: AsyncSession, passport: PassportRf, user_i
         await session.flush()
     except DatabaseError as error:
         raise user_not_specified_exception from error
+    await publish_invalidation(session=session, type=InvalidationEventType.user, key=user.id)
+    call_after_commit(session, partial(evict_user_sessions, user_id=user.id))
+    call_after_commit(session, partial(invalidate_user_caches, user.id))
 
 
 async def add_foreign_passport_rf(*, session: AsyncSession, passport: PassportRf, user_id: str) -> User:
-    user = await _get_user_by_identifier(session=session, identifier=str(user_id))
+    user = await find_user_by_identifier(session=session, identifier=str(user_id))
 
     user.foreign_passport_rf_id = passport.id
     try:
@@ -53,13 +136,17 @@ async def add_foreign_passport_rf(*, session: AsyncSession, passport: PassportRf
         await session.flush()
     except DatabaseError as error:
         raise user_not_specified_exception from error
+    await publish_invalidation(session=session, type=InvalidationEventType.user, key=user.id)
+    call_after_commit(session, partial(evict_user_sessions, user_id=user.id))
+    call_after_commit(session, partial(invalidate_user_caches, user.id))
 
 
 async def create_or_update_user(*, session: AsyncSession, user_data: InternalCreateUserRequestSchema) -> User:
     user = None
     if user_data.id is not None:
-        user = await _get_user_by_identifier(session=session, identifier=str(user_data.id))
-    if user is None:
+        user = await find_user_by_identifier(session=session, identifier=str(user_data.id))
+    is_created = user is None
+    if is_created:
         user = User(**user_data.model_dump())
     else:
         update_data = user_data.model_dump()
@@ -74,6 +161,11 @@ async def create_or_update_user(*, session: AsyncSession, user_data: InternalCre
         await session.flush()
     except DatabaseError as error:
         raise user_not_specified_exception from error
+    if not is_created:
+        await publish_invalidation(session=session, type=InvalidationEventType.user, key=user.id)
+        call_after_commit(session, partial(evict_user_sessions, user_id=user.id))
+    # the id of a new user could be cached as not found
+    call_after_commit(session, partial(invalidate_user_caches, user.id))
 
     return user
 
@@ -93,19 +185,35 @@ async def update_user(*, session: AsyncSession, user_id,  user_data: UpdateUserI
         await session.flush()
     except DatabaseError as error:
         raise user_conflict_exception from error
+    await publish_invalidation(session=session, type=InvalidationEventType.user, key=user.id)
+    call_after_commit(session, partial(evict_user_sessions, user_id=user.id))
+    call_after_commit(session, partial(invalidate_user_caches, user.id))
 
     return user.to_schema()
 
 
-async def _get_user_by_identifier(*, session: AsyncSession, identifier) -> User | None:
+async def find_user_by_identifier(*, session: AsyncSession, identifier) -> User | None:
+    """
+        The lookup is dispatched on the identifier type, so every branch is served by one index:
+        UUID — the primary key, contains `@` — the email (case-insensitive), otherwise — the username.
+    """
+    user_id = _parse_user_id(identifier)
+    if user_id is not None:
+        return await session.get(User, user_id)
     identifier = str(identifier)
-    clauses = [User.email == str(identifier), User.username == str(identifier)]
-    if is_uuid(identifier):
-        clauses.append(User.id == str(identifier))
-    query = select(User).where(or_(*clauses))
-    user = (await session.execute(query)).scalar()
+    if "@" in identifier:
+        return (await session.execute(_select_user_by_email, {"email": identifier.lower()})).scalar()
 
-    return user
+    return (await session.execute(_select_user_by_username, {"username": identifier})).scalar()
+
+
+def _parse_user_id(identifier) -> UUID | None:
+    # only the canonical form, so a 32 hex characters username isn't taken for an id
+    if isinstance(identifier, UUID):
+        return identifier
+    identifier = str(identifier)
+    if len(identifier) == 36 and is_uuid(identifier):
+        return UUID(identifier)
 
 
 def _update_user_fields(*, user: User, fields: dict):
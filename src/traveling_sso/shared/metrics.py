@@ -0,0 +1,22 @@
+from dataclasses import asdict, is_dataclass
+from typing import Any, Callable
+
+_collectors: dict[str, Callable[[], Any]] = {}
+
+
+def register_metrics(name: str, collector: Callable[[], Any]):
+    """
+        Register a collector of the service metrics.
+        :param name: Name of the metrics group
+        :param collector: Callable returning a dict or a dataclass with the current values
+    """
+    _collectors[name] = collector
+
+
+def collect_metrics() -> dict[str, dict[str, Any]]:
+    res = {}
+    for name, collector in _collectors.items():
+        values = collector()
+        res[name] = asdict(values) if is_dataclass(values) else dict(values)
+
+    return res
@@ -1,5 +1,6 @@
 from .error import SsoErrorCode, SsoException
 from .templates import (
+    service_overloaded_exception,
     client_not_found_exception,
     user_not_found_exception,
     user_role_not_found_exception,
@@ -18,6 +19,7 @@ from .templates import (
 )
 
 __all__ = (
+    service_overloaded_exception,
     client_not_found_exception,
     user_not_found_exception,
     user_role_not_found_exception,
@@ -19,6 +19,7 @@ class SsoErrorCode(IntEnum):
     GENERIC_ERROR = 0
     BASE_NOT_FOUND = 1
     VALIDATION_ERROR = 2
+    SERVICE_OVERLOADED = 3
 
     # 1000-1999: auth errors
     AUTH_UNAUTHORIZED = 1000
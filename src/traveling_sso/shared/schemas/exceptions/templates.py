@@ -3,6 +3,13 @@ from starlette import status
 from .error import SsoErrorCode, SsoException
 
 
+service_overloaded_exception = SsoException(
+    message="Service is overloaded, try again later.",
+    error_code=SsoErrorCode.SERVICE_OVERLOADED,
+    http_status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+)
+
+
 client_not_found_exception = SsoException(
     message="Client not found exception.",
     error_code=SsoErrorCode.CLIENT_NOT_FOUND,
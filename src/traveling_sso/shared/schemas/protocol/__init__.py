@@ -1,9 +1,13 @@
 from .custom_auth import (
     TokenType,
+    ClientAlgorithm,
     TokenResponseSchema,
     TokenSessionSchema,
+    UserProfileSchema,
     ClientSchema,
-    SignInFormSchema
+    SignInFormSchema,
+    IntrospectBatchRequestSchema,
+    IntrospectResultSchema
 )
 from .documents import (
     DocumentType,
@@ -32,10 +36,14 @@ from .user import (
 
 __all__ = (
     TokenType,
+    ClientAlgorithm,
     TokenResponseSchema,
     TokenSessionSchema,
+    UserProfileSchema,
     ClientSchema,
     SignInFormSchema,
+    IntrospectBatchRequestSchema,
+    IntrospectResultSchema,
     PassportRfSchema,
     ForeignPassportRfSchema,
     CreatePassportRfResponseSchema,
@@ -5,8 +5,10 @@ from uuid import UUID
 from pydantic import EmailStr, constr, Field
 from starlette.responses import JSONResponse
 
+from traveling_sso.config import settings
 from traveling_sso.database.utils import timestamp_to_datetime
-from .user import UserSchema
+from .documents import DocumentType, PassportRfSchema, ForeignPassportRfSchema
+from .user import UserSchema, UserSessionSchema
 from ..base import SsoBaseModel
 
 
@@ -14,6 +16,12 @@ class TokenType(StrEnum):
     Bearer = "Bearer"
 
 
+class ClientAlgorithm(StrEnum):
+    RS512 = "RS512"
+    ES256 = "ES256"
+    EdDSA = "EdDSA"
+
+
 class TokenResponseSchema(SsoBaseModel):
     access_token: str
     refresh_token: UUID | None = None
@@ -51,10 +59,17 @@ class TokenSessionSchema(SsoBaseModel):
     is_current: bool = False
 
 
+class UserProfileSchema(SsoBaseModel):
+    user: UserSchema
+    documents: dict[DocumentType, PassportRfSchema | ForeignPassportRfSchema | None]
+    sessions: list[TokenSessionSchema]
+
+
 class ClientSchema(SsoBaseModel):
     id: UUID
     client_id: str
     client_public_secret: str
+    alg: ClientAlgorithm = ClientAlgorithm.RS512
     client_id_issued_at: int
     client_secret_expires_at: int
     user: UserSchema
@@ -75,3 +90,18 @@ class SignInFormSchema(SsoBaseModel):
 class SignUpFormSchema(SsoBaseModel):
     email: EmailStr
     password: constr(min_length=8, max_length=255)
+
+
+class IntrospectBatchRequestSchema(SsoBaseModel):
+    access_tokens: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.INTROSPECT_BATCH_MAX_SIZE,
+        description="Access tokens in the format `<client_id>:<jwt_token>`."
+    )
+
+
+class IntrospectResultSchema(SsoBaseModel):
+    active: bool
+    user: UserSessionSchema | None = None
+    exp: int | None = Field(None, description="Expires of access token.")
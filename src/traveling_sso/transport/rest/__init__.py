@@ -1,6 +1,8 @@
 from .app_router import app_router
+from .well_known import well_known_router
 
 
 __all__ = (
-    app_router
+    app_router,
+    well_known_router
 )
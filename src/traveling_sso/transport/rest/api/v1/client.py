@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
 from pydantic import constr
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from traveling_sso.database.deps import get_db
+from traveling_sso.config import settings
+from traveling_sso.database.deps import get_db, get_read_db
+from traveling_sso.managers import get_clients_for_user
 from traveling_sso.shared.schemas.protocol import ClientSchema, UserSchema
 from traveling_sso.transport.rest.app_deps import AuthSsoUser
 
@@ -33,7 +37,7 @@ async def create_client(
 )
 async def get_client_by_client_id(
         client_id: constr(min_length=48, max_length=48),
-        session: AsyncSession = Depends(get_db),
+        session: AsyncSession = Depends(get_read_db),
         user: UserSchema = Depends(AuthSsoUser())
 ):
     # TODO
@@ -48,8 +52,14 @@ async def get_client_by_client_id(
     summary="Get all me clients"
 )
 async def get_all_clients_for_user(
-        session: AsyncSession = Depends(get_db),
+        limit: int = Query(settings.CLIENT_LIST_PAGE_MAX_SIZE, ge=1, le=settings.CLIENT_LIST_PAGE_MAX_SIZE),
+        after: UUID | None = Query(None, description="`id` of the last client of the previous page."),
+        session: AsyncSession = Depends(get_read_db),
         user: UserSchema = Depends(AuthSsoUser())
 ):
-    # TODO
-    ...
+    return await get_clients_for_user(
+        session=session,
+        user_id=user.id,
+        limit=limit,
+        after=after
+    )
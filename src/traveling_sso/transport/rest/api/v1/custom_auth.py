@@ -8,9 +8,17 @@ from starlette import status
 from traveling_sso.config import settings
 from traveling_sso.database.deps import get_db
 from traveling_sso.managers.custom_auth import CustomAuthManager
+from traveling_sso.managers.introspection import introspect_access_tokens
 from traveling_sso.managers.token import revoke_token_session
 from traveling_sso.shared.schemas.exceptions.templates import auth_refresh_token_no_valid_exception
-from traveling_sso.shared.schemas.protocol import TokenResponseSchema, SignInFormSchema, UserSessionSchema
+from traveling_sso.shared.schemas.protocol import (
+    TokenResponseSchema,
+    SignInFormSchema,
+    UserSessionSchema,
+    UserRoleType,
+    IntrospectBatchRequestSchema,
+    IntrospectResultSchema
+)
 from traveling_sso.shared.schemas.protocol.custom_auth import SignUpFormSchema
 from traveling_sso.transport.rest.app_deps import AuthSsoUser
 
@@ -157,3 +165,22 @@ async def refresh_session(
         )
     else:
         return res
+
+
+@custom_auth_router.post(
+    "/introspect/batch",
+    response_model=list[IntrospectResultSchema],
+    status_code=status.HTTP_200_OK,
+    summary="Introspect access tokens",
+    description="Validate up to `INTROSPECT_BATCH_MAX_SIZE` access tokens at once, "
+                "the results are in the order of the passed tokens. Available only to the admin."
+)
+async def introspect_batch(
+        introspect_form: IntrospectBatchRequestSchema,
+        session: AsyncSession = Depends(get_db),
+        user: UserSessionSchema = Depends(AuthSsoUser(UserRoleType.admin))
+):
+    return await introspect_access_tokens(
+        session=session,
+        access_tokens=introspect_form.access_tokens
+    )
@@ -1,8 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from starlette import status
 
 from traveling_sso.config import settings
-from traveling_sso.shared.schemas.protocol import AboutSchema, HealthSchema
+from traveling_sso.shared.metrics import collect_metrics
+from traveling_sso.shared.schemas.protocol import AboutSchema, HealthSchema, UserRoleType, UserSchema
+from traveling_sso.transport.rest.app_deps import AuthSsoUser
 
 
 server_router = APIRouter()
@@ -30,3 +32,14 @@ async def about():
 )
 def health():
     return HealthSchema(status="OK")
+
+
+@server_router.get(
+    "/metrics",
+    response_model=dict[str, dict[str, int | float]],
+    status_code=status.HTTP_200_OK,
+    summary="Get server metrics",
+    description="Counters of the in-process caches and executors, available only to the admin."
+)
+async def metrics(user: UserSchema = Depends(AuthSsoUser(UserRoleType.admin))):
+    return collect_metrics()
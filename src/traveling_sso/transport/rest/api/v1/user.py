@@ -4,12 +4,13 @@ from fastapi import APIRouter, Depends, Body
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from traveling_sso.database.deps import get_db
+from traveling_sso.database.deps import get_db, get_read_db
 from traveling_sso.managers import (
     get_passport_rf_by_user_id,
     get_foreign_passport_rf_by_user_id,
     get_token_sessions_by_user_id,
     get_all_documents_by_user_id,
+    get_user_profile,
     update_user,
     create_passport_rf_new,
     create_foreign_passport_rf_new,
@@ -26,6 +27,7 @@ from traveling_sso.shared.schemas.protocol import (
     CreateForeignPassportRfResponseSchema,
     UpdateForeignPassportRfResponseSchema,
     TokenSessionSchema,
+    UserProfileSchema,
     UserSessionSchema,
     UpdateUserInfoRequestSchema,
     GetDocumentTypeSlug,
@@ -129,7 +131,7 @@ def _match_document_func(document_type, action_type):
 )
 async def get_document(
         document_type: GetDocumentTypeSlug,
-        session: AsyncSession = Depends(get_db),
+        session: AsyncSession = Depends(get_read_db),
         user: UserSchema = Depends(AuthSsoUser())
 ):
     get_document_func = _match_document_func(document_type, "get")
@@ -218,7 +220,7 @@ async def update_foreign_passport_rf(
     summary="Get user sessions"
 )
 async def get_sessions(
-        session: AsyncSession = Depends(get_db),
+        session: AsyncSession = Depends(get_read_db),
         user: UserSessionSchema = Depends(AuthSsoUser())
 ):
     return await get_token_sessions_by_user_id(
@@ -227,3 +229,22 @@ async def get_sessions(
         current_session_id=user.session_id,
         client_id=user.client_id,
     )
+
+
+@user_router.get(
+    "/profile",
+    response_model=UserProfileSchema,
+    status_code=status.HTTP_200_OK,
+    summary="Get user profile",
+    description="User info, documents and active sessions in one request."
+)
+async def get_profile(
+        session: AsyncSession = Depends(get_read_db),
+        user: UserSessionSchema = Depends(AuthSsoUser())
+):
+    return await get_user_profile(
+        session=session,
+        user_id=user.id,
+        current_session_id=user.session_id,
+        client_id=user.client_id,
+    )
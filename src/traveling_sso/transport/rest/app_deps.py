@@ -1,10 +1,12 @@
-from fastapi import Depends, Security
+from fastapi import Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from traveling_sso.database.deps import get_db
+from traveling_sso.config import settings
+from traveling_sso.database.core import get_read_session
 from traveling_sso.managers import get_client_by_client_id, get_user_by_identifier
-from traveling_sso.managers.token import validate_access_token, split_access_token
+from traveling_sso.managers.session_cache import get_cached_user_session, cache_user_session, is_session_revoked
+from traveling_sso.managers.token import validate_access_token, split_access_token, get_user_session_from_claims
 from traveling_sso.shared.schemas.exceptions import SsoException
 from traveling_sso.shared.schemas.exceptions.templates import (
     auth_unauthorized_exception,
@@ -27,34 +29,62 @@ class AuthSsoUser:
 
     async def __call__(
             self,
-            access_token: HTTPAuthorizationCredentials = Security(sso_access_token),
-            session: AsyncSession = Depends(get_db)
+            access_token: HTTPAuthorizationCredentials = Security(sso_access_token)
     ):
         if access_token:
-            client_id, jwt_token = split_access_token(access_token.credentials)
-            try:
-                client = await get_client_by_client_id(
-                    session=session,
-                    client_id=client_id
-                )
-            except SsoException as error:
-                raise auth_access_token_no_valid_exception from error
-
-            decode_token: dict = validate_access_token(
-                client=client,
-                jwt_token=jwt_token
-            )
-            user_id = decode_token["sub"]
-            session_id = decode_token["session_id"]
-
-            user_schema = await get_user_by_identifier(
-                session=session,
-                identifier=user_id
-            )
+            cached = get_cached_user_session(access_token.credentials)
+            if cached is not None:
+                user_session, _ = cached
+            else:
+                # own short read session: the connection goes back to the pool before the endpoint runs,
+                # so a request that writes never holds two connections at once
+                async with get_read_session() as session:
+                    user_session = await self._validate(session, access_token.credentials)
+            # the access token outlives the revocation of its session until `exp`
+            if await is_session_revoked(user_session.session_id):
+                raise auth_access_token_no_valid_exception
 
-            if self.required_role == user_schema.role or user_schema.role == UserRoleType.admin:
-                return UserSessionSchema(**user_schema.model_dump(), session_id=session_id, client_id=client_id)
+            if self.required_role == user_session.role or user_session.role == UserRoleType.admin:
+                return user_session
             else:
                 raise auth_access_denied_exception
 
         raise auth_unauthorized_exception
+
+    @staticmethod
+    async def _validate(session: AsyncSession, credentials: str) -> UserSessionSchema:
+        client_id, jwt_token = split_access_token(credentials)
+        try:
+            client = await get_client_by_client_id(
+                session=session,
+                client_id=client_id,
+                with_private_secret=False
+            )
+        except SsoException as error:
+            raise auth_access_token_no_valid_exception from error
+
+        decode_token = await validate_access_token(
+            client=client,
+            jwt_token=jwt_token
+        )
+        user_session = get_user_session_from_claims(decode_token)
+        if user_session is not None:
+            cache_user_session(
+                credentials,
+                user_session,
+                decode_token["exp"],
+                valid_until=decode_token["iat"] + settings.STATELESS_ACCESS_TOKEN_MAX_AGE
+            )
+            return user_session
+
+        user_id = decode_token["sub"]
+        session_id = decode_token["session_id"]
+
+        user_schema = await get_user_by_identifier(
+            session=session,
+            identifier=user_id
+        )
+        user_session = UserSessionSchema(**user_schema.model_dump(), session_id=session_id, client_id=client_id)
+        cache_user_session(credentials, user_session, decode_token["exp"])
+
+        return user_session
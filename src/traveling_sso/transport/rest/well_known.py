@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response
+
+from traveling_sso.config import settings
+from traveling_sso.database.deps import get_read_db
+from traveling_sso.managers.jwks import WellKnownDocument, get_jwks, get_openid_configuration
+
+
+well_known_router = APIRouter()
+
+
+def _document_response(request: Request, document: WellKnownDocument) -> Response:
+    headers = {
+        "ETag": document.etag,
+        "Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE}"
+    }
+    if request.headers.get("if-none-match") == document.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=document.body, media_type="application/json", headers=headers)
+
+
+@well_known_router.get(
+    "/openid-configuration",
+    response_class=Response,
+    status_code=status.HTTP_200_OK,
+    summary="OpenID Provider Metadata"
+)
+async def openid_configuration(request: Request):
+    return _document_response(request, get_openid_configuration())
+
+
+@well_known_router.get(
+    "/jwks.json",
+    response_class=Response,
+    status_code=status.HTTP_200_OK,
+    summary="JSON Web Key Set",
+    description="Public keys of all clients, the `kid` matches the header of the access tokens issued for the client."
+)
+async def jwks(request: Request, session: AsyncSession = Depends(get_read_db)):
+    return _document_response(request, await get_jwks(session=session))
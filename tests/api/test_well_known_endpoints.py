@@ -0,0 +1,41 @@
+import allure
+from authlib.jose import JsonWebKey, JsonWebToken
+from httpx import AsyncClient
+
+from traveling_sso.managers.token import split_access_token
+
+
+BASE_PATH = "/.well-known"
+
+
+@allure.title("OpenID configuration.")
+@allure.feature("Well-Known API")
+async def test_openid_configuration(sso_service: AsyncClient):
+    resp = await sso_service.get(f"{BASE_PATH}/openid-configuration")
+    assert resp.status_code == 200
+    assert resp.json()["jwks_uri"].endswith(f"{BASE_PATH}/jwks.json")
+    assert "max-age" in resp.headers["cache-control"]
+
+    resp = await sso_service.get(
+        f"{BASE_PATH}/openid-configuration",
+        headers={"If-None-Match": resp.headers["etag"]}
+    )
+    assert resp.status_code == 304
+
+
+@allure.title("JWKS, offline validation of the access token.")
+@allure.feature("Well-Known API")
+async def test_jwks(sso_service: AsyncClient, sso_admin_token):
+    resp = await sso_service.get(f"{BASE_PATH}/jwks.json")
+    assert resp.status_code == 200
+    etag = resp.headers["etag"]
+
+    _, jwt_token = split_access_token(sso_admin_token.access_token)
+    key_set = JsonWebKey.import_key_set(resp.json())
+    claims = JsonWebToken([jwk["alg"] for jwk in resp.json()["keys"]]).decode(jwt_token, key_set)
+    assert claims.header["kid"] in {jwk["kid"] for jwk in resp.json()["keys"]}
+    assert all("d" not in jwk for jwk in resp.json()["keys"])
+
+    resp = await sso_service.get(f"{BASE_PATH}/jwks.json", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
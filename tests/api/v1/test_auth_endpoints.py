@@ -1,6 +1,7 @@
 from uuid import uuid4
 
 import allure
+import pytest
 from authlib.common.security import generate_token
 from httpx import AsyncClient
 
@@ -148,6 +149,15 @@ async def test_logout(sso_service: AsyncClient, sso_admin_token: TokenData):
     assert resp.status_code == 200
     assert resp.text == "true"
 
+    resp = await sso_service.get(
+        "/api/v1/user/me/sessions",
+        headers={
+            "Authorization": f"Bearer {sso_admin_token.access_token}"
+        }
+    )
+    assert_status_code(resp, 400, 403)
+    assert_error_code(resp, SsoErrorCode.AUTH_ACCESS_TOKEN_NO_VALID)
+
 
 @allure.title("Refresh session without token.")
 @allure.feature("Auth API")
@@ -336,4 +346,128 @@ async def test_session_revoke_current_session(sso_service: AsyncClient, sso_admi
                 "Authorization": f"Bearer {sso_admin_token.access_token}"
             }
         )
-    await _test_session_revoke_success(_resp)
+    resp = await _resp()
+    assert resp.status_code == 200
+    assert resp.text == "true"
+    resp = await _resp()  # the access token of the revoked session is rejected right away
+    assert_status_code(resp, 400, 403)
+    assert_error_code(resp, SsoErrorCode.AUTH_ACCESS_TOKEN_NO_VALID)
+
+
+@allure.title("Introspect access tokens batch.")
+@allure.feature("Auth API")
+async def test_introspect_batch(sso_service: AsyncClient, sso_admin_token: TokenData, sso_token: TokenData):
+    client_id, jwt_token = sso_token.access_token.split(":")
+    resp = await sso_service.post(
+        f"{BASE_PATH}/introspect/batch",
+        headers={
+            "Authorization": f"Bearer {sso_admin_token.access_token}"
+        },
+        json={
+            "access_tokens": [
+                sso_token.access_token,
+                "no-valid-token",
+                f"{generate_token(48)}:{jwt_token}",
+                f"{client_id}:{jwt_token[:-4]}AAAA",
+                sso_admin_token.access_token
+            ]
+        }
+    )
+    assert resp.status_code == 200
+    results = resp.json()
+    assert [result["active"] for result in results] == [True, False, False, False, True]
+    assert results[0]["user"]["client_id"] == client_id
+    assert results[0]["user"]["role"] == "user"
+    assert results[4]["user"]["role"] == "admin"
+
+
+@allure.title("Introspect access tokens batch of a revoked session.")
+@allure.feature("Auth API")
+async def test_introspect_batch_revoked_session(
+        sso_service: AsyncClient,
+        sso_admin_token: TokenData,
+        sso_token: TokenData
+):
+    async def _introspect():
+        resp = await sso_service.post(
+            f"{BASE_PATH}/introspect/batch",
+            headers={
+                "Authorization": f"Bearer {sso_admin_token.access_token}"
+            },
+            json={"access_tokens": [sso_token.access_token, sso_admin_token.access_token]}
+        )
+        assert resp.status_code == 200
+        return [result["active"] for result in resp.json()]
+
+    assert await _introspect() == [True, True]
+    resp = await sso_service.get(
+        "/api/v1/user/me/sessions",
+        headers={
+            "Authorization": f"Bearer {sso_token.access_token}"
+        }
+    )
+    assert resp.status_code == 200
+    session_id = resp.json()[0]["session_id"]
+    resp = await sso_service.post(
+        f"{BASE_PATH}/session/revoke",
+        headers={
+            "Authorization": f"Bearer {sso_admin_token.access_token}"
+        },
+        params={"session_id": session_id}
+    )
+    assert resp.status_code == 200
+    assert await _introspect() == [False, True]
+
+
+@allure.title("Introspect access tokens batch by no admin.")
+@allure.feature("Auth API")
+async def test_introspect_batch_access_denied(sso_service: AsyncClient, sso_token: TokenData):
+    resp = await sso_service.post(
+        f"{BASE_PATH}/introspect/batch",
+        headers={
+            "Authorization": f"Bearer {sso_token.access_token}"
+        },
+        json={"access_tokens": [sso_token.access_token]}
+    )
+    assert_status_code(resp, 400, 403)
+    assert_error_code(resp, SsoErrorCode.AUTH_FORBIDDEN)
+
+
+@allure.title("Refresh session token reuse.")
+@allure.feature("Auth API")
+async def test_session_refresh_token_reuse(
+        sso_service: AsyncClient,
+        sso_token: TokenData,
+        monkeypatch: pytest.MonkeyPatch
+):
+    async def refresh(refresh_token: str):
+        sso_service.cookies.clear()
+        return await sso_service.post(
+            f"{BASE_PATH}/session/refresh",
+            cookies={
+                "sso_refresh_token": refresh_token
+            }
+        )
+
+    resp = await refresh(sso_token.refresh_token)
+    assert resp.status_code == 200
+    rotated_token = validate_token_schema(resp)
+
+    with allure.step("The concurrent reuse is only rejected."):
+        resp = await refresh(sso_token.refresh_token)
+        assert_status_code(resp, 400, 403)
+        assert_error_code(resp, SsoErrorCode.AUTH_REFRESH_TOKEN_NO_VALID)
+
+        resp = await refresh(rotated_token.refresh_token)
+        assert resp.status_code == 200
+        last_token = validate_token_schema(resp)
+
+    with allure.step("The reuse of the rotated token revokes the session."):
+        monkeypatch.setattr(settings, "REFRESH_TOKEN_REUSE_INTERVAL", 0)
+
+        resp = await refresh(rotated_token.refresh_token)
+        assert_status_code(resp, 400, 403)
+
+        resp = await refresh(last_token.refresh_token)
+        assert_status_code(resp, 400, 403)
+        assert_error_code(resp, SsoErrorCode.AUTH_REFRESH_TOKEN_NO_VALID)
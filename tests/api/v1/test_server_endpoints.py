@@ -17,3 +17,16 @@ async def test_health(sso_service: AsyncClient):
 async def test_about(sso_service: AsyncClient):
     resp = await sso_service.get(f"{BASE_PATH}/about")
     assert resp.status_code == 200
+
+
+@allure.title("Metrics.")
+@allure.feature("Server API")
+async def test_metrics(sso_service: AsyncClient, sso_admin_token):
+    resp = await sso_service.get(
+        f"{BASE_PATH}/metrics",
+        headers={
+            "Authorization": f"Bearer {sso_admin_token.access_token}"
+        }
+    )
+    assert resp.status_code == 200
+    assert "client_keys_cache" in resp.json()
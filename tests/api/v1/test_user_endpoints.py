@@ -0,0 +1,49 @@
+import allure
+from httpx import AsyncClient
+
+from data import TokenData
+
+
+BASE_PATH = "/api/v1/user/me"
+
+
+@allure.title("Get all documents.")
+@allure.feature("User API")
+async def test_get_all_documents(sso_service: AsyncClient, sso_token: TokenData):
+    resp = await sso_service.get(
+        f"{BASE_PATH}/documents/all",
+        headers={
+            "Authorization": f"Bearer {sso_token.access_token}"
+        }
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"passport_rf": None, "foreign_passport_rf": None}
+
+
+@allure.title("Get sessions.")
+@allure.feature("User API")
+async def test_get_sessions(sso_service: AsyncClient, sso_token: TokenData):
+    resp = await sso_service.get(
+        f"{BASE_PATH}/sessions",
+        headers={
+            "Authorization": f"Bearer {sso_token.access_token}"
+        }
+    )
+    assert resp.status_code == 200
+    assert len(resp.json()) == 1
+
+
+@allure.title("Get profile.")
+@allure.feature("User API")
+async def test_get_profile(sso_service: AsyncClient, sso_token: TokenData):
+    resp = await sso_service.get(
+        f"{BASE_PATH}/profile",
+        headers={
+            "Authorization": f"Bearer {sso_token.access_token}"
+        }
+    )
+    assert resp.status_code == 200
+    profile = resp.json()
+    assert profile["documents"] == {"passport_rf": None, "foreign_passport_rf": None}
+    assert len(profile["sessions"]) == 1
+    assert profile["sessions"][0]["is_current"]
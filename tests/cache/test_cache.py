@@ -0,0 +1,184 @@
+from asyncio import gather, sleep, create_task
+from uuid import uuid4
+
+import allure
+import pytest
+
+from traveling_sso.cache import (
+    Cache,
+    LRUCache,
+    MemoryCacheBackend,
+    SharedMemoryCacheBackend,
+    SingleFlight,
+    cached,
+    coalesced,
+    MISSING
+)
+from traveling_sso.shared.schemas.exceptions.templates import user_not_found_exception
+
+
+@pytest.fixture
+def shared_backend():
+    backend = SharedMemoryCacheBackend(name=f"test_cache_{uuid4().hex[:8]}", max_size=8, slot_size=256)
+    yield backend
+    backend.close(unlink=True)
+
+
+@allure.title("Cache Backends")
+@allure.feature("Cache")
+@allure.description("Both backends store the values with TTL, evict by size and drop the deleted keys.")
+@pytest.mark.parametrize("backend_type", ["memory", "shared"])
+async def test_cache_backend(backend_type, shared_backend):
+    backend = MemoryCacheBackend(max_size=8) if backend_type == "memory" else shared_backend
+
+    with allure.step("Check set, get and delete."):
+        assert await backend.get("key") is MISSING
+        await backend.set("key", {"value": None}, ttl=60)
+        assert await backend.get("key") == {"value": None}
+        await backend.delete("key")
+        assert await backend.get("key") is MISSING
+
+    with allure.step("Check the expiration."):
+        await backend.set("key", 1, ttl=0.05)
+        await sleep(0.1)
+        assert await backend.get("key") is MISSING
+
+    with allure.step("Check the size-based eviction."):
+        for index in range(32):
+            await backend.set(("key", index), index, ttl=60)
+        stats = backend.stats
+        assert stats.size <= 8
+        assert stats.evictions > 0
+
+    with allure.step("Check clear."):
+        await backend.clear()
+        assert backend.stats.size == 0
+
+
+@allure.title("Shared Memory Cache Backend Between Instances")
+@allure.feature("Cache")
+@allure.description("The instances opened by name see the entries of each other and skip the oversized values.")
+async def test_shared_memory_cache_backend(shared_backend):
+    other = SharedMemoryCacheBackend(name=shared_backend.name, max_size=8, slot_size=256)
+    try:
+        await shared_backend.set("key", "value", ttl=60)
+        assert await other.get("key") == "value"
+        await other.delete("key")
+        assert await shared_backend.get("key") is MISSING
+
+        await shared_backend.set("large", "x" * 1024, ttl=60)
+        assert await other.get("large") is MISSING
+    finally:
+        other.close()
+
+
+@allure.title("Cached Function")
+@allure.feature("Cache")
+@allure.description(
+    "The concurrent misses are coalesced into a single load, the not found is cached "
+    "and the group invalidation drops all the entries of the group."
+)
+async def test_cached():
+    cache = Cache("test", backend=MemoryCacheBackend(max_size=100), ttl=60, negative_ttl=60)
+    loads = []
+
+    @cached(cache, key=lambda *, user_id, kind: kind, group=lambda *, user_id, **_: user_id,
+            negative=(user_not_found_exception,))
+    async def load(*, user_id, kind):
+        loads.append((user_id, kind))
+        await sleep(0.05)
+        if kind == "missing":
+            raise user_not_found_exception
+        return {"user_id": user_id, "kind": kind}
+
+    with allure.step("Check the single-flight."):
+        results = await gather(*(load(user_id="1", kind="a") for _ in range(10)))
+        assert all(result == {"user_id": "1", "kind": "a"} for result in results)
+        assert len(loads) == 1
+        assert cache.stats.coalesced == 9
+        await load(user_id="1", kind="a")
+        assert len(loads) == 1
+        assert cache.stats.hits == 1
+
+    with allure.step("Check the negative caching."):
+        for _ in range(2):
+            with pytest.raises(type(user_not_found_exception)):
+                await load(user_id="1", kind="missing")
+        assert len(loads) == 2
+        assert cache.stats.negative_hits == 1
+
+    with allure.step("Check the group invalidation."):
+        await load(user_id="2", kind="a")
+        await cache.invalidate_group("1")
+        await load(user_id="1", kind="a")
+        await load(user_id="2", kind="a")
+        assert loads[-1] == ("1", "a")
+        assert len(loads) == 4
+
+
+@allure.title("Single-Flight Coalescing")
+@allure.feature("Cache")
+@allure.description(
+    "The concurrent calls with the same key share one load and its error, "
+    "the waiters of a cancelled load load on their own and the fan-in is counted."
+)
+async def test_single_flight():
+    single_flight = SingleFlight("test")
+    loads = []
+
+    @coalesced(single_flight, key=lambda *, key: key)
+    async def load(*, key):
+        loads.append(key)
+        await sleep(0.05)
+        if key is None or key == "error":
+            raise user_not_found_exception
+        return key
+
+    with allure.step("Check the concurrent calls share the load."):
+        assert await gather(*(load(key="a") for _ in range(5)), load(key="b")) == ["a"] * 5 + ["b"]
+        assert loads == ["a", "b"]
+        stats = single_flight.stats
+        assert (stats.calls, stats.loads, stats.coalesced, stats.max_fan_in) == (6, 2, 4, 5)
+        assert stats.fan_in == 3
+        assert stats.inflight == 0
+
+    with allure.step("Check the error is shared."):
+        results = await gather(*(load(key="error") for _ in range(3)), return_exceptions=True)
+        assert all(result is user_not_found_exception for result in results)
+        assert loads.count("error") == 1
+
+    with allure.step("Check the call without the key isn't coalesced."):
+        await gather(*(load(key=None) for _ in range(2)), return_exceptions=True)
+        assert loads.count(None) == 2
+
+    with allure.step("Check the waiters of the cancelled load."):
+        leader = create_task(load(key="c"))
+        await sleep(0.01)
+        waiter = create_task(load(key="c"))
+        await sleep(0.01)
+        leader.cancel()
+        assert await waiter == "c"
+        assert loads.count("c") == 2
+
+
+@allure.title("LRU Cache Tags")
+@allure.feature("Cache")
+@allure.description("The entries of a tag are evicted together, the index follows the LRU eviction.")
+async def test_lru_cache_tags():
+    cache = LRUCache(max_size=3, tags=lambda key: (("user", key[0]), ("session", key[1])))
+    cache.set(("u1", "s1"), 1)
+    cache.set(("u1", "s2"), 2)
+    cache.set(("u2", "s3"), 3)
+
+    assert cache.evict_tag(("session", "s1")) == 1
+    assert cache.evict_tag(("user", "u1")) == 1
+    assert ("u2", "s3") in cache
+
+    cache.set(("u3", "s4"), 4)
+    cache.set(("u3", "s5"), 5)
+    cache.set(("u4", "s6"), 6)
+    assert ("u2", "s3") not in cache
+    assert cache.evict_tag(("user", "u2")) == 0
+    assert cache.evict_tag(("user", "u3")) == 2
+    cache.clear()
+    assert cache.evict_tag(("user", "u4")) == 0
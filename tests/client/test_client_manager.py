@@ -44,6 +44,27 @@ async def test_get_clients_for_user(session: AsyncSession, client: Client):
     assert clients_for_user[0].user.email == client.user.email
 
 
+@allure.title("Get Clients For User By Pages")
+@allure.feature("Client Management")
+@allure.description("This test verifies the keyset pagination of the clients of a user.")
+async def test_get_clients_for_user_pages(session: AsyncSession, user: User):
+    from traveling_sso.managers.client import get_clients_for_user
+    from factories import ClientFactory
+
+    clients = [await ClientFactory(session, user=user) for _ in range(5)]
+
+    pages, after = [], None
+    while page := await get_clients_for_user(session=session, user_id=user.id, limit=2, after=after):
+        pages.append([item.client_id for item in page])
+        after = page[-1].id
+
+    assert pages == [
+        [clients[0].client_id, clients[1].client_id],
+        [clients[2].client_id, clients[3].client_id],
+        [clients[4].client_id]
+    ]
+
+
 @allure.title("Create Client For User")
 @allure.feature("Client Management")
 @allure.description("This test verifies the functionality of creating a client for a specific user.")
@@ -124,4 +145,63 @@ async def test_generate_pair_secrets_keys():
 
     assert keys is not None
     assert isinstance(keys, tuple)
-    assert all(isinstance(i, str) for i in keys)
\ No newline at end of file
+    assert all(isinstance(i, str) for i in keys)
+
+
+@allure.title("Client Keys Pool")
+@allure.feature("Client Management")
+@allure.description("This test verifies that the pool is refilled in background and the new client takes its keys.")
+async def test_client_keys_pool(session: AsyncSession, user: User):
+    from sqlalchemy import delete
+
+    from traveling_sso.managers import key_pool
+    from traveling_sso.managers.client import create_client
+    from traveling_sso.shared.schemas.protocol import ClientAlgorithm
+
+    pool = key_pool.ClientKeysPool(
+        size=2,
+        refill_watermark=0.5,
+        check_interval=60,
+        secret="test-pool-secret",
+        alg=ClientAlgorithm.ES256
+    )
+    previous_pool, key_pool.client_keys_pool = key_pool.client_keys_pool, pool
+    try:
+        assert await pool.refill() == 2
+        assert await pool.refill() == 0
+        assert pool.stats.size == 2
+
+        client_schema = await create_client(session=session, user=user, alg=ClientAlgorithm.ES256)
+        assert client_schema.alg == ClientAlgorithm.ES256
+        assert pool.stats.popped == 1
+        assert await pool.count(session=session) == 1
+    finally:
+        key_pool.client_keys_pool = previous_pool
+        await session.execute(delete(key_pool.ClientKeyPool))
+
+
+@allure.title("JWKS invalidated during its build")
+@allure.feature("Client Management")
+@allure.description("The JWKS built before the invalidation of a client change isn't kept, the next request builds it again.")
+async def test_jwks_invalidated_during_build(session: AsyncSession):
+    from traveling_sso.managers.jwks import get_jwks, invalidate_jwks
+
+    builds = []
+
+    class BuildSession:
+        def __init__(self, invalidate: bool):
+            self.invalidate = invalidate
+
+        async def execute(self, query):
+            builds.append(query)
+            result = await session.execute(query)
+            if self.invalidate:
+                # a client is changed while the build runs
+                invalidate_jwks()
+            return result
+
+    invalidate_jwks()
+    await get_jwks(session=BuildSession(invalidate=True))
+    await get_jwks(session=BuildSession(invalidate=False))
+    await get_jwks(session=BuildSession(invalidate=False))
+    assert len(builds) == 2
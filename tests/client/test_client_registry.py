@@ -0,0 +1,65 @@
+from asyncio import sleep
+
+import allure
+from sqlalchemy import delete
+
+from traveling_sso.config import settings
+from traveling_sso.database.core import get_session
+from traveling_sso.database.models import Client
+from traveling_sso.managers.client_registry import ClientRegistry
+from traveling_sso.managers.invalidation import InvalidationBus, InvalidationEventType
+
+from factories import ClientFactory
+
+
+async def _wait_for(predicate, timeout: float = 5):
+    for _ in range(int(timeout / 0.05)):
+        if predicate():
+            return True
+        await sleep(0.05)
+
+    return predicate()
+
+
+@allure.title("Client registry in sync with the client table")
+@allure.feature("Client Management")
+@allure.description("The snapshot is loaded on start and follows the inserts and deletes by the invalidation bus.")
+async def test_client_registry_notifications():
+    bus = InvalidationBus(enabled=True, retry_interval=1, replay_margin=30, retention=3600, cleanup_interval=60)
+    registry = ClientRegistry(enabled=True, resync_interval=60, negative_max_size=10, negative_ttl=60)
+    bus.subscribe(InvalidationEventType.client, registry.on_client_changed)
+    assert registry.get(settings.ROOT_ADMIN_USER_CLIENT["client_id"]) is None
+
+    await bus.start()
+    await registry.start()
+    try:
+        with allure.step("Check the snapshot is loaded."):
+            root_client = registry.get(settings.ROOT_ADMIN_USER_CLIENT["client_id"])
+            assert root_client is not None
+            assert root_client.client_private_secret is not None
+            public_root_client = registry.get(root_client.client_id, with_private_secret=False)
+            assert public_root_client.client_private_secret is None
+            assert public_root_client.client_public_secret == root_client.client_public_secret
+
+        with allure.step("Check the inserted client is added."):
+            async with get_session() as session:
+                async with session.begin():
+                    client = await ClientFactory(session)
+                    client_id = client.client_id
+            assert await _wait_for(lambda: registry.get(client_id) is not None)
+
+        with allure.step("Check the deleted client is dropped."):
+            async with get_session() as session:
+                async with session.begin():
+                    await session.execute(delete(Client).where(Client.client_id == client_id))
+            assert await _wait_for(lambda: registry.get(client_id) is None)
+
+        with allure.step("Check the negative cache of unknown client_id."):
+            assert not registry.is_unknown(client_id)
+            registry.mark_unknown(client_id)
+            assert registry.is_unknown(client_id)
+            assert registry.stats.unknown_hits == 1
+            assert registry.stats.notifications >= 2
+    finally:
+        await registry.stop()
+        await bus.stop()
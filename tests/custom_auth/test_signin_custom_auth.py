@@ -15,6 +15,14 @@ async def test_signin_success(session: AsyncSession, client: Client):
     token_response = await auth_manager.signin()
     assert token_response is not None
 
+@allure.title("Successful signin with username")
+@allure.feature("Custom Auth Management")
+@allure.description("Verify that signin with username and password returns a valid token response")
+async def test_signin_by_username_success(session: AsyncSession, client: Client):
+    auth_manager = CustomAuthManager(session=session, password="password", username=client.user.username, client_id=client.client_id)
+    token_response = await auth_manager.signin()
+    assert token_response is not None
+
 @allure.title("Fail signin with invalid email")
 @allure.feature("Custom Auth Management")
 @allure.description("Verify that signin with invalid email raises a user not specified exception")
@@ -0,0 +1,37 @@
+from asyncio import sleep
+from functools import partial
+
+import allure
+from sqlalchemy import text
+
+from traveling_sso.database.core import get_session, call_after_commit
+
+
+@allure.title("Callbacks after commit")
+@allure.feature("Database")
+@allure.description(
+    "The callback is called after the commit of the transaction and dropped on its rollback, "
+    "a coroutine function is awaited by the commit."
+)
+async def test_call_after_commit():
+    calls = []
+
+    async def append_later(call):
+        await sleep(0)
+        calls.append(call)
+
+    async with get_session() as session:
+        async with session.begin():
+            await session.execute(text("SELECT 1"))
+            call_after_commit(session, lambda: calls.append("committed"))
+            call_after_commit(session, partial(append_later, "awaited"))
+            assert calls == []
+        assert calls == ["committed", "awaited"]
+
+        await session.begin()
+        await session.execute(text("SELECT 1"))
+        call_after_commit(session, lambda: calls.append("rolled back"))
+        await session.rollback()
+        async with session.begin():
+            await session.execute(text("SELECT 1"))
+        assert calls == ["committed", "awaited"]
@@ -0,0 +1,69 @@
+from asyncio import sleep
+from datetime import timedelta
+from uuid import uuid4
+
+import allure
+
+from traveling_sso.database.core import get_session
+from traveling_sso.database.utils import utcnow
+from traveling_sso.managers.invalidation import InvalidationBus, InvalidationEventType, publish_invalidation
+
+
+async def _wait_for(predicate, timeout: float = 5):
+    for _ in range(int(timeout / 0.05)):
+        if predicate():
+            return True
+        await sleep(0.05)
+
+    return predicate()
+
+
+async def _publish(key: str, *, rollback: bool = False):
+    async with get_session() as session:
+        await session.begin()
+        await publish_invalidation(session=session, type=InvalidationEventType.user, key=key)
+        if rollback:
+            await session.rollback()
+        else:
+            await session.commit()
+
+
+@allure.title("Invalidation bus between the nodes")
+@allure.feature("Database")
+@allure.description("The committed events are delivered, replayed after a reconnect, the caches are reset on a gap.")
+async def test_invalidation_bus():
+    bus = InvalidationBus(enabled=True, retry_interval=0.1, replay_margin=30, retention=3600, cleanup_interval=60)
+    received = []
+    resets = []
+    bus.subscribe(InvalidationEventType.user, lambda invalidation: received.append(invalidation.key))
+    bus.subscribe_reset(lambda: resets.append(True))
+
+    await bus.start()
+    try:
+        with allure.step("Check only the committed events are delivered."):
+            rolled_back_key, committed_key = str(uuid4()), str(uuid4())
+            await _publish(rolled_back_key, rollback=True)
+            await _publish(committed_key)
+            assert await _wait_for(lambda: committed_key in received)
+            assert rolled_back_key not in received
+
+        with allure.step("Check the events are delivered after a reconnect."):
+            bus._connection.terminate()
+            key = str(uuid4())
+            await _publish(key)
+            assert await _wait_for(lambda: key in received)
+            assert bus.stats.reconnects == 1
+
+        with allure.step("Check the replay of the missed events."):
+            received.clear()
+            bus._received_until = utcnow() - timedelta(seconds=5)
+            await bus.replay()
+            assert committed_key in received and key in received
+            assert bus.stats.replayed >= 2
+
+        with allure.step("Check the reset if the missed events could be deleted."):
+            bus._received_until = utcnow() - timedelta(hours=2)
+            await bus.replay()
+            assert resets == [True]
+    finally:
+        await bus.stop()
@@ -0,0 +1,98 @@
+import allure
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from traveling_sso.config import settings
+from traveling_sso.database.core import read_engine
+from traveling_sso.database.replicas import ReplicaRouter, stick_to_primary
+
+
+@allure.title("Round-robin between healthy replicas")
+@allure.feature("Database")
+@allure.description("Read-only sessions are balanced between the replicas and skip a failed one.")
+async def test_replica_router_failover():
+    healthy_replica = create_async_engine(url=settings.get_db_url(), isolation_level="AUTOCOMMIT")
+    failed_replica = create_async_engine(url=settings.get_db_url(port="1"), isolation_level="AUTOCOMMIT")
+    router = ReplicaRouter(primary=read_engine, replicas=[healthy_replica, failed_replica], retry_interval=60)
+    try:
+        with allure.step("Check round-robin."):
+            assert router.get_engine() is healthy_replica
+            assert router.get_engine() is failed_replica
+
+        with allure.step("Check the failed replica is skipped."):
+            with pytest.raises(OSError):
+                async with AsyncSession(failed_replica) as session:
+                    await session.execute(text("SELECT 1"))
+            assert router.stats.healthy == 1
+            assert {router.get_engine() for _ in range(4)} == {healthy_replica}
+
+        with allure.step("Check the primary without healthy replicas."):
+            router.mark_unhealthy(0)
+            assert router.get_engine() is read_engine
+    finally:
+        await healthy_replica.dispose()
+        await failed_replica.dispose()
+
+
+@allure.title("Read-your-writes stickiness")
+@allure.feature("Database")
+@allure.description("After a write in the current context the read-only sessions go to the primary.")
+async def test_replica_router_stick_to_primary():
+    replica = create_async_engine(url=settings.get_db_url(), isolation_level="AUTOCOMMIT")
+    router = ReplicaRouter(primary=read_engine, replicas=[replica], retry_interval=60)
+    try:
+        assert router.get_engine() is replica
+        stick_to_primary()
+        assert router.get_engine() is read_engine
+        assert router.stats.primary_reads == 1
+    finally:
+        await replica.dispose()
+
+
+@allure.title("Read-your-writes within a request")
+@allure.feature("Database")
+@allure.description(
+    "The read-only session of the request is bound on its first statement, "
+    "after a write of the request it reads from the primary and not from the lagging replica."
+)
+async def test_read_session_after_write_in_request(monkeypatch: pytest.MonkeyPatch):
+    from fastapi import Depends, FastAPI
+    from httpx import AsyncClient, ASGITransport
+
+    from traveling_sso.database import core
+    from traveling_sso.database.deps import get_db, get_read_db
+
+    replica = create_async_engine(url=settings.get_db_url(), isolation_level="AUTOCOMMIT")
+    replica_statements = []
+    event.listen(replica.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: replica_statements.append(statement))
+    monkeypatch.setattr(core, "read_router", ReplicaRouter(primary=read_engine, replicas=[replica], retry_interval=60))
+
+    app = FastAPI()
+
+    @app.get("/read")
+    async def read(read_session: AsyncSession = Depends(get_read_db)):
+        return (await read_session.execute(text("SELECT 1"))).scalar()
+
+    @app.post("/write-and-read")
+    async def write_and_read(
+            session: AsyncSession = Depends(get_db),
+            read_session: AsyncSession = Depends(get_read_db)
+    ):
+        # a transaction of the primary is the write of the request
+        await session.execute(text("SELECT 1"))
+        return (await read_session.execute(text("SELECT 1"))).scalar()
+
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as service:
+            with allure.step("Check the read without a write goes to the replica."):
+                assert (await service.get("/read")).json() == 1
+                assert len(replica_statements) == 1
+
+            with allure.step("Check the read after the write of the request goes to the primary."):
+                assert (await service.post("/write-and-read")).json() == 1
+                assert len(replica_statements) == 1
+                assert core.read_router.stats.primary_reads == 1
+    finally:
+        await replica.dispose()
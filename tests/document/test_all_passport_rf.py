@@ -4,13 +4,15 @@ import pytest
 import allure
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from traveling_sso.database.models import User, PassportRf, ForeignPassportRf
-from traveling_sso.managers import get_all_documents_by_user_id, create_passport_rf_new
+from traveling_sso.database.models import User, Client, PassportRf, ForeignPassportRf
+from traveling_sso.managers import get_all_documents_by_user_id, get_user_profile, create_passport_rf_new
 from traveling_sso.managers.documents import create_foreign_passport_rf_new, get_passport_rf_by_user_id, \
     get_foreign_passport_rf_by_user_id
 from traveling_sso.shared.schemas.protocol import CreatePassportRfResponseSchema, CreateForeignPassportRfResponseSchema, \
     PassportRfSchema, ForeignPassportRfSchema
 
+from factories import TokenSessionFactory
+
 
 @pytest.fixture
 async def passport_rf(session: AsyncSession, user: User) -> PassportRfSchema:
@@ -86,4 +88,25 @@ async def test_get_foreign_passport_rf_by_user_id(session: AsyncSession, user: U
 
     assert passport.number == foreign_passport_rf.number
     assert passport.first_name == foreign_passport_rf.first_name
-    assert passport.last_name == foreign_passport_rf.last_name
\ No newline at end of file
+    assert passport.last_name == foreign_passport_rf.last_name
+
+
+@pytest.mark.asyncio
+@allure.title("Get user profile")
+@allure.feature("Passport Management")
+@allure.description("This test verifies the retrieval of the user with the documents and the active sessions in one query.")
+async def test_get_user_profile(
+        session: AsyncSession,
+        user: User,
+        client: Client,
+        passport_rf: PassportRf,
+        foreign_passport_rf: ForeignPassportRf
+):
+    token_session = await TokenSessionFactory(session, client_id=client.client_id, user=user)
+
+    profile = await get_user_profile(session=session, user_id=str(user.id), current_session_id=token_session.id)
+
+    assert profile.user.is_passport_rf and profile.user.is_foreign_passport
+    assert profile.documents["passport_rf"].number == passport_rf.number
+    assert profile.documents["foreign_passport_rf"].number == foreign_passport_rf.number
+    assert [(item.session_id, item.is_current) for item in profile.sessions] == [(token_session.id, True)]
@@ -0,0 +1,58 @@
+from asyncio import gather
+from time import sleep
+from uuid import uuid4
+
+import allure
+import pytest
+
+from traveling_sso.managers.crypto import CryptoExecutor
+from traveling_sso.shared.schemas.exceptions import SsoException
+from traveling_sso.shared.schemas.exceptions.templates import service_overloaded_exception
+
+
+@allure.title("Crypto executor backpressure.")
+@allure.feature("Token Management")
+@allure.description("This test verifies that calls over the executor queue limit are rejected.")
+async def test_crypto_executor_rejects_when_queue_is_full():
+    executor = CryptoExecutor(kind="thread", max_workers=1, max_queue_size=1, queue_timeout=0.05)
+
+    results = await gather(*(executor.run(sleep, 0.2) for _ in range(3)), return_exceptions=True)
+    executor.shutdown()
+
+    errors = [res for res in results if isinstance(res, SsoException)]
+    assert len(errors) == 1
+    assert errors[0].error_code == service_overloaded_exception.error_code
+    assert executor.stats.rejected == 1
+    assert executor.stats.completed == 2
+    assert executor.stats.max_queued == 1
+
+
+@allure.title("Crypto executor in processes.")
+@allure.feature("Token Management")
+@allure.description("This test verifies that an access token signed in the process pool is valid.")
+async def test_crypto_executor_process_pool_sign():
+    from traveling_sso.managers.client import generate_pair_secrets_keys
+    from traveling_sso.managers.token import JWTClaims, _sign_access_token, _verify_access_token
+
+    public_secret, private_secret = generate_pair_secrets_keys()
+    client_id = uuid4().hex
+    claims = JWTClaims.factory_claims(str(uuid4()), client_id, "user", str(uuid4()))
+    executor = CryptoExecutor(kind="process", max_workers=1, max_queue_size=1, queue_timeout=60)
+
+    try:
+        jwt_token = await executor.run(_sign_access_token, claims.header, dict(claims), client_id, None, private_secret)
+    finally:
+        executor.shutdown()
+
+    payload, header = _verify_access_token(jwt_token, client_id, None, public_secret, "RS512")
+    assert payload == dict(claims)
+
+
+@pytest.mark.parametrize("kind", ["thread", "inline"])
+@allure.title("Crypto executor result.")
+@allure.feature("Token Management")
+async def test_crypto_executor_run(kind):
+    executor = CryptoExecutor(kind=kind, max_workers=2, max_queue_size=2, queue_timeout=1)
+
+    assert await executor.run(pow, 2, 10) == 1024
+    executor.shutdown()
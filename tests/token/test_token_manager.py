@@ -5,6 +5,7 @@ import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from traveling_sso.database.models import Client, TokenSession
+from traveling_sso.database.utils import utcnow
 from traveling_sso.managers.token import generate_access_token, JWTClaims
 
 
@@ -164,6 +165,15 @@ async def test_get_token_sessions_by_user_id(session: AsyncSession, token_sessio
     assert output_session.session_id == token_session.id
     assert output_session.issued_at == token_session.issued_at
     assert output_session.expires_at == token_session.issued_at + token_session.expires_in
+    assert not output_session.is_current
+
+    with allure.step("Check the current session is marked."):
+        output_sessions = await get_token_sessions_by_user_id(
+            session=session,
+            user_id=token_session.user_id,
+            current_session_id=token_session.id
+        )
+        assert [(item.session_id, item.is_current) for item in output_sessions] == [(token_session.id, True)]
 
 
 @allure.title("Revoke token session.")
@@ -201,6 +211,16 @@ async def test_revoke_token_session(session: AsyncSession, token_session: TokenS
             assert error.error_code == auth_refresh_token_no_valid_exception.error_code
             assert error.http_status_code == auth_refresh_token_no_valid_exception.http_status_code
 
+    with allure.step("Checking that the session lists of the user are invalidated on all the nodes."):
+        from sqlalchemy import select
+        from traveling_sso.database.models import InvalidationEvent
+        from traveling_sso.managers.invalidation import InvalidationEventType
+
+        events = (await session.execute(
+            select(InvalidationEvent.type).where(InvalidationEvent.key == str(token_session.user_id))
+        )).scalars().all()
+        assert InvalidationEventType.user_sessions in events
+
 
 @allure.title("Generate and validate access token.")
 @allure.feature("Token Management")
@@ -224,7 +244,7 @@ async def test_generate_and_validate_access_token(session: AsyncSession, token_s
     )
 
     with allure.step("Generate an access token."):
-        output_token = generate_access_token(
+        output_token = await generate_access_token(
             user_id=str(user.id),
             user_role=user.role,
             client_id=token_session.client_id,
@@ -239,7 +259,7 @@ async def test_generate_and_validate_access_token(session: AsyncSession, token_s
 
         assert client_id == client.client_id
 
-        jwt_claims_output = validate_access_token(
+        jwt_claims_output = await validate_access_token(
             client=client,
             jwt_token=jwt_token
         )
@@ -309,7 +329,7 @@ async def test_update_refresh_token(session: AsyncSession, token_session: TokenS
 
         assert client_id == client.client_id
 
-        jwt_claims_output = validate_access_token(
+        jwt_claims_output = await validate_access_token(
             client=client,
             jwt_token=jwt_token
         )
@@ -344,3 +364,316 @@ async def test_session_revocation_when_count_exceeds_limit_for_user(session: Asy
     )
 
     assert output_count == 1
+
+
+@allure.title("Client key cache.")
+@allure.feature("Token Management")
+@allure.description("This test verifies that the parsed client key is cached and re-imported after invalidation.")
+async def test_client_key_cache(session: AsyncSession, client: Client):
+    from traveling_sso.managers.token import get_client_private_key, invalidate_client_key, client_keys_cache
+
+    with allure.step("The key is parsed once and then served from the cache."):
+        stats = client_keys_cache.stats
+        key = get_client_private_key(client)
+
+        assert get_client_private_key(client) is key
+        assert client_keys_cache.stats.hits == stats.hits + 1
+
+    with allure.step("The key is parsed again after invalidation."):
+        invalidate_client_key(client.client_id)
+
+        assert get_client_private_key(client) is not key
+
+
+@allure.title("Validate access token without the private key.")
+@allure.feature("Token Management")
+@allure.description("This test verifies that the access token is validated only with the public key of the client.")
+async def test_validate_access_token_without_private_secret(session: AsyncSession, token_session: TokenSession):
+    from traveling_sso.managers import validate_access_token, split_access_token, get_client_by_client_id
+
+    client = await get_client_by_client_id(session=session, client_id=token_session.client_id)
+    access_token = await generate_access_token(
+        user_id=str(token_session.user_id),
+        user_role="user",
+        client_id=client.client_id,
+        secret=client.client_private_secret,
+        session_id=str(token_session.id)
+    )
+
+    client = await get_client_by_client_id(
+        session=session,
+        client_id=token_session.client_id,
+        with_private_secret=False
+    )
+    _, jwt_token = split_access_token(access_token)
+
+    assert isinstance(await validate_access_token(client=client, jwt_token=jwt_token), JWTClaims)
+    assert client.client_private_secret is None
+
+
+@pytest.mark.parametrize("alg", ["RS512", "ES256", "EdDSA"])
+@allure.title("Access token for the client signing algorithm.")
+@allure.feature("Token Management")
+@allure.description("This test verifies that access tokens are signed and validated with the algorithm of the client.")
+async def test_access_token_client_algorithm(session: AsyncSession, user, alg):
+    from traveling_sso.managers import validate_access_token, split_access_token, create_token_session
+    from dataclasses import replace
+    from traveling_sso.managers.client import create_client, get_client_by_client_id
+    from traveling_sso.shared.schemas.protocol import TokenType
+    from traveling_sso.shared.schemas.exceptions import SsoException
+
+    client_schema = await create_client(session=session, user=user, alg=alg)
+    client = await get_client_by_client_id(session=session, client_id=client_schema.client_id)
+
+    assert client_schema.alg == alg
+    assert client.alg == alg
+
+    token = await create_token_session(session=session, user=user, client=client, token_type=str(TokenType.Bearer))
+    _, jwt_token = split_access_token(token.access_token)
+    claims = await validate_access_token(client=client, jwt_token=jwt_token)
+
+    assert claims.header["alg"] == alg
+
+    with allure.step("A token isn't accepted if the client has another algorithm."):
+        client = replace(client, alg="RS512" if alg != "RS512" else "ES256")
+        with pytest.raises(SsoException):
+            await validate_access_token(client=client, jwt_token=jwt_token)
+
+
+@allure.title("User sessions cache.")
+@allure.feature("Token Management")
+@allure.description("This test verifies that the validated access token is cached until the session is revoked.")
+async def test_user_sessions_cache(session: AsyncSession, token_session: TokenSession):
+    from traveling_sso.managers import revoke_token_session, get_user_by_identifier, get_client_by_client_id
+    from traveling_sso.managers.session_cache import get_cached_user_session, cache_user_session
+    from traveling_sso.shared.schemas.protocol import UserSessionSchema
+
+    client = await get_client_by_client_id(session=session, client_id=token_session.client_id)
+    access_token = await generate_access_token(
+        user_id=str(token_session.user_id),
+        user_role="user",
+        client_id=client.client_id,
+        secret=client.client_private_secret,
+        session_id=str(token_session.id)
+    )
+    user = await get_user_by_identifier(session=session, identifier=token_session.user_id)
+    user_session = UserSessionSchema(**user.model_dump(), session_id=token_session.id, client_id=client.client_id)
+
+    with allure.step("The validated token is served from the cache."):
+        assert get_cached_user_session(access_token) is None
+        cache_user_session(access_token, user_session, int(utcnow().timestamp()) + 60)
+
+        assert get_cached_user_session(access_token)[0] is user_session
+        assert get_cached_user_session(f"{access_token}A") is None
+
+    with allure.step("The expired token isn't cached."):
+        other_access_token = await generate_access_token(
+            user_id=str(token_session.user_id),
+            user_role="user",
+            client_id=client.client_id,
+            secret=client.client_private_secret,
+            session_id=str(token_session.id)
+        )
+        cache_user_session(other_access_token, user_session, int(utcnow().timestamp()))
+
+        assert get_cached_user_session(other_access_token) is None
+
+    with allure.step("The entry is dropped when the revocation of the session is committed."):
+        await revoke_token_session(session=session, user=user, session_id=token_session.id)
+        assert get_cached_user_session(access_token) is not None
+
+        await session.commit()
+        assert get_cached_user_session(access_token) is None
+
+
+@allure.title("Stateless access token.")
+@allure.feature("Token Management")
+@allure.description("This test verifies that the user session is built from the claims of the stateless access token.")
+async def test_stateless_access_token(
+        session: AsyncSession,
+        token_session: TokenSession,
+        monkeypatch: pytest.MonkeyPatch
+):
+    from traveling_sso.config import settings
+    from traveling_sso.managers import get_client_by_client_id, get_user_by_id, validate_access_token
+    from traveling_sso.managers import session_cache
+    from traveling_sso.managers.token import get_user_profile_claims, get_user_session_from_claims
+
+    monkeypatch.setattr(settings, "STATELESS_ACCESS_TOKEN", True)
+    monkeypatch.setattr(session_cache, "_session_revocation_checks", [])
+    client = await get_client_by_client_id(session=session, client_id=token_session.client_id)
+    user = await get_user_by_id(session=session, user_id=token_session.user_id)
+    access_token = await generate_access_token(
+        user_id=str(user.id),
+        user_role=user.role,
+        client_id=client.client_id,
+        secret=client.client_private_secret,
+        session_id=str(token_session.id),
+        profile=get_user_profile_claims(user)
+    )
+    claims = await validate_access_token(client=client, jwt_token=access_token.split(":")[1])
+
+    with allure.step("The user session matches the user."):
+        user_session = get_user_session_from_claims(claims)
+
+        assert user_session.model_dump(exclude={"session_id", "client_id"}) == user.to_schema().model_dump()
+        assert str(user_session.session_id) == str(token_session.id)
+
+    with allure.step("The revocation check is applied."):
+        session_cache.register_session_revocation_check(lambda session_id: session_id == str(token_session.id))
+
+        assert await session_cache.is_session_revoked(token_session.id)
+
+    with allure.step("The token older than the staleness bound is resolved from the database."):
+        monkeypatch.setattr(settings, "STATELESS_ACCESS_TOKEN_MAX_AGE", -1)
+
+        assert get_user_session_from_claims(claims) is None
+
+
+@allure.title("Access token header isolation.")
+@allure.feature("Token Management")
+@allure.description("This test verifies that a change of the header of one token doesn't leak into the next ones.")
+async def test_access_token_header_isolation():
+    claims = JWTClaims.factory_claims(str(uuid4()), str(uuid4()), "user", str(uuid4()), kid="kid")
+    claims.header["kid"] = "changed"
+
+    other_claims = JWTClaims.factory_claims(str(uuid4()), str(uuid4()), "user", str(uuid4()), kid="kid")
+    assert other_claims.header["kid"] == "kid"
+
+
+@allure.title("Fast claims validator.")
+@allure.feature("Token Management")
+@allure.description("This test verifies that the fixed validator agrees with the generic authlib validation.")
+@pytest.mark.parametrize("claims_update", [
+    {},
+    {"iss": ["http://example.com"]},
+    {"exp": 1},
+    {"exp": "1"},
+    {"iat": 2 ** 40},
+    {"nbf": 2 ** 40},
+    {"jti": ""},
+    {"session_id": None},
+    {"user_role": None},
+])
+async def test_claims_validator(claims_update: dict):
+    from authlib.jose import JWTClaims as GenericJWTClaims
+    from authlib.jose.errors import JoseError
+
+    claims = JWTClaims.factory_claims(str(uuid4()), str(uuid4()), "user", str(uuid4()))
+    payload = {**claims, **claims_update}
+    payload = {claim: value for claim, value in payload.items() if value is not None}
+
+    def validate(claims_cls, **kwargs):
+        try:
+            claims_cls(payload, claims.header, **kwargs).validate()
+        except JoseError as error:
+            return type(error)
+
+    assert validate(JWTClaims) == validate(GenericJWTClaims, options=JWTClaims._sso_options)
+    assert (validate(JWTClaims) is None) == (claims_update == {})
+
+
+@allure.title("Eviction of the oldest sessions by limit.")
+@allure.feature("Token Management")
+@allure.description("This test verifies that only the oldest sessions are revoked with the `evict_oldest` policy.")
+async def test_session_eviction_when_count_exceeds_limit_for_user(
+        session: AsyncSession,
+        client: Client,
+        monkeypatch: pytest.MonkeyPatch
+):
+    from traveling_sso.managers import get_count_active_token_session_for_user, get_token_session_by_refresh_token
+    from traveling_sso.managers import create_token_session
+    from traveling_sso.shared.schemas.exceptions import SsoException
+    from traveling_sso.shared.schemas.protocol import TokenType
+    from traveling_sso.config import settings
+
+    monkeypatch.setattr(settings, "ACTIVE_REFRESH_TOKEN_OVERFLOW_POLICY", "evict_oldest")
+    tokens = []
+    for _ in range(settings.ACTIVE_REFRESH_TOKEN_MAX_COUNT + 2):
+        tokens.append(await create_token_session(
+            session=session,
+            user=client.user,
+            client=client,
+            token_type=str(TokenType.Bearer)
+        ))
+
+    output_count = await get_count_active_token_session_for_user(
+        session=session,
+        user_id=client.user_id
+    )
+
+    assert output_count == settings.ACTIVE_REFRESH_TOKEN_MAX_COUNT
+    for token in tokens[:2]:
+        with pytest.raises(SsoException):
+            await get_token_session_by_refresh_token(session=session, refresh_token=str(token.refresh_token))
+    await get_token_session_by_refresh_token(session=session, refresh_token=str(tokens[2].refresh_token))
+
+
+@allure.title("Revoked sessions index.")
+@allure.feature("Token Management")
+@allure.description(
+    "This test verifies that the revoked sessions are indexed by the committed revocation "
+    "and seeded from the database."
+)
+async def test_revoked_sessions():
+    from traveling_sso.database.core import get_session
+    from traveling_sso.managers import revoke_all_active_token_sessions_for_user
+    from traveling_sso.managers.revoked_sessions import RevokedSessions, revoked_sessions
+    from factories import ClientFactory, TokenSessionFactory
+
+    async with get_session() as session:
+        async with session.begin():
+            client = await ClientFactory(session)
+            token_session = await TokenSessionFactory(session, client_id=client.client_id, user=client.user)
+            session_id, user_id = str(token_session.id), client.user_id
+
+    with allure.step("The revocation rolled back isn't indexed."):
+        async with get_session() as session:
+            await session.begin()
+            await revoke_all_active_token_sessions_for_user(session=session, user_id=user_id)
+            await session.rollback()
+        assert not revoked_sessions.is_revoked(session_id)
+
+    with allure.step("The revoked session is indexed by the commit of the revocation."):
+        async with get_session() as session:
+            async with session.begin():
+                await revoke_all_active_token_sessions_for_user(session=session, user_id=user_id)
+                assert not revoked_sessions.is_revoked(session_id)
+        assert revoked_sessions.is_revoked(session_id)
+
+    with allure.step("The index is seeded with the sessions revoked within the access token lifetime."):
+        seeded_revoked_sessions = RevokedSessions(ttl=60, purge_interval=60)
+        await seeded_revoked_sessions.load()
+        assert seeded_revoked_sessions.is_revoked(session_id)
+
+        expired_revoked_sessions = RevokedSessions(ttl=0, purge_interval=60)
+        await expired_revoked_sessions.load()
+        assert not expired_revoked_sessions.is_revoked(session_id)
+
+
+@allure.title("Concurrent rotations of a refresh token.")
+@allure.feature("Token Management")
+@allure.description("This test verifies that of the concurrent rotations of the same refresh token exactly one succeeds.")
+async def test_concurrent_refresh_token_rotations():
+    from asyncio import gather
+    from traveling_sso.database.core import get_session
+    from traveling_sso.managers import rotate_refresh_token
+    from traveling_sso.shared.schemas.exceptions.templates import auth_refresh_token_no_valid_exception
+    from factories import ClientFactory, TokenSessionFactory
+
+    async with get_session() as session:
+        async with session.begin():
+            client = await ClientFactory(session)
+            token_session = await TokenSessionFactory(session, client_id=client.client_id, user=client.user)
+            refresh_token = token_session.refresh_token
+
+    async def rotate():
+        async with get_session() as rotation_session:
+            async with rotation_session.begin():
+                return await rotate_refresh_token(session=rotation_session, refresh_token=refresh_token)
+
+    results = await gather(*(rotate() for _ in range(3)), return_exceptions=True)
+    rotated = [result for result in results if not isinstance(result, Exception)]
+    assert len(rotated) == 1
+    assert rotated[0].refresh_token != refresh_token
+    assert all(result is auth_refresh_token_no_valid_exception for result in results if result not in rotated)
@@ -48,6 +48,30 @@ async def test_get_user_by_identifier(session: AsyncSession, user: User):
         assert str(user_by_username.username) == user.username
 
 
+@allure.title("Find User By Identifier")
+@allure.feature("User Management")
+@allure.description(
+    "This test validates that the identifier type selects the lookup: "
+    "UUID by primary key, email case-insensitively and anything else by username."
+)
+async def test_find_user_by_identifier(session: AsyncSession, user: User):
+    from uuid import UUID
+    from traveling_sso.managers import find_user_by_identifier
+
+    with allure.step("Check by UUID."):
+        found = await find_user_by_identifier(session=session, identifier=UUID(str(user.id)))
+        assert str(found.id) == str(user.id)
+    with allure.step("Check by email in a different case."):
+        found = await find_user_by_identifier(session=session, identifier=user.email.upper())
+        assert str(found.id) == str(user.id)
+    with allure.step("Check by username."):
+        found = await find_user_by_identifier(session=session, identifier=user.username)
+        assert str(found.id) == str(user.id)
+    with allure.step("Check unknown identifier."):
+        found = await find_user_by_identifier(session=session, identifier="unknown@mail.com")
+        assert found is None
+
+
 @allure.title("Create User")
 @allure.feature("User Management")
 @allure.description("This test is to verify that a new user has been created correctly in the database.")
@@ -117,6 +141,55 @@ async def test_update_user(session: AsyncSession, user: User):
     assert user.password_hash == User.get_password_hash(user_data.password)
 
 
+@allure.title("Cached User By ID")
+@allure.feature("User Management")
+@allure.description("The lookup by id is served from the cache and the user update invalidates it.")
+async def test_get_user_by_identifier_cached(session: AsyncSession, user: User):
+    from traveling_sso.database.core import get_read_session
+    from traveling_sso.managers import get_user_by_identifier, update_user
+    from traveling_sso.managers.caches import users_cache
+    from traveling_sso.shared.schemas.protocol import UpdateUserInfoRequestSchema
+
+    hits = users_cache.stats.hits
+    user_schema = await get_user_by_identifier(session=session, identifier=user.id)
+    assert await get_user_by_identifier(session=session, identifier=user.id) == user_schema
+    assert users_cache.stats.hits == hits + 1
+
+    email = f"{uuid7()}@example.com"
+    await update_user(session=session, user_id=user.id, user_data=UpdateUserInfoRequestSchema(email=email))
+    user_id = user.id
+    await session.commit()
+    async with get_read_session() as read_session:
+        user_schema = await get_user_by_identifier(session=read_session, identifier=user_id)
+    assert user_schema.email == email
+
+
+@allure.title("Cached User read concurrently with an update")
+@allure.feature("User Management")
+@allure.description(
+    "The user read by another session before the update is committed is cached from the old row, "
+    "the commit of the update evicts it."
+)
+async def test_get_user_by_identifier_cached_concurrent_update(session: AsyncSession, user: User):
+    from traveling_sso.database.core import get_session, get_read_session
+    from traveling_sso.managers import get_user_by_identifier, update_user
+    from traveling_sso.shared.schemas.protocol import UpdateUserInfoRequestSchema
+
+    user_id, old_email = user.id, user.email
+    await session.commit()
+    email = f"{uuid7()}@example.com"
+    async with get_session() as writer:
+        async with writer.begin():
+            await update_user(session=writer, user_id=user_id, user_data=UpdateUserInfoRequestSchema(email=email))
+            async with get_read_session() as reader:
+                user_schema = await get_user_by_identifier(session=reader, identifier=user_id)
+                assert user_schema.email == old_email
+
+    async with get_read_session() as reader:
+        user_schema = await get_user_by_identifier(session=reader, identifier=user_id)
+    assert user_schema.email == email
+
+
 @allure.title("Update User with conflict info.")
 @allure.feature("User Management")
 @allure.description("Test checking for conflict occurrence when updating user info.")
@@ -151,6 +224,26 @@ async def test_update_user_with_conflict_info(session: AsyncSession, user: User)
             )
 
 
+@allure.title("Create User with an email in another case.")
+@allure.feature("User Management")
+@allure.description("Test checking that an email is taken in any case.")
+async def test_create_user_with_email_in_another_case(session: AsyncSession):
+    from traveling_sso.managers import create_or_update_user
+    from traveling_sso.shared.schemas.exceptions import SsoException
+    from traveling_sso.shared.schemas.protocol import InternalCreateUserRequestSchema
+
+    email = f"{uuid7().hex}@example.com"
+    await create_or_update_user(
+        session=session,
+        user_data=InternalCreateUserRequestSchema(role="user", email=email, password=uuid7().hex)
+    )
+    with pytest.raises(SsoException):
+        await create_or_update_user(
+            session=session,
+            user_data=InternalCreateUserRequestSchema(role="user", email=email.upper(), password=uuid7().hex)
+        )
+
+
 def _assert_fields(u1, u2):
     assert str(u1.id) == str(u2.id)
     assert u1.role == str(u2.role)